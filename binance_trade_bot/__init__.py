@@ -1,3 +1,3 @@
-from .backtest import backtest
+from .backtest import backtest, compare_strategies, resume
 from .binance_api_manager import BinanceAPIManager
 from .crypto_trading import main as run_trader
@@ -9,10 +9,11 @@ from flask_socketio import SocketIO, emit
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from .bar_store import BAR_INTERVALS, Bar, roll_up
 from .config import Config
 from .database import Database
 from .logger import Logger
-from .models import Coin, CoinValue, CurrentCoin, Pair, ScoutHistory, Trade
+from .models import Coin, CoinValue, CurrentCoin, Pair, PriceBar, ScoutHistory, Trade
 
 app = Flask(__name__)
 cors = CORS(app, resources={r"/api/*": {"origins": "*"}})
@@ -144,6 +145,31 @@ def pairs():
         return jsonify([pair.info() for pair in all_pairs])
 
 
+@app.route("/api/bars/<symbol>")
+def bars(symbol: str):
+    interval = request.args.get("interval", "1m")
+    minutes = BAR_INTERVALS.get(interval, None)
+    if minutes is None:
+        return jsonify({"error": f"Unknown interval {interval}, expected one of {', '.join(BAR_INTERVALS)}"}), 400
+    session: Session
+    with db.db_session() as session:
+        query = session.query(PriceBar).filter(PriceBar.symbol == symbol).order_by(PriceBar.datetime.asc())
+
+        query = filter_period(query, PriceBar)
+
+        price_bars: List[PriceBar] = query.all()
+        rolled_up = roll_up(
+            (Bar(pb.datetime.timestamp(), pb.open, pb.high, pb.low, pb.close, pb.volume) for pb in price_bars),
+            minutes,
+        )
+        return jsonify(
+            [
+                {**bar._asdict(), "datetime": datetime.fromtimestamp(bar.open_time).isoformat(), "symbol": symbol}
+                for bar in rolled_up
+            ]
+        )
+
+
 @socketio.on("update", namespace="/backend")
 def handle_my_custom_event(json):
     emit("update", json, namespace="/frontend", broadcast=True)
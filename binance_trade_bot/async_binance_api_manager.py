@@ -0,0 +1,688 @@
+import asyncio
+import threading
+import time
+import traceback
+from collections import defaultdict
+from datetime import datetime
+from functools import partial
+from typing import Dict, List, Optional, Set, Tuple
+
+from binance import AsyncClient, BinanceSocketManager
+from binance.exceptions import BinanceAPIException, BinanceRequestException
+
+from .bar_store import Bar
+from .binance_stream_manager import BinanceCache, BinanceOrder
+from .config import Config
+from .database import Database
+from .logger import Logger
+from .models import Coin
+from .order_rules import (
+    BALANCE_REFRESH_INTERVAL,
+    BALANCE_SETTLE_TIMEOUT,
+    ORDER_ATTEMPTS,
+    ORDER_REPORT_TIMEOUT,
+    alt_tick,
+    buy_quantity,
+    format_amount,
+    log_failed_attempt,
+    sell_quantity,
+    should_cancel_order,
+)
+from .stream_decoder import order_report_from_event
+from .subscription_manager import ticker_symbols, trading_symbols
+
+# Ticker streams combined on one websocket, the streams are part of its URL so they have to stay well below the
+# exchange's limit of 1024
+TICKER_STREAMS_PER_SOCKET = 200
+
+
+class AsyncBinanceAPIManager:  # pylint: disable=too-many-instance-attributes
+    """
+    asyncio counterpart of BinanceAPIManager. REST calls go through the aiohttp based AsyncClient and both
+    websockets are consumed as tasks on the same event loop, so independent requests, order placement,
+    fill waits and reconciliation after a reconnect overlap instead of running one after the other.
+    """
+
+    def __init__(self, config: Config, db: Database, logger: Logger):
+        self.db = db
+        self.logger = logger
+        self.config = config
+
+        self.cache = BinanceCache()
+        self.binance_client: Optional[AsyncClient] = None
+        self.pending_orders: Set[Tuple[str, int]] = set()
+
+        self._socket_manager: Optional[BinanceSocketManager] = None
+        self._stream_tasks: List[asyncio.Task] = []
+        self._ticker_tasks: List[asyncio.Task] = []
+        self._ticker_symbols: Set[str] = set()
+        self._orders_changed: Optional[asyncio.Condition] = None
+        self._balances_changed: Optional[asyncio.Event] = None
+        self._balances_refresh_lock: Optional[asyncio.Lock] = None
+        self._last_balances_refresh = 0.0
+        self._symbol_info: Dict[str, dict] = {}
+        self._symbol_info_lock: Optional[asyncio.Lock] = None
+        self._trade_fees: Optional[Dict[str, float]] = None
+        self._trade_fees_time = 0.0
+        self._bnb_burn: Optional[bool] = None
+        self._bnb_burn_time = 0.0
+
+    async def start(self):
+        # creating the client calls `ping` API endpoint, verifying the connection
+        self.binance_client = await AsyncClient.create(
+            self.config.BINANCE_API_KEY,
+            self.config.BINANCE_API_SECRET_KEY,
+            tld=self.config.BINANCE_TLD,
+        )
+        self._orders_changed = asyncio.Condition()
+        self._balances_changed = asyncio.Event()
+        self._balances_refresh_lock = asyncio.Lock()
+        self._symbol_info_lock = asyncio.Lock()
+        self.cache.bars.on_close = self.db.queue_bars
+
+        self._socket_manager = BinanceSocketManager(self.binance_client)
+        self._stream_tasks = [
+            asyncio.ensure_future(
+                self._consume_stream(self._socket_manager.user_socket, self._process_user_data, self._on_user_connect)
+            ),
+        ]
+        await self.update_subscriptions(self.config.SUPPORTED_COIN_LIST)
+
+    async def update_subscriptions(self, coins: List[str]):
+        """
+        Follow the tickers `coins` need on combined per-symbol streams, dropping the prices of symbols no longer
+        followed. The sockets are only replaced when the symbols change
+        """
+        symbols = ticker_symbols(
+            coins, self.config.BRIDGE.symbol, trading_symbols(await self.binance_client.get_exchange_info())
+        )
+        if symbols == self._ticker_symbols:
+            return
+        added, removed = symbols - self._ticker_symbols, self._ticker_symbols - symbols
+        self.logger.info(
+            f"Ticker subscriptions: {len(symbols)} symbols, added {sorted(added)}, removed {sorted(removed)}"
+        )
+
+        await self._cancel(self._ticker_tasks)
+        streams = [f"{symbol.lower()}@miniTicker" for symbol in sorted(symbols)]
+        self._ticker_tasks = [
+            asyncio.ensure_future(
+                self._consume_stream(
+                    partial(self._socket_manager.multiplex_socket, streams[start : start + TICKER_STREAMS_PER_SOCKET]),
+                    self._process_symbol_ticker,
+                )
+            )
+            for start in range(0, len(streams), TICKER_STREAMS_PER_SOCKET)
+        ]
+        self._ticker_symbols = symbols
+        self.cache.ticker_values.invalidate(set(self.cache.ticker_values) - symbols)
+        self.cache.bars.discard(set(self.cache.bars.symbols()) - symbols)
+
+    @staticmethod
+    async def _cancel(tasks: List[asyncio.Task]):
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def close(self):
+        await self._cancel(self._stream_tasks + self._ticker_tasks)
+        if self.binance_client is not None:
+            await self.binance_client.close_connection()
+
+    async def _consume_stream(self, socket_factory, handler, on_connect=None):
+        while True:
+            try:
+                async with socket_factory() as stream:
+                    if on_connect is not None:
+                        asyncio.ensure_future(on_connect())
+                    while True:
+                        msg = await stream.recv()
+                        if isinstance(msg, dict) and msg.get("e") == "error":
+                            self.logger.warning(f"Stream error, reconnecting: {msg.get('m')}")
+                            break
+                        await handler(msg)
+            except asyncio.CancelledError:
+                raise
+            except Exception:  # pylint: disable=broad-except
+                self.logger.warning(f"Stream failed, reconnecting...\n{traceback.format_exc()}")
+            await asyncio.sleep(1)
+
+    async def _on_user_connect(self):
+        self.logger.debug("Connect for userdata arrived", False)
+        with self.cache.open_balances() as balances:
+            balances.clear()
+        by_symbol: Dict[str, Set[int]] = defaultdict(set)
+        for symbol, order_id in self.pending_orders.copy():
+            by_symbol[symbol].add(order_id)
+        await asyncio.gather(
+            *(self._fetch_pending_orders(symbol, order_ids) for symbol, order_ids in by_symbol.items())
+        )
+
+    async def _fetch_pending_orders(self, symbol: str, order_ids: Set[int]):
+        while True:
+            try:
+                orders = [
+                    BinanceOrder.from_rest(order)
+                    for order in await self.binance_client.get_open_orders(symbol=symbol)
+                    if order["orderId"] in order_ids
+                ]
+                missing = order_ids - {order.id for order in orders}
+                if missing:
+                    orders.extend(
+                        BinanceOrder.from_rest(order)
+                        for order in await self.binance_client.get_all_orders(symbol=symbol, orderId=min(missing))
+                        if order["orderId"] in missing
+                    )
+                break
+            except (BinanceRequestException, BinanceAPIException) as e:
+                self.logger.error(f"Got exception during fetching pending orders: {e}")
+            await asyncio.sleep(1)
+        for order in orders:
+            self.logger.info(f"Pending order {order.id} for symbol {symbol} fetched:\n{order.event}", False)
+            await self._store_order(order)
+
+    async def _store_order(self, order: BinanceOrder):
+        self.cache.orders.put(order)
+        async with self._orders_changed:
+            self._orders_changed.notify_all()
+
+    async def _process_symbol_ticker(self, msg):
+        # combined streams wrap every event in {"stream": ..., "data": ...}
+        await self._process_tickers([msg["data"]])
+
+    async def _process_tickers(self, events):
+        self.cache.ticker_values.update_many((event["s"], float(event["c"])) for event in events)
+        self.cache.bars.update_many(
+            (event["s"], float(event["c"]), float(event["v"]), event["E"] / 1000) for event in events
+        )
+
+    async def _process_user_data(self, event):
+        event_type = event["e"]
+        if event_type == "executionReport":
+            self.logger.debug(f"execution report: {event}")
+            await self._store_order(BinanceOrder(order_report_from_event(event)))
+        elif event_type == "balanceUpdate":
+            self.logger.debug(f"Balance update: {event}")
+            self.cache.invalidate_balance(event["a"])
+        elif event_type == "outboundAccountPosition":
+            self.logger.debug(f"{event_type}: {event}")
+            self.cache.update_balances({bal["a"]: float(bal["f"]) for bal in event["B"]}, event["u"])
+            self._balances_changed.set()
+        else:
+            self.logger.debug(f"Ignoring user data event {event_type}")
+
+    async def get_trade_fees(self) -> Dict[str, float]:
+        if self._trade_fees is None or time.monotonic() - self._trade_fees_time > 43200:
+            self._trade_fees = {
+                ticker["symbol"]: float(ticker["takerCommission"])
+                for ticker in await self.binance_client.get_trade_fee()
+            }
+            self._trade_fees_time = time.monotonic()
+        return self._trade_fees
+
+    async def get_using_bnb_for_fees(self):
+        if self._bnb_burn is None or time.monotonic() - self._bnb_burn_time > 60:
+            self._bnb_burn = (await self.binance_client.get_bnb_burn_spot_margin())["spotBNBBurn"]
+            self._bnb_burn_time = time.monotonic()
+        return self._bnb_burn
+
+    async def get_fee(self, origin_coin: Coin, target_coin: Coin, selling: bool):
+        trade_fees, using_bnb = await asyncio.gather(self.get_trade_fees(), self.get_using_bnb_for_fees())
+        base_fee = trade_fees[origin_coin + target_coin]
+        if not using_bnb:
+            return base_fee
+
+        # The discount is only applied if we have enough BNB to cover the fee
+        amount_trading, origin_price, bnb_balance = await asyncio.gather(
+            self._sell_quantity(origin_coin.symbol, target_coin.symbol)
+            if selling
+            else self._buy_quantity(origin_coin.symbol, target_coin.symbol),
+            self.get_ticker_price(origin_coin + Coin("BNB")),
+            self.get_currency_balance("BNB"),
+        )
+
+        fee_amount = amount_trading * base_fee * 0.75
+        if origin_coin.symbol == "BNB":
+            fee_amount_bnb = fee_amount
+        else:
+            if origin_price is None:
+                return base_fee
+            fee_amount_bnb = fee_amount * origin_price
+
+        if bnb_balance >= fee_amount_bnb:
+            return base_fee * 0.75
+        return base_fee
+
+    async def get_account(self):
+        """
+        Get account information
+        """
+        return await self.binance_client.get_account()
+
+    async def get_ticker_price(self, ticker_symbol: str):
+        """
+        Get ticker price of a specific coin
+        """
+        price = self.cache.ticker_values.get(ticker_symbol, None)
+        if price is None and ticker_symbol not in self.cache.non_existent_tickers:
+            self.cache.ticker_values.update_many(
+                (ticker["symbol"], float(ticker["price"])) for ticker in await self.binance_client.get_symbol_ticker()
+            )
+            self.logger.debug("Fetched all ticker prices")
+            price = self.cache.ticker_values.get(ticker_symbol, None)
+            if price is None:
+                self.logger.info(f"Ticker does not exist: {ticker_symbol} - will not be fetched from now on")
+                self.cache.non_existent_tickers.add(ticker_symbol)
+
+        return price
+
+    async def get_currency_balance(self, currency_symbol: str, force=False) -> float:
+        """
+        Get balance of a specific coin
+        """
+        if not force:
+            with self.cache.open_balances() as cache_balances:
+                balance = cache_balances.get(currency_symbol, None)
+                if balance is not None:
+                    return balance.free
+
+        await self._refresh_balances()
+        with self.cache.open_balances() as cache_balances:
+            balance = cache_balances.get(currency_symbol, None)
+        if balance is None:
+            self.cache.update_balances({currency_symbol: 0.0}, 0)
+            return 0.0
+        return balance.free
+
+    async def _refresh_balances(self):
+        """
+        Reconcile cached balances with a REST account snapshot, at most once per BALANCE_REFRESH_INTERVAL
+        """
+        requested = time.monotonic()
+        async with self._balances_refresh_lock:
+            if self._last_balances_refresh > requested:
+                return
+            delay = self._last_balances_refresh + BALANCE_REFRESH_INTERVAL - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            account = await self.binance_client.get_account()
+            self._last_balances_refresh = time.monotonic()
+
+        balances = {
+            currency_balance["asset"]: float(currency_balance["free"]) for currency_balance in account["balances"]
+        }
+        self.logger.debug(f"Fetched all balances: {balances}")
+        self.cache.update_balances(balances, account["updateTime"])
+
+    async def _wait_for_balance_settlement(self, currency_symbol: str, origin_balance: float) -> float:
+        deadline = time.monotonic() + BALANCE_SETTLE_TIMEOUT
+        while True:
+            self._balances_changed.clear()
+            with self.cache.open_balances() as cache_balances:
+                balance = cache_balances.get(currency_symbol, None)
+            if balance is not None and balance.free < origin_balance:
+                return balance.free
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(self._balances_changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+
+        self.logger.debug(f"No settled {currency_symbol} balance from the stream, reconciling over REST")
+        new_balance = await self.get_currency_balance(currency_symbol, True)
+        if new_balance >= origin_balance:
+            self.logger.warning(f"{currency_symbol} balance has not settled yet: {new_balance}")
+        return new_balance
+
+    async def retry(self, func, *args, **kwargs):
+        for attempt in range(ORDER_ATTEMPTS):
+            try:
+                return await func(*args, **kwargs)
+            except Exception:  # pylint: disable=broad-except
+                log_failed_attempt(self.logger, attempt, traceback.format_exc())
+                await asyncio.sleep(1)
+        return None
+
+    async def get_symbol_info(self, symbol: str) -> dict:
+        """
+        Get symbol info from a single exchangeInfo download shared by all symbols
+        """
+        if symbol not in self._symbol_info:
+            async with self._symbol_info_lock:
+                if symbol not in self._symbol_info:
+                    exchange_info = await self.binance_client.get_exchange_info()
+                    self._symbol_info = {info["symbol"]: info for info in exchange_info["symbols"]}
+        return self._symbol_info[symbol]
+
+    async def get_symbol_filter(self, origin_symbol: str, target_symbol: str, filter_type: str):
+        return next(
+            _filter
+            for _filter in (await self.get_symbol_info(origin_symbol + target_symbol))["filters"]
+            if _filter["filterType"] == filter_type
+        )
+
+    async def get_alt_tick(self, origin_symbol: str, target_symbol: str):
+        return alt_tick((await self.get_symbol_filter(origin_symbol, target_symbol, "LOT_SIZE"))["stepSize"])
+
+    async def get_min_notional(self, origin_symbol: str, target_symbol: str):
+        return float((await self.get_symbol_filter(origin_symbol, target_symbol, "NOTIONAL"))["minNotional"])
+
+    async def wait_for_order(self, order_id, origin_symbol: str, target_symbol: str) -> Optional[BinanceOrder]:
+        tag = (origin_symbol + target_symbol, int(order_id))
+        self.pending_orders.add(tag)
+        try:
+            return await self._wait_for_order(order_id, origin_symbol, target_symbol)
+        finally:
+            self.pending_orders.discard(tag)
+
+    async def _wait_for_order_report(self, order_id, symbol: str) -> BinanceOrder:
+        """
+        Wait for the execution report of a new order, asking for the order over REST whenever the user data
+        stream stays silent for ORDER_REPORT_TIMEOUT
+        """
+        while True:
+            try:
+                async with self._orders_changed:
+                    await asyncio.wait_for(
+                        self._orders_changed.wait_for(lambda: self.cache.orders.get(order_id, None) is not None),
+                        ORDER_REPORT_TIMEOUT,
+                    )
+                return self.cache.orders.get(order_id, None)
+            except asyncio.TimeoutError:
+                self.logger.debug(f"No execution report for order {order_id}, fetching it over REST")
+            try:
+                order = await self.binance_client.get_order(symbol=symbol, orderId=order_id)
+            except (BinanceRequestException, BinanceAPIException) as e:
+                self.logger.error(f"Got exception during fetching order {order_id}: {e}")
+                continue
+            # an execution report may have been stored meanwhile, it is at least as recent as the REST answer
+            if self.cache.orders.get(order_id, None) is None:
+                await self._store_order(BinanceOrder.from_rest(order))
+            return self.cache.orders.get(order_id, None)
+
+    async def _wait_for_order(self, order_id, origin_symbol: str, target_symbol: str) -> Optional[BinanceOrder]:
+        order_status = await self._wait_for_order_report(order_id, origin_symbol + target_symbol)
+        self.logger.debug(f"Order created: {order_status}")
+
+        while order_status.status != "FILLED":
+            try:
+                self.logger.debug(f"Waiting for order {order_id} to be filled")
+
+                if self._should_cancel_order(order_status):
+                    await self.binance_client.cancel_order(symbol=origin_symbol + target_symbol, orderId=order_id)
+                    self.logger.info("Order timeout, canceled...")
+
+                    # sell partially
+                    if order_status.status == "PARTIALLY_FILLED" and order_status.side == "BUY":
+                        self.logger.info("Sell partially filled amount")
+
+                        order_quantity = await self._sell_quantity(origin_symbol, target_symbol)
+                        await self.binance_client.order_market_sell(
+                            symbol=origin_symbol + target_symbol,
+                            quantity=order_quantity,
+                        )
+
+                    self.logger.info("Going back to scouting mode...")
+                    return None
+
+                if order_status.status == "CANCELED":
+                    self.logger.info("Order is canceled, going back to scouting mode...")
+                    return None
+
+                # wake up on the next execution report, or after a second to re-check the timeout
+                async with self._orders_changed:
+                    try:
+                        await asyncio.wait_for(self._orders_changed.wait(), 1)
+                    except asyncio.TimeoutError:
+                        pass
+                order_status = self.cache.orders.get(order_id, None)
+            except BinanceAPIException as e:
+                self.logger.info(e)
+                await asyncio.sleep(1)
+            except Exception as e:  # pylint: disable=broad-except
+                self.logger.info(f"Unexpected Error: {e}")
+                await asyncio.sleep(1)
+
+        self.logger.debug(f"Order filled: {order_status}")
+        return order_status
+
+    def _should_cancel_order(self, order_status):
+        return should_cancel_order(
+            order_status, self.config, lambda: self.cache.ticker_values.get(order_status.symbol, None)
+        )
+
+    async def buy_alt(self, origin_coin: Coin, target_coin: Coin) -> BinanceOrder:
+        return await self.retry(self._buy_alt, origin_coin, target_coin)
+
+    async def _buy_quantity(
+        self,
+        origin_symbol: str,
+        target_symbol: str,
+        target_balance: float = None,
+        from_coin_price: float = None,
+    ):
+        target_balance = target_balance or await self.get_currency_balance(target_symbol)
+        from_coin_price = from_coin_price or await self.get_ticker_price(origin_symbol + target_symbol)
+
+        return buy_quantity(target_balance, from_coin_price, await self.get_alt_tick(origin_symbol, target_symbol))
+
+    async def _prepare_order(self, origin_coin: Coin, target_coin: Coin, selling: bool):
+        """
+        Fetch everything an order needs concurrently: the trade log entry, both balances, the symbol info,
+        the price and the lot size
+        """
+        origin_symbol = origin_coin.symbol
+        target_symbol = target_coin.symbol
+        with self.cache.open_balances() as balances:
+            balances.clear()
+
+        loop = asyncio.get_event_loop()
+        return await asyncio.gather(
+            loop.run_in_executor(None, self.db.start_trade_log, origin_coin, target_coin, selling),
+            self.get_currency_balance(origin_symbol),
+            self.get_currency_balance(target_symbol),
+            self.get_symbol_info(origin_symbol + target_symbol),
+            self.get_ticker_price(origin_symbol + target_symbol),
+            self.get_alt_tick(origin_symbol, target_symbol),
+        )
+
+    async def _buy_alt(self, origin_coin: Coin, target_coin: Coin):  # pylint: disable=too-many-locals
+        """
+        Buy altcoin
+        """
+        origin_symbol = origin_coin.symbol
+        target_symbol = target_coin.symbol
+        (
+            trade_log,
+            origin_balance,
+            target_balance,
+            pair_info,
+            from_coin_price,
+            origin_tick,
+        ) = await self._prepare_order(origin_coin, target_coin, False)
+        from_coin_price_s = format_amount(from_coin_price, pair_info["quotePrecision"])
+
+        order_quantity = buy_quantity(target_balance, from_coin_price, origin_tick)
+        order_quantity_s = format_amount(order_quantity, pair_info["baseAssetPrecision"])
+
+        self.logger.info(f"BUY QTY {order_quantity}")
+
+        # Try to buy until successful
+        order = None
+        while order is None:
+            try:
+                order = await self.binance_client.order_limit_buy(
+                    symbol=origin_symbol + target_symbol,
+                    quantity=order_quantity_s,
+                    price=from_coin_price_s,
+                )
+                self.logger.info(order)
+            except BinanceAPIException as e:
+                self.logger.info(e)
+                await asyncio.sleep(1)
+            except Exception as e:  # pylint: disable=broad-except
+                self.logger.warning(f"Unexpected Error: {e}")
+                await asyncio.sleep(1)
+
+        loop = asyncio.get_event_loop()
+        order, _ = await asyncio.gather(
+            self.wait_for_order(order["orderId"], origin_symbol, target_symbol),
+            loop.run_in_executor(None, trade_log.set_ordered, origin_balance, target_balance, order_quantity),
+        )
+
+        if order is None:
+            return None
+
+        self.logger.info(f"Bought {origin_symbol}")
+
+        await loop.run_in_executor(None, trade_log.set_complete, order.cumulative_quote_qty)
+
+        return order
+
+    async def sell_alt(self, origin_coin: Coin, target_coin: Coin) -> BinanceOrder:
+        return await self.retry(self._sell_alt, origin_coin, target_coin)
+
+    async def _sell_quantity(self, origin_symbol: str, target_symbol: str, origin_balance: float = None):
+        origin_balance = origin_balance or await self.get_currency_balance(origin_symbol)
+
+        return sell_quantity(origin_balance, await self.get_alt_tick(origin_symbol, target_symbol))
+
+    async def _sell_alt(self, origin_coin: Coin, target_coin: Coin):  # pylint: disable=too-many-locals
+        """
+        Sell altcoin
+        """
+        origin_symbol = origin_coin.symbol
+        target_symbol = target_coin.symbol
+        (
+            trade_log,
+            origin_balance,
+            target_balance,
+            pair_info,
+            from_coin_price,
+            origin_tick,
+        ) = await self._prepare_order(origin_coin, target_coin, True)
+        from_coin_price_s = format_amount(from_coin_price, pair_info["quotePrecision"])
+
+        order_quantity = sell_quantity(origin_balance, origin_tick)
+        order_quantity_s = format_amount(order_quantity, pair_info["baseAssetPrecision"])
+        self.logger.info(f"Selling {order_quantity} of {origin_symbol}")
+
+        self.logger.info(f"Balance is {origin_balance}")
+        order = None
+        while order is None:
+            # Should sell at calculated price to avoid lost coin
+            order = await self.binance_client.order_limit_sell(
+                symbol=origin_symbol + target_symbol,
+                quantity=(order_quantity_s),
+                price=from_coin_price_s,
+            )
+
+        self.logger.info("order")
+        self.logger.info(order)
+
+        loop = asyncio.get_event_loop()
+        order, _ = await asyncio.gather(
+            self.wait_for_order(order["orderId"], origin_symbol, target_symbol),
+            loop.run_in_executor(None, trade_log.set_ordered, origin_balance, target_balance, order_quantity),
+        )
+
+        if order is None:
+            return None
+
+        await self._wait_for_balance_settlement(origin_symbol, origin_balance)
+
+        self.logger.info(f"Sold {origin_symbol}")
+
+        await loop.run_in_executor(None, trade_log.set_complete, order.cumulative_quote_qty)
+
+        return order
+
+
+class ThreadedBinanceAPIManager:
+    """
+    Blocking facade over AsyncBinanceAPIManager with the same surface as BinanceAPIManager, so existing
+    strategies can use it unchanged. The event loop runs on its own thread; every call is submitted to it
+    and waited for.
+    """
+
+    simulated = False
+
+    def __init__(self, config: Config, db: Database, logger: Logger):
+        self.config = config
+        self.db = db
+        self.logger = logger
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="async-binance-api", daemon=True)
+        self._thread.start()
+
+        if config.EXECUTION_MODE != "limit":
+            logger.warning(f"execution_mode={config.EXECUTION_MODE} isn't supported with async_api, using limit orders")
+
+        self.async_manager = AsyncBinanceAPIManager(config, db, logger)
+        self.cache = self.async_manager.cache
+        self._run(self.async_manager.start())
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def get_trade_fees(self) -> Dict[str, float]:
+        return self._run(self.async_manager.get_trade_fees())
+
+    def get_using_bnb_for_fees(self):
+        return self._run(self.async_manager.get_using_bnb_for_fees())
+
+    def get_fee(self, origin_coin: Coin, target_coin: Coin, selling: bool):
+        return self._run(self.async_manager.get_fee(origin_coin, target_coin, selling))
+
+    def get_account(self):
+        return self._run(self.async_manager.get_account())
+
+    def get_ticker_price(self, ticker_symbol: str):
+        # served straight from the cache when possible, without a round trip through the event loop
+        price = self.cache.ticker_values.get(ticker_symbol, None)
+        if price is not None:
+            return price
+        return self._run(self.async_manager.get_ticker_price(ticker_symbol))
+
+    def get_bars(self, ticker_symbol: str, interval: str = "1m", limit: int = None) -> List[Bar]:
+        return self.cache.bars.bars(ticker_symbol, interval, limit)
+
+    def get_currency_balance(self, currency_symbol: str, force=False) -> float:
+        return self._run(self.async_manager.get_currency_balance(currency_symbol, force))
+
+    def get_symbol_filter(self, origin_symbol: str, target_symbol: str, filter_type: str):
+        return self._run(self.async_manager.get_symbol_filter(origin_symbol, target_symbol, filter_type))
+
+    def get_alt_tick(self, origin_symbol: str, target_symbol: str):
+        return self._run(self.async_manager.get_alt_tick(origin_symbol, target_symbol))
+
+    def get_min_notional(self, origin_symbol: str, target_symbol: str):
+        return self._run(self.async_manager.get_min_notional(origin_symbol, target_symbol))
+
+    def wait_for_order(
+        self, order_id, origin_symbol: str, target_symbol: str, order_guard=None
+    ):  # pylint: disable=unused-argument
+        # pending orders are tracked by the async manager itself, the guard is kept for signature compatibility
+        return self._run(self.async_manager.wait_for_order(order_id, origin_symbol, target_symbol))
+
+    def buy_alt(self, origin_coin: Coin, target_coin: Coin) -> BinanceOrder:
+        return self._run(self.async_manager.buy_alt(origin_coin, target_coin))
+
+    def sell_alt(self, origin_coin: Coin, target_coin: Coin) -> BinanceOrder:
+        return self._run(self.async_manager.sell_alt(origin_coin, target_coin))
+
+    def update_subscriptions(self):
+        """
+        Follow the symbols of the current supported coin list
+        """
+        self._run(self.async_manager.update_subscriptions(self.config.SUPPORTED_COIN_LIST))
+
+    def close(self):
+        self._run(self.async_manager.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
@@ -1,13 +1,11 @@
 from datetime import datetime
-from typing import Dict, List
-
-from sqlalchemy.orm import Session
+from typing import Any, Dict
 
 from .binance_api_manager import BinanceAPIManager
 from .config import Config
 from .database import Database
 from .logger import Logger
-from .models import Coin, CoinValue, Pair
+from .models import Coin, Pair
 
 
 class AutoTrader:
@@ -26,6 +24,17 @@ class AutoTrader:
     def initialize(self):
         self.initialize_trade_thresholds()
 
+    def reload_coin_list(self):
+        """
+        Pick up changes to the supported coin list without a restart
+        """
+        if not self.config.load_supported_coin_list():
+            return
+        self.logger.info(f"Supported coin list changed: {self.config.SUPPORTED_COIN_LIST}")
+        self.db.set_coins(self.config.SUPPORTED_COIN_LIST)
+        self.manager.update_subscriptions()
+        self.initialize_trade_thresholds()
+
     def transaction_through_bridge(self, pair: Pair):
         """
         Jump from the source coin to the destination coin through bridge coin
@@ -63,39 +72,39 @@ class AutoTrader:
             self.logger.info(f"Skipping update... current coin {coin + self.config.BRIDGE} not found")
             return
 
-        session: Session
-        with self.db.db_session() as session:
-            for pair in session.query(Pair).filter(Pair.to_coin == coin):
-                from_coin_price = self.manager.get_ticker_price(pair.from_coin + self.config.BRIDGE)
+        ratios: Dict[Pair, float] = {}
+        for pair in self.db.get_pairs_to(coin, only_enabled=False):
+            from_coin_price = self.manager.get_ticker_price(pair.from_coin + self.config.BRIDGE)
 
-                if from_coin_price is None:
-                    self.logger.info(f"Skipping update for coin {pair.from_coin + self.config.BRIDGE} not found")
-                    continue
+            if from_coin_price is None:
+                self.logger.info(f"Skipping update for coin {pair.from_coin + self.config.BRIDGE} not found")
+                continue
 
-                pair.ratio = from_coin_price / coin_price
+            ratios[pair] = from_coin_price / coin_price
+        self.db.update_pair_ratios(ratios)
 
     def initialize_trade_thresholds(self):
         """
         Initialize the buying threshold of all the coins for trading between them
         """
-        session: Session
-        with self.db.db_session() as session:
-            for pair in session.query(Pair).filter(Pair.ratio.is_(None)).all():
-                if not pair.from_coin.enabled or not pair.to_coin.enabled:
-                    continue
-                # self.logger.info(f"Initializing {pair.from_coin} vs {pair.to_coin}")
+        ratios: Dict[Pair, float] = {}
+        for pair in self.db.get_pairs(only_enabled=False):
+            if pair.ratio is not None or not pair.from_coin.enabled or not pair.to_coin.enabled:
+                continue
+            # self.logger.info(f"Initializing {pair.from_coin} vs {pair.to_coin}")
 
-                from_coin_price = self.manager.get_ticker_price(pair.from_coin + self.config.BRIDGE)
-                if from_coin_price is None:
-                    self.logger.info(f"Skipping initializing {pair.from_coin + self.config.BRIDGE}, symbol not found")
-                    continue
+            from_coin_price = self.manager.get_ticker_price(pair.from_coin + self.config.BRIDGE)
+            if from_coin_price is None:
+                self.logger.info(f"Skipping initializing {pair.from_coin + self.config.BRIDGE}, symbol not found")
+                continue
 
-                to_coin_price = self.manager.get_ticker_price(pair.to_coin + self.config.BRIDGE)
-                if to_coin_price is None:
-                    self.logger.info(f"Skipping initializing {pair.to_coin + self.config.BRIDGE}, symbol not found")
-                    continue
+            to_coin_price = self.manager.get_ticker_price(pair.to_coin + self.config.BRIDGE)
+            if to_coin_price is None:
+                self.logger.info(f"Skipping initializing {pair.to_coin + self.config.BRIDGE}, symbol not found")
+                continue
 
-                pair.ratio = from_coin_price / to_coin_price
+            ratios[pair] = from_coin_price / to_coin_price
+        self.db.update_pair_ratios(ratios)
 
     def scout(self):
         """
@@ -103,6 +112,17 @@ class AutoTrader:
         """
         raise NotImplementedError()
 
+    def get_state(self) -> Dict[str, Any]:
+        """
+        State the strategy keeps outside the database, for backtest checkpoints
+        """
+        return {}
+
+    def set_state(self, state: Dict[str, Any]):
+        """
+        Restore the state get_state returned
+        """
+
     def _get_ratios(self, coin: Coin, coin_price):
         """
         Given a coin, get the current price ratio for every other enabled coin
@@ -148,8 +168,14 @@ class AutoTrader:
         # if we have any viable options, pick the one with the biggest ratio
         if ratio_dict:
             best_pair = max(ratio_dict, key=ratio_dict.get)
-            self.logger.info(f"Will be jumping from {coin} to {best_pair.to_coin_id}")
-            self.transaction_through_bridge(best_pair)
+            self.jump(coin, best_pair)
+
+    def jump(self, coin: Coin, pair: Pair):
+        """
+        Jump from `coin` along `pair`, once it was found to be the best one to jump along
+        """
+        self.logger.info(f"Will be jumping from {coin} to {pair.to_coin_id}")
+        self.transaction_through_bridge(pair)
 
     def bridge_scout(self):
         """
@@ -178,15 +204,12 @@ class AutoTrader:
         """
         now = datetime.now()
 
-        session: Session
-        with self.db.db_session() as session:
-            coins: List[Coin] = session.query(Coin).all()
-            for coin in coins:
-                balance = self.manager.get_currency_balance(coin.symbol)
-                if balance == 0:
-                    continue
-                usd_value = self.manager.get_ticker_price(coin + "USDT")
-                btc_value = self.manager.get_ticker_price(coin + "BTC")
-                cv = CoinValue(coin, balance, usd_value, btc_value, datetime=now)
-                session.add(cv)
-                self.db.send_update(cv)
+        values = []
+        for coin in self.db.get_coins(only_enabled=False):
+            balance = self.manager.get_currency_balance(coin.symbol)
+            if balance == 0:
+                continue
+            usd_value = self.manager.get_ticker_price(coin + "USDT")
+            btc_value = self.manager.get_ticker_price(coin + "BTC")
+            values.append((coin, balance, usd_value, btc_value))
+        self.db.log_coin_values(values, now)
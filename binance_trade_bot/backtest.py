@@ -1,22 +1,81 @@
+import copy
 from collections import defaultdict
 from datetime import datetime, timedelta
 from traceback import format_exc
-from typing import Dict
-
-from sqlitedict import SqliteDict
-
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from .auto_trader import AutoTrader
+from .backtest_checkpoint import (
+    BACKTEST_CHECKPOINT_FILE,
+    CHECKPOINT_INTERVAL,
+    Checkpointer,
+    capture_state,
+    load_checkpoint,
+    restore_config,
+    restore_state,
+)
+from .backtest_metrics import (
+    BACKTEST_REPORT_FILE,
+    COMPARISON_REPORT_FILE,
+    BacktestMetrics,
+    write_comparison_report,
+    write_report,
+)
+from .bar_store import Bar
 from .binance_api_manager import BinanceAPIManager
 from .binance_stream_manager import BinanceOrder
 from .config import Config
 from .database import Database
+from .exchange_snapshot import MissingDataError, OfflineClient, load_snapshot
+from .kline_prefetch import prefetch_klines, required_symbols
+from .kline_store import KlineStore, kline_minute, kline_resolution, minute_datetime
 from .logger import Logger
-from .models import Coin, Pair
+from .models import Coin, Pair, Trade, TradeState
 from .strategies import get_strategy
+from .vectorized_backtest import VECTORIZED_STRATEGIES, run_vectorized
 
-cache = SqliteDict("data/backtest_cache.db")
+
+class PriceCursor:
+    """
+    Prices at the minute the backtest is at, read from the kline store once per symbol and minute however many
+    managers share the cursor. With a `resolution` above 1 they are the opens of the bars of that many minutes
+    """
+
+    def __init__(self, klines: KlineStore, resolution: int = 1):
+        self.klines = klines
+        self.resolution = resolution
+        self.minute: Optional[int] = None
+        self.prices: Dict[str, Optional[float]] = {}
+
+    def set_resolution(self, resolution: int):
+        self.resolution = resolution
+        self.minute = None
+
+    def price(self, symbol: str, minute: int) -> Optional[float]:
+        if minute != self.minute:
+            self.minute = minute
+            self.prices = {}
+        if symbol not in self.prices:
+            self.prices[symbol] = self.klines.price(symbol, minute, resolution=self.resolution)
+        return self.prices[symbol]
+
+    def preset(self, minute: int, prices: Dict[str, Optional[float]]):
+        """
+        Take the prices at `minute` of some symbols from klines read already, e.g. by the vectorized engine
+        """
+        self.minute = minute
+        self.prices = prices
+
+    def forget(self, symbol: str):
+        """
+        Read the price of `symbol` again, after klines of it were written
+        """
+        self.prices.pop(symbol, None)
 
 
 class MockBinanceManager(BinanceAPIManager):
+    simulated = True
+
     def __init__(
         self,
         config: Config,
@@ -24,11 +83,24 @@ class MockBinanceManager(BinanceAPIManager):
         logger: Logger,
         start_date: datetime = None,
         start_balances: Dict[str, float] = None,
+        klines: KlineStore = None,
+        offline: bool = False,
+        prices: PriceCursor = None,
     ):
-        super().__init__(config, db, logger)
+        # offline, exchange info and fees come from a local snapshot and nothing talks to the API
+        super().__init__(config, db, logger, OfflineClient(load_snapshot()) if offline else None)
+        self.offline = offline
+        self.fees: Dict[str, float] = {}
+        if offline and "trade_fees" in self.binance_client.snapshot:
+            self.fees = self.get_trade_fees()
         self.config = config
         self.datetime = start_date or datetime(2021, 1, 1)
-        self.balances = start_balances or {config.BRIDGE.symbol: 100}
+        self.balances = dict(start_balances or {config.BRIDGE.symbol: 100})
+        self.klines = klines or KlineStore()
+        self.prices = prices or PriceCursor(self.klines)
+        # (datetime, side, symbol, quantity, price) of every order
+        self.trades: List[Tuple[datetime, str, str, float, float]] = []
+        self.metrics: Optional[BacktestMetrics] = None
 
     def setup_websockets(self):
         pass  # No websockets are needed for backtesting
@@ -36,32 +108,45 @@ class MockBinanceManager(BinanceAPIManager):
     def increment(self, interval=1):
         self.datetime += timedelta(minutes=interval)
 
+    def now(self) -> datetime:
+        return self.datetime
+
     def get_fee(self, origin_coin: Coin, target_coin: Coin, selling: bool):
-        return 0.00075
+        return self.get_symbol_fee(origin_coin + target_coin)
+
+    def get_symbol_fee(self, symbol: str) -> float:
+        return self.fees.get(symbol, 0.00075)
 
     def get_ticker_price(self, ticker_symbol: str):
         """
         Get ticker price of a specific coin
         """
-        target_date = self.datetime.strftime("%d %b %Y %H:%M:%S")
-        key = f"{ticker_symbol} - {target_date}"
-        val = cache.get(key, None)
-        if val is None:
-            end_date = self.datetime + timedelta(minutes=1000)
-            if end_date > datetime.now():
-                end_date = datetime.now()
-            end_date = end_date.strftime("%d %b %Y %H:%M:%S")
-            # self.logger.info(f"Fetching prices for {ticker_symbol} between {self.datetime} and {end_date}")
-            for result in self.binance_client.get_historical_klines(
-                ticker_symbol, "1m", target_date, end_date, limit=1000
-            ):
-                date = datetime.utcfromtimestamp(result[0] / 1000).strftime("%d %b %Y %H:%M:%S")
-                price = float(result[1])
-                cache[f"{ticker_symbol} - {date}"] = price
-            cache.commit()
-            val = cache.get(key, None)
+        minute = kline_minute(self.datetime)
+        val = self.prices.price(ticker_symbol, minute)
+        if val is None and not self.klines.is_covered(ticker_symbol, minute):
+            if self.offline:
+                raise MissingDataError(f"No {ticker_symbol} klines at {self.datetime} in {self.klines.directory}")
+            if not self.klines.readonly:
+                self._fetch_klines(ticker_symbol, minute)
+                self.prices.forget(ticker_symbol)
+                val = self.prices.price(ticker_symbol, minute)
         return val
 
+    def _fetch_klines(self, ticker_symbol: str, minute: int):
+        end_date = self.datetime + timedelta(minutes=1000)
+        if end_date > datetime.now():
+            end_date = datetime.now()
+        end_minute = kline_minute(end_date)
+        # self.logger.info(f"Fetching prices for {ticker_symbol} between {self.datetime} and {end_date}")
+        klines = self.binance_client.get_historical_klines(
+            ticker_symbol,
+            "1m",
+            self.datetime.strftime("%d %b %Y %H:%M:%S"),
+            end_date.strftime("%d %b %Y %H:%M:%S"),
+            limit=1000,
+        )
+        self.klines.write_klines(ticker_symbol, klines, covered=(minute, max(end_minute, minute + 1)))
+
     def get_currency_balance(self, currency_symbol: str, force=False):
         """
         Get balance of a specific coin
@@ -76,6 +161,7 @@ class MockBinanceManager(BinanceAPIManager):
         from_coin_price = self.get_ticker_price(origin_symbol + target_symbol)
 
         order_quantity = self._buy_quantity(origin_symbol, target_symbol, target_balance, from_coin_price)
+        self.trades.append((self.datetime, "BUY", origin_symbol + target_symbol, order_quantity, from_coin_price))
         target_quantity = order_quantity * from_coin_price
         self.balances[target_symbol] -= target_quantity
         self.balances[origin_symbol] = self.balances.get(origin_symbol, 0) + order_quantity * (
@@ -102,6 +188,7 @@ class MockBinanceManager(BinanceAPIManager):
         from_coin_price = self.get_ticker_price(origin_symbol + target_symbol)
 
         order_quantity = self._sell_quantity(origin_symbol, target_symbol, origin_balance)
+        self.trades.append((self.datetime, "SELL", origin_symbol + target_symbol, order_quantity, from_coin_price))
         target_quantity = order_quantity * from_coin_price
         self.balances[target_symbol] = self.balances.get(target_symbol, 0) + target_quantity * (
             1 - self.get_fee(origin_coin, target_coin, True)
@@ -132,9 +219,113 @@ class MockBinanceManager(BinanceAPIManager):
         return total
 
 
+class MockTradeLog:
+    """
+    TradeLog that records the trade in memory
+    """
+
+    def __init__(self, db: "MockDatabase", from_coin: Coin, to_coin: Coin, selling: bool):
+        self.trade = Trade(from_coin, to_coin, selling)
+        self.trade.id = len(db.trades) + 1
+        db.trades.append(self.trade)
+
+    def set_ordered(self, alt_starting_balance, crypto_starting_balance, alt_trade_amount):
+        self.trade.alt_starting_balance = alt_starting_balance
+        self.trade.alt_trade_amount = alt_trade_amount
+        self.trade.crypto_starting_balance = crypto_starting_balance
+        self.trade.state = TradeState.ORDERED
+
+    def set_complete(self, crypto_trade_amount, execution_mode: str = None, fill_time: float = None):
+        self.trade.crypto_trade_amount = crypto_trade_amount
+        self.trade.execution_mode = execution_mode
+        self.trade.fill_time = fill_time
+        self.trade.state = TradeState.COMPLETE
+
+
 class MockDatabase(Database):
-    def __init__(self, logger: Logger, config: Config):
-        super().__init__(logger, config, "sqlite:///")
+    """
+    Database that keeps coins, pairs, the current coin and trades in plain dicts and lists instead of SQLite, the
+    ORM sessions cost more than the rest of a backtest step. Returns the stored objects themselves, not copies.
+    It has no SQL session, the trading code only goes through the Database methods implemented here
+    """
+
+    def __init__(self, logger: Logger, config: Config):  # pylint: disable=super-init-not-called
+        self.logger = logger
+        self.config = config
+        self.coins: Dict[str, Coin] = {}
+        self.pairs: Dict[Tuple[str, str], Pair] = {}
+        self.pairs_from: Dict[str, List[Pair]] = defaultdict(list)
+        self.pairs_to: Dict[str, List[Pair]] = defaultdict(list)
+        self.current_coin: Optional[Coin] = None
+        self.trades: List[Trade] = []
+
+    def socketio_connect(self):
+        return False
+
+    def send_update(self, model):
+        pass
+
+    def create_database(self):
+        pass
+
+    def migrate_old_state(self):
+        pass
+
+    def set_coins(self, symbols: List[str]):
+        for coin in self.coins.values():
+            coin.enabled = coin.symbol in symbols
+        for symbol in symbols:
+            if symbol in self.coins:
+                continue
+            self.coins[symbol] = Coin(symbol)
+        enabled = [coin for coin in self.coins.values() if coin.enabled]
+        for from_coin in enabled:
+            for to_coin in enabled:
+                if from_coin != to_coin and (from_coin.symbol, to_coin.symbol) not in self.pairs:
+                    pair = Pair(from_coin, to_coin)
+                    # the ORM only fills these in on flush
+                    pair.id = len(self.pairs) + 1
+                    pair.from_coin_id = from_coin.symbol
+                    pair.to_coin_id = to_coin.symbol
+                    self.pairs[(from_coin.symbol, to_coin.symbol)] = pair
+                    self.pairs_from[from_coin.symbol].append(pair)
+                    self.pairs_to[to_coin.symbol].append(pair)
+
+    def get_coins(self, only_enabled=True) -> List[Coin]:
+        return [coin for coin in self.coins.values() if coin.enabled or not only_enabled]
+
+    def get_coin(self, coin: Union[Coin, str]) -> Coin:
+        if isinstance(coin, Coin):
+            return coin
+        return self.coins[coin]
+
+    def set_current_coin(self, coin: Union[Coin, str]):
+        self.current_coin = self.get_coin(coin)
+
+    def get_current_coin(self) -> Optional[Coin]:
+        return self.current_coin
+
+    def clear_current_coin(self):
+        self.current_coin = None
+
+    def get_pair(self, from_coin: Union[Coin, str], to_coin: Union[Coin, str]):
+        return self.pairs[(self.get_coin(from_coin).symbol, self.get_coin(to_coin).symbol)]
+
+    def get_pairs_from(self, from_coin: Union[Coin, str], only_enabled=True) -> List[Pair]:
+        pairs = self.pairs_from[self.get_coin(from_coin).symbol]
+        return [pair for pair in pairs if not only_enabled or pair.from_coin.enabled and pair.to_coin.enabled]
+
+    def get_pairs_to(self, to_coin: Union[Coin, str], only_enabled=True) -> List[Pair]:
+        pairs = self.pairs_to[self.get_coin(to_coin).symbol]
+        return [pair for pair in pairs if not only_enabled or pair.from_coin.enabled and pair.to_coin.enabled]
+
+    def get_pairs(self, only_enabled=True) -> List[Pair]:
+        pairs = self.pairs.values()
+        return [pair for pair in pairs if not only_enabled or pair.from_coin.enabled and pair.to_coin.enabled]
+
+    def update_pair_ratios(self, ratios: Dict[Pair, Optional[float]]):
+        for pair, ratio in ratios.items():
+            self.pairs[(pair.from_coin_id, pair.to_coin_id)].ratio = ratio
 
     def log_scout(
         self,
@@ -145,6 +336,108 @@ class MockDatabase(Database):
     ):
         pass
 
+    def log_coin_values(
+        self, values: List[Tuple[Coin, float, Optional[float], Optional[float]]], value_datetime: datetime
+    ):
+        pass
+
+    def prune_scout_history(self):
+        pass
+
+    def queue_bars(self, bars: Iterable[Tuple[str, Bar]]):
+        pass
+
+    def save_bars(self):
+        pass
+
+    def prune_bars(self):
+        pass
+
+    def prune_value_history(self):
+        pass
+
+    def start_trade_log(self, from_coin: Coin, to_coin: Coin, selling: bool):
+        return MockTradeLog(self, from_coin, to_coin, selling)
+
+
+def check_klines(store: KlineStore, symbols: Iterable[str], start_date: datetime, end_date: datetime):
+    """
+    Raise MissingDataError if `store` lacks klines of `symbols` between `start_date` and `end_date`
+    """
+    start = kline_minute(start_date)
+    end = min(kline_minute(end_date) + 1, kline_minute(datetime.utcnow()))
+    missing = {}
+    for symbol in sorted(symbols):
+        gaps = store.missing(symbol, start, end)
+        if gaps:
+            missing[symbol] = gaps
+    if missing:
+        details = ", ".join(
+            f"{symbol} from {minute_datetime(gaps[0][0])} ({sum(gap_end - gap_start for gap_start, gap_end in gaps)} "
+            f"minutes)"
+            for symbol, gaps in missing.items()
+        )
+        raise MissingDataError(
+            f"The kline store {store.directory} lacks klines of {len(missing)} symbols: {details}. Run the "
+            f"backtest online once to download them"
+        )
+
+
+def _create_manager(
+    config: Config,
+    logger: Logger,
+    start_date: datetime = None,
+    start_balances: Dict[str, float] = None,
+    klines: KlineStore = None,
+    offline: bool = False,
+    prices: PriceCursor = None,
+) -> Tuple[MockDatabase, MockBinanceManager]:
+    db = MockDatabase(logger, config)
+    db.create_database()
+    db.set_coins(config.SUPPORTED_COIN_LIST)
+    return db, MockBinanceManager(config, db, logger, start_date, start_balances, klines, offline, prices)
+
+
+def _load_klines(manager: MockBinanceManager, end_date: datetime, prefetch: bool, logger: Logger):
+    """
+    Make sure the klines up to `end_date` are there offline, or download them up front if `prefetch` is set
+    """
+    symbols = required_symbols(manager.config)
+    if manager.offline:
+        check_klines(manager.klines, symbols, manager.datetime, end_date)
+    elif prefetch and not manager.klines.readonly:
+        prefetch_klines(manager.binance_client, manager.klines, symbols, manager.datetime, end_date, logger)
+
+
+def _start_trader(
+    manager: MockBinanceManager, db: MockDatabase, logger: Logger, starting_coin: str = None
+) -> Optional[AutoTrader]:
+    """
+    Buy the starting coin and initialize the strategy of the manager's config, None if there is no such strategy
+    """
+    config = manager.config
+    starting_coin = db.get_coin(starting_coin or config.SUPPORTED_COIN_LIST[0])
+    if manager.get_currency_balance(starting_coin.symbol) == 0:
+        manager.buy_alt(starting_coin, config.BRIDGE)
+    db.set_current_coin(starting_coin)
+
+    strategy = get_strategy(config.STRATEGY)
+    if strategy is None:
+        logger.error(f"Invalid strategy name {config.STRATEGY}")
+        return None
+    trader = strategy(manager, db, logger, config)
+    trader.initialize()
+    return trader
+
+
+def _scout(trader: AutoTrader, logger: Logger):
+    try:
+        trader.scout()
+    except MissingDataError:
+        raise
+    except Exception:  # pylint: disable=broad-except
+        logger.warning(format_exc())
+
 
 def backtest(
     start_date: datetime = None,
@@ -154,6 +447,14 @@ def backtest(
     start_balances: Dict[str, float] = None,
     starting_coin: str = None,
     config: Config = None,
+    prefetch: bool = True,
+    vectorized: bool = False,
+    klines: KlineStore = None,
+    offline: bool = False,
+    checkpoint_path: str = None,
+    checkpoint_interval: int = CHECKPOINT_INTERVAL,
+    report_path: Optional[str] = BACKTEST_REPORT_FILE,
+    resolution: int = None,
 ):
     """
 
@@ -164,6 +465,21 @@ def backtest(
     :param yield_interval: After how many intervals should the manager be yielded
     :param start_balances: A dictionary of initial coin values. Default: {BRIDGE: 100}
     :param starting_coin: The coin to start on. Default: first coin in coin list
+    :param prefetch: Download the klines of the whole period before the simulation starts, instead of on demand
+    :param vectorized: Skip the minutes at which scouting can't trade, found by evaluating the strategy over many
+        minutes at once, instead of scouting minute by minute. Makes the same trades, supports the default and
+        multiple_coins strategies, requires the klines of the whole period to be prefetched
+    :param klines: Kline store to read prices from. Default: the one in data/klines. A read-only store is used as
+        it is, nothing gets downloaded into it
+    :param offline: Run from local data only, the kline store and the exchange info snapshot, without API keys or
+        network. Raises MissingDataError up front if the store doesn't cover the period
+    :param checkpoint_path: File to save the state of the run to every `checkpoint_interval` steps, for `resume`
+    :param checkpoint_interval: Number of intervals between two checkpoints
+    :param report_path: File to write the metrics of the run to as JSON once it ends, None to not write them. The
+        metrics are kept up to date in `manager.metrics` while it runs
+    :param resolution: Minutes per bar of the prices scouted on, one of 1 or KLINE_RESOLUTIONS. Default: the
+        coarsest one `interval` and `start_date` are aligned with, so e.g. hourly scouting reads hourly bars. 1
+        refines a run on the 1m klines
 
     :return: The final coin balances
     """
@@ -172,37 +488,197 @@ def backtest(
 
     end_date = end_date or datetime.today()
 
-    db = MockDatabase(logger, config)
-    db.create_database()
-    db.set_coins(config.SUPPORTED_COIN_LIST)
-    manager = MockBinanceManager(config, db, logger, start_date, start_balances)
+    db, manager = _create_manager(config, logger, start_date, start_balances, klines, offline)
+    resolution = resolution or kline_resolution(interval, kline_minute(manager.datetime))
+    manager.prices.set_resolution(resolution)
+    _load_klines(manager, end_date, prefetch or vectorized, logger)
 
-    starting_coin = db.get_coin(starting_coin or config.SUPPORTED_COIN_LIST[0])
-    if manager.get_currency_balance(starting_coin.symbol) == 0:
-        manager.buy_alt(starting_coin, config.BRIDGE)
-    db.set_current_coin(starting_coin)
+    if vectorized and config.STRATEGY not in VECTORIZED_STRATEGIES:
+        logger.error(f"The vectorized engine only supports the {', '.join(VECTORIZED_STRATEGIES)} strategies")
+        return manager
+    trader = _start_trader(manager, db, logger, starting_coin)
+    if trader is None:
+        return manager
+    manager.metrics = BacktestMetrics(manager, interval * yield_interval)
+
+    yield manager
+
+    run = {
+        "end_date": end_date,
+        "interval": interval,
+        "yield_interval": yield_interval,
+        "vectorized": vectorized,
+        "resolution": resolution,
+    }
+    checkpointer = None
+    if checkpoint_path:
+        checkpointer = Checkpointer(
+            checkpoint_path, checkpoint_interval, lambda done: capture_state(manager, db, trader, done, run)
+        )
+    return (yield from _simulate(manager, trader, logger, run, 0, checkpointer, report_path))
+
+
+def resume(
+    checkpoint_path: str = BACKTEST_CHECKPOINT_FILE,
+    config: Config = None,
+    klines: KlineStore = None,
+    offline: bool = False,
+    checkpoint_interval: int = CHECKPOINT_INTERVAL,
+    report_path: Optional[str] = BACKTEST_REPORT_FILE,
+):
+    """
+    Continue the backtest that saved `checkpoint_path`, with the arguments and trade deciding configuration it was
+    started with. Makes the same trades as a run that wasn't interrupted, and keeps checkpointing to the same file
+
+    :return: The final coin balances
+    """
+    checkpoint = load_checkpoint(checkpoint_path)
+    run = checkpoint["run"]
+    config = config or Config()
+    restore_config(checkpoint, config)
+    logger = Logger("backtesting", enable_notifications=False)
+
+    db, manager = _create_manager(config, logger, checkpoint["datetime"], klines=klines, offline=offline)
+    manager.prices.set_resolution(run.get("resolution", 1))
+    _load_klines(manager, run["end_date"], False, logger)
 
     strategy = get_strategy(config.STRATEGY)
     if strategy is None:
-        logger.error("Invalid strategy name")
+        logger.error(f"Invalid strategy name {config.STRATEGY}")
         return manager
     trader = strategy(manager, db, logger, config)
-    trader.initialize()
+    manager.metrics = BacktestMetrics(manager, run["interval"] * run["yield_interval"])
+    restore_state(checkpoint, manager, db, trader)
+    logger.info(f"Resuming the backtest at {manager.datetime}, {checkpoint['done']} steps in")
 
     yield manager
 
+    checkpointer = Checkpointer(
+        checkpoint_path,
+        checkpoint_interval,
+        lambda done: capture_state(manager, db, trader, done, run),
+        checkpoint["done"],
+    )
+    return (yield from _simulate(manager, trader, logger, run, checkpoint["done"], checkpointer, report_path))
+
+
+def _simulate(
+    manager: MockBinanceManager,
+    trader: AutoTrader,
+    logger: Logger,
+    run: Dict[str, Any],
+    done: int,
+    on_step: Callable[[int], None] = None,
+    report_path: Optional[str] = None,
+):
+    """
+    Scout up to the end of the run, `done` steps are behind already. `on_step` gets the number of steps made after
+    every step. The metrics get sampled at every yield
+    """
+    end_date, interval, yield_interval = run["end_date"], run["interval"], run["yield_interval"]
+    if run["vectorized"]:
+        for manager in run_vectorized(manager, trader, logger, end_date, interval, yield_interval, done, on_step):
+            manager.metrics.update(manager)
+            yield manager
+    else:
+        n = done + 1
+        try:
+            while manager.datetime < end_date:
+                _scout(trader, logger)
+                manager.increment(interval)
+                if n % yield_interval == 0:
+                    manager.metrics.update(manager)
+                    yield manager
+                if on_step is not None:
+                    on_step(n)
+                n += 1
+        except KeyboardInterrupt:
+            pass
+
+    metrics = manager.metrics
+    metrics.finish(manager)
+    logger.info(f"Backtest ended at {manager.datetime}: {metrics.summary()}")
+    if report_path:
+        write_report(report_path, metrics, run, trader.config)
+    manager.klines.close()
+    return manager
+
+
+def compare_strategies(
+    strategies: Iterable[str] = ("default", "multiple_coins", "momentum"),
+    start_date: datetime = None,
+    end_date: datetime = None,
+    interval=1,
+    yield_interval=100,
+    start_balances: Dict[str, float] = None,
+    starting_coin: str = None,
+    config: Config = None,
+    prefetch: bool = True,
+    klines: KlineStore = None,
+    offline: bool = False,
+    report_path: Optional[str] = COMPARISON_REPORT_FILE,
+    resolution: int = None,
+):
+    """
+    Backtest several strategies in one pass over the klines. Every strategy trades on its own mock manager, with
+    its own balances, database and state, and all of them read prices through one shared cursor, so each price is
+    looked up once per minute however many strategies are compared. Runs minute by minute, like `backtest` without
+    `vectorized`. The parameters not described here are those of `backtest`
+
+    :param strategies: Names of the strategies to compare
+    :param report_path: File to write the metrics of all strategies to as JSON once the run ends, None to not write
+        them
+
+    :return: The managers of the strategies, by strategy name
+    """
+    config = config or Config()
+    logger = Logger("backtesting", enable_notifications=False)
+
+    end_date = end_date or datetime.today()
+    klines = klines or KlineStore()
+    prices = PriceCursor(klines)
+
+    runs: Dict[str, Tuple[MockBinanceManager, AutoTrader]] = {}
+    for name in strategies:
+        strategy_config = copy.copy(config)
+        strategy_config.STRATEGY = name
+        db, manager = _create_manager(strategy_config, logger, start_date, start_balances, klines, offline, prices)
+        if not runs:
+            resolution = resolution or kline_resolution(interval, kline_minute(manager.datetime))
+            prices.set_resolution(resolution)
+            _load_klines(manager, end_date, prefetch, logger)
+        trader = _start_trader(manager, db, logger, starting_coin)
+        if trader is None:
+            continue
+        manager.metrics = BacktestMetrics(manager, interval * yield_interval)
+        runs[name] = (manager, trader)
+    managers = {name: manager for name, (manager, _) in runs.items()}
+    if not runs:
+        return managers
+
+    yield managers
+
     n = 1
+    moment = next(iter(managers.values())).datetime
     try:
-        while manager.datetime < end_date:
-            try:
-                trader.scout()
-            except Exception:  # pylint: disable=broad-except
-                logger.warning(format_exc())
-            manager.increment(interval)
+        while moment < end_date:
+            for manager, trader in runs.values():
+                _scout(trader, logger)
+                manager.increment(interval)
+            moment += timedelta(minutes=interval)
             if n % yield_interval == 0:
-                yield manager
+                for manager in managers.values():
+                    manager.metrics.update(manager)
+                yield managers
             n += 1
     except KeyboardInterrupt:
         pass
-    cache.close()
-    return manager
+
+    for name, manager in managers.items():
+        manager.metrics.finish(manager)
+        logger.info(f"{name} ended at {manager.datetime}: {manager.metrics.summary()}")
+    if report_path:
+        run = {"end_date": end_date, "interval": interval, "yield_interval": yield_interval, "resolution": resolution}
+        write_comparison_report(report_path, managers, run)
+    klines.close()
+    return managers
@@ -0,0 +1,112 @@
+import os
+import pickle
+from typing import Any, Callable, Dict
+
+from .auto_trader import AutoTrader
+from .binance_api_manager import BinanceAPIManager
+from .config import Config
+from .database import Database
+from .models import Coin
+
+# File backtest checkpoints are written to
+BACKTEST_CHECKPOINT_FILE = "data/backtest_checkpoint.pkl"
+# Steps between two checkpoints, a simulated day at the default interval
+CHECKPOINT_INTERVAL = 1440
+# Version of the checkpoint layout, checkpoints of other versions can't be resumed
+CHECKPOINT_VERSION = 2
+# Config attributes that decide the trades of a run, restored with its checkpoint
+CHECKPOINT_CONFIG = (
+    "BRIDGE_SYMBOL",
+    "SUPPORTED_COIN_LIST",
+    "STRATEGY",
+    "USE_MARGIN",
+    "SCOUT_MARGIN",
+    "SCOUT_MULTIPLIER",
+)
+
+
+def save_checkpoint(path: str, checkpoint: Dict[str, Any]):
+    """
+    Write `checkpoint` atomically, a crash while writing leaves the previous one intact
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path + ".tmp", "wb") as wfh:
+        pickle.dump(checkpoint, wfh, protocol=pickle.HIGHEST_PROTOCOL)
+        wfh.flush()
+        os.fsync(wfh.fileno())
+    os.replace(path + ".tmp", path)
+
+
+def load_checkpoint(path: str = BACKTEST_CHECKPOINT_FILE) -> Dict[str, Any]:
+    with open(path, "rb") as rfh:
+        checkpoint = pickle.load(rfh)
+    if checkpoint.get("version", None) != CHECKPOINT_VERSION:
+        raise ValueError(f"{path} is a checkpoint of another version, it can't be resumed")
+    return checkpoint
+
+
+def capture_state(
+    manager: BinanceAPIManager, db: Database, trader: AutoTrader, done: int, run: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Everything a backtest needs to continue after `done` steps: the simulation time, balances, orders and metrics of
+    the mock `manager`, the current coin and pair ratios of `db`, the strategy's own state and the `run` arguments
+    """
+    current_coin = db.get_current_coin()
+    ratios = [(pair.from_coin_id, pair.to_coin_id, pair.ratio) for pair in db.get_pairs(only_enabled=False)]
+    return {
+        "version": CHECKPOINT_VERSION,
+        "run": run,
+        "config": {attribute: getattr(trader.config, attribute) for attribute in CHECKPOINT_CONFIG},
+        "done": done,
+        "datetime": manager.datetime,
+        "balances": dict(manager.balances),
+        "trades": list(manager.trades),
+        "metrics": manager.metrics.get_state(),
+        "current_coin": current_coin.symbol if current_coin is not None else None,
+        "ratios": ratios,
+        "strategy": trader.get_state(),
+    }
+
+
+def restore_config(checkpoint: Dict[str, Any], config: Config):
+    for attribute, value in checkpoint["config"].items():
+        setattr(config, attribute, value)
+    config.BRIDGE = Coin(config.BRIDGE_SYMBOL, False)
+
+
+def restore_state(checkpoint: Dict[str, Any], manager: BinanceAPIManager, db: Database, trader: AutoTrader):
+    """
+    Bring a freshly set up backtest to the state `checkpoint` captured
+    """
+    manager.datetime = checkpoint["datetime"]
+    manager.balances = dict(checkpoint["balances"])
+    manager.trades = list(checkpoint["trades"])
+    manager.metrics.set_state(checkpoint["metrics"])
+
+    ratios = {(from_coin, to_coin): ratio for from_coin, to_coin, ratio in checkpoint["ratios"]}
+    db.update_pair_ratios(
+        {pair: ratios.get((pair.from_coin_id, pair.to_coin_id), None) for pair in db.get_pairs(only_enabled=False)}
+    )
+    if checkpoint["current_coin"] is not None:
+        db.set_current_coin(checkpoint["current_coin"])
+    trader.set_state(checkpoint["strategy"])
+
+
+class Checkpointer:  # pylint: disable=too-few-public-methods
+    """
+    Saves a checkpoint whenever at least `interval` steps passed since the last one
+    """
+
+    def __init__(self, path: str, interval: int, capture: Callable[[int], Dict[str, Any]], done: int = 0):
+        self.path = path
+        self.interval = interval
+        self.capture = capture
+        self.last = done
+
+    def __call__(self, done: int):
+        if done - self.last >= self.interval:
+            save_checkpoint(self.path, self.capture(done))
+            self.last = done
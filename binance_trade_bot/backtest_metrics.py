@@ -0,0 +1,243 @@
+import json
+import math
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from .backtest_checkpoint import CHECKPOINT_CONFIG
+from .binance_api_manager import BinanceAPIManager
+from .config import Config
+from .exchange_snapshot import MissingDataError
+
+# File the report of a finished backtest is written to
+BACKTEST_REPORT_FILE = "data/backtest_report.json"
+# File the report of strategies backtested side by side is written to
+COMPARISON_REPORT_FILE = "data/comparison_report.json"
+# Minutes in a year, the returns between two samples are annualized with it
+MINUTES_PER_YEAR = 365 * 24 * 60
+
+
+def portfolio_value(manager: BinanceAPIManager, bridge: str) -> Optional[float]:
+    """
+    Value of all balances in the bridge coin, None while a held coin has no price, as a gap in the klines
+    would otherwise show up as a drawdown
+    """
+    value = 0.0
+    for coin, balance in manager.balances.items():
+        if coin == bridge:
+            value += balance
+        elif balance:
+            price = manager.get_ticker_price(coin + bridge)
+            if price is None:
+                return None
+            value += price * balance
+    return value
+
+
+class BacktestMetrics:
+    """
+    Risk and performance figures of a backtest, updated in constant time whenever it yields, so both engines
+    sample the equity at the same minutes: the equity curve in the bridge coin, its maximum drawdown, the Sharpe
+    and Sortino ratios of the returns between two samples, the coins bought, the fees paid and how many simulated
+    minutes the engine gets through per second
+    """
+
+    def __init__(self, manager: BinanceAPIManager, sample_minutes: int):
+        self.bridge = manager.config.BRIDGE.symbol
+        self.sample_minutes = sample_minutes
+        self.start_datetime = manager.datetime
+        self.end_datetime = manager.datetime
+        self.equity: List[Tuple[datetime, float]] = []
+        self.peak = 0.0
+        self.max_drawdown = 0.0
+        # Welford's running mean and sum of squared deviations of the returns, and their downside sum of squares
+        self.returns = 0
+        self.mean_return = 0.0
+        self.return_m2 = 0.0
+        self.downside_m2 = 0.0
+        self.jumps = 0
+        self.fees = 0.0
+        self.trades_seen = 0
+        self.wall_seconds = 0.0
+        self.started = time.perf_counter()
+        self._count_trades(manager, initial=True)
+        self.update(manager)
+
+    def _count_trades(self, manager: BinanceAPIManager, initial: bool = False):
+        for _, side, symbol, quantity, price in manager.trades[self.trades_seen :]:
+            self.fees += quantity * price * manager.get_symbol_fee(symbol)
+            if side == "BUY" and not initial:
+                self.jumps += 1
+        self.trades_seen = len(manager.trades)
+
+    def update(self, manager: BinanceAPIManager):
+        self._count_trades(manager)
+        self.end_datetime = manager.datetime
+        value = portfolio_value(manager, self.bridge)
+        if value is None:
+            return
+        if self.equity and self.equity[-1][1]:
+            change = value / self.equity[-1][1] - 1
+            self.returns += 1
+            delta = change - self.mean_return
+            self.mean_return += delta / self.returns
+            self.return_m2 += delta * (change - self.mean_return)
+            self.downside_m2 += min(change, 0.0) ** 2
+        self.equity.append((manager.datetime, value))
+        self.peak = max(self.peak, value)
+        if self.peak:
+            self.max_drawdown = max(self.max_drawdown, (self.peak - value) / self.peak)
+
+    def finish(self, manager: BinanceAPIManager):
+        """
+        Take the last sample, if the run ended between two yields, and stop the clock
+        """
+        if manager.datetime != self.end_datetime:
+            try:
+                self.update(manager)
+            except MissingDataError:
+                pass  # the last step may end up to an interval past the period that was checked offline
+        self._count_trades(manager)
+        self.wall_seconds += time.perf_counter() - self.started
+        self.started = time.perf_counter()
+
+    @property
+    def start_value(self) -> Optional[float]:
+        return self.equity[0][1] if self.equity else None
+
+    @property
+    def final_value(self) -> Optional[float]:
+        return self.equity[-1][1] if self.equity else None
+
+    @property
+    def return_pct(self) -> Optional[float]:
+        if not self.start_value:
+            return None
+        return (self.final_value - self.start_value) / self.start_value * 100
+
+    @property
+    def sharpe(self) -> Optional[float]:
+        if self.returns < 2 or not self.return_m2:
+            return None
+        deviation = math.sqrt(self.return_m2 / (self.returns - 1))
+        return self.mean_return / deviation * math.sqrt(MINUTES_PER_YEAR / self.sample_minutes)
+
+    @property
+    def sortino(self) -> Optional[float]:
+        if not self.returns or not self.downside_m2:
+            return None
+        deviation = math.sqrt(self.downside_m2 / self.returns)
+        return self.mean_return / deviation * math.sqrt(MINUTES_PER_YEAR / self.sample_minutes)
+
+    @property
+    def simulated_minutes(self) -> float:
+        return (self.end_datetime - self.start_datetime).total_seconds() / 60
+
+    @property
+    def minutes_per_second(self) -> Optional[float]:
+        seconds = self.wall_seconds + time.perf_counter() - self.started
+        return self.simulated_minutes / seconds if seconds else None
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Everything but the running clock, for backtest checkpoints
+        """
+        state = dict(self.__dict__)
+        state["wall_seconds"] += time.perf_counter() - state.pop("started")
+        return state
+
+    def set_state(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self.started = time.perf_counter()
+
+    def summary(self) -> str:
+        return_pct = "no" if self.return_pct is None else f"{self.return_pct:.2f}%"
+        return (
+            f"{return_pct} return, {self.max_drawdown * 100:.2f}% max drawdown, {self.jumps} jumps, "
+            f"{self.fees:.4f} {self.bridge} fees, {self.minutes_per_second or 0:.0f} simulated minutes per second"
+        )
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "start": self.start_datetime.isoformat(),
+            "end": self.end_datetime.isoformat(),
+            "bridge": self.bridge,
+            "start_value": self.start_value,
+            "final_value": self.final_value,
+            "return_pct": self.return_pct,
+            "max_drawdown_pct": self.max_drawdown * 100,
+            "sharpe": self.sharpe,
+            "sortino": self.sortino,
+            "jumps": self.jumps,
+            "fees": self.fees,
+            "simulated_minutes": self.simulated_minutes,
+            "wall_seconds": self.wall_seconds,
+            "minutes_per_second": self.minutes_per_second,
+            "equity": [(moment.isoformat(), value) for moment, value in self.equity],
+        }
+
+
+def best_windows(metrics: BacktestMetrics, window: timedelta, count: int = 3) -> List[Tuple[datetime, datetime]]:
+    """
+    The `count` non-overlapping periods of about `window` with the highest return on the equity curve, best first,
+    e.g. to backtest the promising parts of a coarse run again on the 1m klines
+    """
+    equity = metrics.equity
+    windows = []
+    end = 0
+    for start, (start_datetime, start_value) in enumerate(equity):
+        end = max(end, start + 1)
+        while end < len(equity) and equity[end][0] - start_datetime < window:
+            end += 1
+        if end == len(equity):
+            break
+        if start_value:
+            windows.append((equity[end][1] / start_value, start_datetime, equity[end][0]))
+    windows.sort(key=lambda found: found[0], reverse=True)
+
+    best: List[Tuple[datetime, datetime]] = []
+    for _, start_datetime, end_datetime in windows:
+        if len(best) == count:
+            break
+        if all(end_datetime <= other_start or start_datetime >= other_end for other_start, other_end in best):
+            best.append((start_datetime, end_datetime))
+    return best
+
+
+def _config_report(config: Config) -> Dict[str, Any]:
+    return {attribute: getattr(config, attribute) for attribute in CHECKPOINT_CONFIG}
+
+
+def _write_json(path: str, data: Dict[str, Any]):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path + ".tmp", "w") as wfh:
+        json.dump(data, wfh, indent=2, default=str)
+    os.replace(path + ".tmp", path)
+
+
+def write_report(path: str, metrics: BacktestMetrics, run: Dict[str, Any], config: Config) -> Dict[str, Any]:
+    """
+    Write the report of `metrics`, with the `run` arguments and trade deciding `config` that produced them, as JSON
+    to `path`
+    """
+    report = {"run": run, "config": _config_report(config), **metrics.report()}
+    _write_json(path, report)
+    return report
+
+
+def write_comparison_report(path: str, managers: Dict[str, BinanceAPIManager], run: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Write the reports of strategies backtested side by side, keyed by strategy name, as JSON to `path`
+    """
+    report = {
+        "run": run,
+        "strategies": {
+            name: {"config": _config_report(manager.config), **manager.metrics.report()}
+            for name, manager in managers.items()
+        },
+    }
+    _write_json(path, report)
+    return report
@@ -0,0 +1,239 @@
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from traceback import format_exc
+from typing import Any, Dict, Iterator, List, Optional
+
+from binance.client import Client
+
+from .backtest import backtest, check_klines
+from .config import Config
+from .kline_prefetch import prefetch_klines, required_symbols
+from .kline_store import KLINE_DIR, KlineStore
+from .logger import Logger
+from .vectorized_backtest import VECTORIZED_STRATEGIES
+
+# Parameters a sweep can vary, and the Config attribute each one sets (None: an argument of `backtest`)
+SWEEP_PARAMETERS = {
+    "scout_margin": "SCOUT_MARGIN",
+    "scout_multiplier": "SCOUT_MULTIPLIER",
+    "use_margin": "USE_MARGIN",
+    "supported_coin_list": "SUPPORTED_COIN_LIST",
+    "interval": None,
+}
+# File the result table is written to
+SWEEP_RESULT_FILE = "data/sweep.csv"
+
+# read-only kline store of a worker process, opened once and shared by all its backtests
+_klines: Optional[KlineStore] = None
+
+
+def grid_configurations(grid: Dict[str, List[Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Every combination of the values listed per parameter
+    """
+    names = list(grid)
+    for values in itertools.product(*(grid[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+def random_configurations(space: Dict[str, Any], samples: int, seed: int = None) -> Iterator[Dict[str, Any]]:
+    """
+    `samples` random configurations. A parameter is either a list of values to pick from or a {"min", "max"}
+    range, sampled uniformly, as integers if both bounds are
+    """
+    rng = random.Random(seed)
+    for _ in range(samples):
+        configuration = {}
+        for name, values in space.items():
+            if isinstance(values, dict):
+                if isinstance(values["min"], int) and isinstance(values["max"], int):
+                    configuration[name] = rng.randint(values["min"], values["max"])
+                else:
+                    configuration[name] = rng.uniform(values["min"], values["max"])
+            else:
+                configuration[name] = rng.choice(values)
+        yield configuration
+
+
+def load_spec(path: str) -> Dict[str, Any]:
+    """
+    Read a sweep spec: "start" and "end" dates, and either a "grid" of values per parameter or a "random" search
+    space with the number of "samples" (and optionally a "seed")
+    """
+    with open(path) as rfh:
+        spec = json.load(rfh)
+    space = spec.get("grid", spec.get("random", None))
+    if space is None:
+        raise ValueError("A sweep spec needs a grid or a random search space")
+    unknown = set(space) - set(SWEEP_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters {sorted(unknown)}, expected some of {', '.join(SWEEP_PARAMETERS)}")
+    return spec
+
+
+def spec_configurations(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    if "grid" in spec:
+        return list(grid_configurations(spec["grid"]))
+    return list(random_configurations(spec["random"], spec.get("samples", 10), spec.get("seed", None)))
+
+
+def configure(configuration: Dict[str, Any]) -> Config:
+    """
+    The configuration of user.cfg with the swept parameters of `configuration` applied
+    """
+    config = Config()
+    for name, value in configuration.items():
+        attribute = SWEEP_PARAMETERS[name]
+        if attribute is None:
+            continue
+        if attribute == "SUPPORTED_COIN_LIST":
+            value = value.split() if isinstance(value, str) else list(value)
+        elif attribute != "USE_MARGIN":
+            value = float(value)
+        setattr(config, attribute, value)
+    return config
+
+
+def _init_worker(directory: str):
+    global _klines  # pylint: disable=global-statement
+    _klines = KlineStore(directory, readonly=True)
+
+
+def _run_configuration(
+    configuration: Dict[str, Any], start_date: datetime, end_date: datetime, vectorized: bool, offline: bool
+) -> Dict[str, Any]:
+    """
+    Backtest one configuration, returns its row of the result table
+    """
+    config = configure(configuration)
+    bridge = config.BRIDGE.symbol
+    started = time.perf_counter()
+    manager = None
+    for manager in backtest(
+        start_date,
+        end_date,
+        interval=int(configuration.get("interval", 1)),
+        config=config,
+        prefetch=False,
+        vectorized=vectorized and config.STRATEGY in VECTORIZED_STRATEGIES,
+        klines=_klines,
+        offline=offline,
+        report_path=None,
+    ):
+        pass
+
+    metrics = manager.metrics
+    return {
+        **{name: " ".join(value) if isinstance(value, list) else value for name, value in configuration.items()},
+        f"{bridge.lower()}_value": metrics.final_value,
+        "return_pct": metrics.return_pct,
+        "max_drawdown_pct": metrics.max_drawdown * 100,
+        "sharpe": metrics.sharpe,
+        "sortino": metrics.sortino,
+        "trades": len(manager.trades),
+        "fees": metrics.fees,
+        "balances": json.dumps({coin: balance for coin, balance in manager.balances.items() if balance}),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def sweep(
+    configurations: List[Dict[str, Any]],
+    start_date: datetime,
+    end_date: datetime,
+    workers: int = None,
+    vectorized: bool = True,
+    directory: str = KLINE_DIR,
+    logger: Logger = None,
+    offline: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Backtest every configuration on a pool of `workers` processes and return the result rows, best return first.
+    The klines of all of them get prefetched up front, the workers then map the store read-only, so its pages are
+    shared between them. With `offline` nothing gets downloaded and every worker runs from local data only
+    """
+    logger = logger or Logger("backtest_sweep", enable_notifications=False)
+    config = Config()
+    symbols = set()
+    for configuration in configurations:
+        symbols |= required_symbols(config, configure(configuration).SUPPORTED_COIN_LIST)
+    store = KlineStore(directory)
+    if offline:
+        check_klines(store, symbols, start_date, end_date)
+    else:
+        client = Client(config.BINANCE_API_KEY, config.BINANCE_API_SECRET_KEY, tld=config.BINANCE_TLD)
+        prefetch_klines(client, store, symbols, start_date, end_date, logger)
+    store.close()
+
+    logger.info(f"Backtesting {len(configurations)} configurations between {start_date} and {end_date}")
+    rows = []
+    with ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(directory,),
+    ) as executor:
+        futures = {
+            executor.submit(_run_configuration, configuration, start_date, end_date, vectorized, offline): configuration
+            for configuration in configurations
+        }
+        for future in as_completed(futures):
+            try:
+                rows.append(future.result())
+            except Exception:  # pylint: disable=broad-except
+                logger.error(f"Backtest of {futures[future]} failed:\n{format_exc()}")
+    rows.sort(key=lambda row: row["return_pct"] if row["return_pct"] is not None else float("-inf"), reverse=True)
+    return rows
+
+
+def write_results(rows: List[Dict[str, Any]], path: str = SWEEP_RESULT_FILE):
+    columns: List[str] = []
+    for row in rows:
+        columns.extend(column for column in row if column not in columns)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", newline="") as wfh:
+        writer = csv.DictWriter(wfh, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(args: List[str] = None):
+    parser = argparse.ArgumentParser(description="Backtest a grid or random sample of configurations in parallel")
+    parser.add_argument("spec", help="JSON sweep spec")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, default: one per core")
+    parser.add_argument("--output", default=SWEEP_RESULT_FILE, help="CSV file the result table is written to")
+    parser.add_argument(
+        "--step-by-step", action="store_true", help="scout minute by minute instead of the vectorized engine"
+    )
+    parser.add_argument("--offline", action="store_true", help="run from the local klines and exchange info only")
+    options = parser.parse_args(args)
+
+    spec = load_spec(options.spec)
+    start_date = datetime.fromisoformat(spec["start"])
+    end_date = datetime.fromisoformat(spec["end"]) if "end" in spec else datetime.today()
+    rows = sweep(
+        spec_configurations(spec),
+        start_date,
+        end_date,
+        workers=options.workers,
+        vectorized=not options.step_by_step,
+        offline=options.offline,
+    )
+    write_results(rows, options.output)
+    for row in rows:
+        print({name: round(value, 3) if isinstance(value, float) else value for name, value in row.items()})
+    print(f"{len(rows)} results written to {options.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Minutes per bar of the intervals bars can be queried in
+BAR_INTERVALS = {"1m": 1, "5m": 5, "15m": 15, "1h": 60}
+# Closed 1m bars kept in memory per symbol
+BAR_HISTORY_MINUTES = 1440
+# Seconds after the end of its minute a bar without further updates gets closed, to wait for late events
+BAR_CLOSE_DELAY = 2
+
+
+class Bar(NamedTuple):
+    open_time: float  # epoch seconds the bar starts at
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+def roll_up(bars: Iterable[Bar], minutes: int) -> List[Bar]:
+    """
+    Merge consecutive 1m `bars` into bars of `minutes` minutes, aligned to multiples of the interval
+    """
+    merged: List[Bar] = []
+    for bar in bars:
+        open_time = bar.open_time - bar.open_time % (60 * minutes)
+        if merged and merged[-1].open_time == open_time:
+            last = merged[-1]
+            merged[-1] = Bar(
+                open_time,
+                last.open,
+                max(last.high, bar.high),
+                min(last.low, bar.low),
+                bar.close,
+                last.volume + bar.volume,
+            )
+        else:
+            merged.append(bar._replace(open_time=open_time))
+    return merged
+
+
+class BarStore:
+    """
+    1m OHLCV bars built from the ticker stream, with the last `history` closed bars of every symbol kept in a
+    ring buffer. Volumes are derived from the change of the rolling 24h volume the tickers report, so they
+    are an approximation of the traded volume.
+
+    `on_close` gets called with the (symbol, bar) pairs whenever bars close.
+    """
+
+    def __init__(self, history: int = BAR_HISTORY_MINUTES):
+        self.history = history
+        self.on_close: Optional[Callable[[List[Tuple[str, Bar]]], None]] = None
+        self._closed: Dict[str, Deque[Bar]] = {}
+        self._open: Dict[str, Bar] = {}
+        self._volumes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _push(self, symbol: str, bar: Bar):
+        bars = self._closed.get(symbol, None)
+        if bars is None:
+            bars = self._closed[symbol] = deque(maxlen=self.history)
+        bars.append(bar)
+
+    def _update(self, symbol: str, price: float, total_volume: float, timestamp: float) -> Optional[Bar]:
+        open_time = timestamp - timestamp % 60
+        closed = self._closed.get(symbol, None)
+        if closed and open_time <= closed[-1].open_time:
+            # late event of a bar that already closed
+            return None
+
+        last_volume = self._volumes.get(symbol, None)
+        self._volumes[symbol] = total_volume
+        volume = max(total_volume - last_volume, 0.0) if last_volume is not None else 0.0
+
+        bar = self._open.get(symbol, None)
+        if bar is None or bar.open_time < open_time:
+            self._open[symbol] = Bar(open_time, price, price, price, price, volume)
+            if bar is not None:
+                self._push(symbol, bar)
+            return bar
+        if bar.open_time == open_time:
+            self._open[symbol] = Bar(
+                open_time, bar.open, max(bar.high, price), min(bar.low, price), price, bar.volume + volume
+            )
+        return None
+
+    def update_many(self, updates: Iterable[Tuple[str, float, float, float]]):
+        """
+        Apply (symbol, price, 24h volume, event time) ticker updates
+        """
+        closed = []
+        with self._lock:
+            for symbol, price, total_volume, timestamp in updates:
+                bar = self._update(symbol, price, total_volume, timestamp)
+                if bar is not None:
+                    closed.append((symbol, bar))
+        self._notify(closed)
+
+    def close_expired(self, now: float):
+        """
+        Close the bars whose minute ended at least BAR_CLOSE_DELAY seconds before `now`
+        """
+        closed = []
+        with self._lock:
+            for symbol, bar in list(self._open.items()):
+                if bar.open_time + 60 + BAR_CLOSE_DELAY <= now:
+                    del self._open[symbol]
+                    self._push(symbol, bar)
+                    closed.append((symbol, bar))
+        self._notify(closed)
+
+    def add(self, bars: Iterable[Tuple[str, Bar]]):
+        """
+        Store bars that were closed elsewhere
+        """
+        bars = list(bars)
+        with self._lock:
+            for symbol, bar in bars:
+                self._push(symbol, bar)
+        self._notify(bars)
+
+    def _notify(self, closed: List[Tuple[str, Bar]]):
+        if closed and self.on_close is not None:
+            self.on_close(closed)
+
+    def discard(self, symbols: Iterable[str]):
+        """
+        Forget the bars of `symbols`
+        """
+        with self._lock:
+            for symbol in symbols:
+                self._closed.pop(symbol, None)
+                self._open.pop(symbol, None)
+                self._volumes.pop(symbol, None)
+
+    def symbols(self) -> List[str]:
+        with self._lock:
+            return list(set(self._closed) | set(self._open))
+
+    def bars(self, symbol: str, interval: str = "1m", limit: int = None, include_open: bool = False) -> List[Bar]:
+        """
+        Bars of `symbol` in `interval` (one of BAR_INTERVALS), oldest first. Rolled up bars at the start of the
+        history may cover fewer minutes than the interval, as may the last one when `include_open` is set
+        """
+        minutes = BAR_INTERVALS.get(interval, None)
+        if minutes is None:
+            raise ValueError(f"Unknown bar interval {interval}, expected one of {', '.join(BAR_INTERVALS)}")
+        with self._lock:
+            bars = list(self._closed.get(symbol, ()))
+            if include_open and symbol in self._open:
+                bars.append(self._open[symbol])
+        if minutes > 1:
+            bars = roll_up(bars, minutes)
+        return bars[-limit:] if limit else bars
@@ -1,23 +1,45 @@
-import math
+import threading
 import time
 import traceback
-from typing import Dict, Optional
+from datetime import datetime
+from decimal import ROUND_CEILING, ROUND_FLOOR, Decimal
+from typing import Dict, List, Optional, Tuple
 
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
 from cachetools import TTLCache, cached
 
-from .binance_stream_manager import BinanceCache, BinanceOrder, BinanceStreamManager, OrderGuard
+from .bar_store import Bar
+from .binance_stream_manager import TERMINAL_ORDER_STATES, BinanceCache, BinanceOrder, BinanceStreamManager, OrderGuard
 from .config import Config
 from .database import Database
 from .logger import Logger
+from .market_data_ingester import IngestedStreamManager
 from .models import Coin
+from .order_book import OrderBook
+from .order_rules import (
+    BALANCE_REFRESH_INTERVAL,
+    BALANCE_SETTLE_TIMEOUT,
+    ORDER_ATTEMPTS,
+    alt_tick,
+    buy_quantity,
+    format_amount,
+    log_failed_attempt,
+    sell_quantity,
+    should_cancel_order,
+)
+
+# How many orders a non-limit execution mode may place to complete one jump (partial IOC fills, rejected makers)
+EXECUTION_ATTEMPTS = 3
 
 
 class BinanceAPIManager:
-    def __init__(self, config: Config, db: Database, logger: Logger):
+    # whether orders are only simulated, as in backtests and replays
+    simulated = False
+
+    def __init__(self, config: Config, db: Database, logger: Logger, binance_client: Client = None):
         # initializing the client class calls `ping` API endpoint, verifying the connection
-        self.binance_client = Client(
+        self.binance_client = binance_client or Client(
             config.BINANCE_API_KEY,
             config.BINANCE_API_SECRET_KEY,
             tld=config.BINANCE_TLD,
@@ -27,17 +49,36 @@ class BinanceAPIManager:
         self.config = config
 
         self.cache = BinanceCache()
+        self._balances_refresh_mutex = threading.Lock()
+        self._last_balances_refresh = 0.0
         self.stream_manager: Optional[BinanceStreamManager] = None
         self.setup_websockets()
 
     def setup_websockets(self):
-        self.stream_manager = BinanceStreamManager(
+        self.cache.bars.on_close = self.db.queue_bars
+        stream_manager_class = IngestedStreamManager if self.config.INGESTER_PROCESS == "yes" else BinanceStreamManager
+        self.stream_manager = stream_manager_class(
             self.cache,
             self.config,
             self.binance_client,
             self.logger,
         )
 
+    def update_subscriptions(self):
+        """
+        Follow the symbols of the current supported coin list
+        """
+        self.stream_manager.update_subscriptions(self.config.SUPPORTED_COIN_LIST)
+
+    def close(self):
+        self.stream_manager.close()
+
+    def now(self) -> datetime:
+        """
+        Current time, the simulated one in backtests
+        """
+        return datetime.now()
+
     @cached(cache=TTLCache(maxsize=1, ttl=43200))
     def get_trade_fees(self) -> Dict[str, float]:
         return {ticker["symbol"]: float(ticker["takerCommission"]) for ticker in self.binance_client.get_trade_fee()}
@@ -85,10 +126,10 @@ class BinanceAPIManager:
         """
         price = self.cache.ticker_values.get(ticker_symbol, None)
         if price is None and ticker_symbol not in self.cache.non_existent_tickers:
-            self.cache.ticker_values = {
-                ticker["symbol"]: float(ticker["price"]) for ticker in self.binance_client.get_symbol_ticker()
-            }
-            self.logger.debug(f"Fetched all ticker prices: {self.cache.ticker_values}")
+            self.cache.ticker_values.update_many(
+                (ticker["symbol"], float(ticker["price"])) for ticker in self.binance_client.get_symbol_ticker()
+            )
+            self.logger.debug(f"Fetched all ticker prices: {self.cache.ticker_values.items()}")
             price = self.cache.ticker_values.get(ticker_symbol, None)
             if price is None:
                 self.logger.info(f"Ticker does not exist: {ticker_symbol} - will not be fetched from now on")
@@ -100,32 +141,63 @@ class BinanceAPIManager:
         """
         Get balance of a specific coin
         """
+        if not force:
+            with self.cache.open_balances() as cache_balances:
+                balance = cache_balances.get(currency_symbol, None)
+                if balance is not None:
+                    return balance.free
+
+        self._refresh_balances()
         with self.cache.open_balances() as cache_balances:
             balance = cache_balances.get(currency_symbol, None)
-            if force or balance is None:
-                cache_balances.clear()
-                cache_balances.update(
-                    {
-                        currency_balance["asset"]: float(currency_balance["free"])
-                        for currency_balance in self.binance_client.get_account()["balances"]
-                    }
-                )
-                self.logger.debug(f"Fetched all balances: {cache_balances}")
-                if currency_symbol not in cache_balances:
-                    cache_balances[currency_symbol] = 0.0
-                    return 0.0
-                return cache_balances.get(currency_symbol, 0.0)
+        if balance is None:
+            # not held at all, any update from the stream or a later snapshot supersedes this entry
+            self.cache.update_balances({currency_symbol: 0.0}, 0)
+            return 0.0
+        return balance.free
 
-            return balance
+    def _refresh_balances(self):
+        """
+        Reconcile cached balances with a REST account snapshot, at most once per BALANCE_REFRESH_INTERVAL
+        """
+        requested = time.monotonic()
+        with self._balances_refresh_mutex:
+            if self._last_balances_refresh > requested:
+                # someone else refreshed while we were waiting for the mutex
+                return
+            delay = self._last_balances_refresh + BALANCE_REFRESH_INTERVAL - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            account = self.binance_client.get_account()
+            self._last_balances_refresh = time.monotonic()
+
+        balances = {
+            currency_balance["asset"]: float(currency_balance["free"]) for currency_balance in account["balances"]
+        }
+        self.logger.debug(f"Fetched all balances: {balances}")
+        self.cache.update_balances(balances, account["updateTime"])
+
+    def _wait_for_balance_settlement(self, currency_symbol: str, origin_balance: float) -> float:
+        """
+        Wait for the user data stream to report a balance below `origin_balance`, falling back to a
+        single REST reconciliation once BALANCE_SETTLE_TIMEOUT passes
+        """
+        new_balance = self.cache.wait_for_balance(
+            currency_symbol, lambda free: free < origin_balance, BALANCE_SETTLE_TIMEOUT
+        )
+        if new_balance is None:
+            self.logger.debug(f"No settled {currency_symbol} balance from the stream, reconciling over REST")
+            new_balance = self.get_currency_balance(currency_symbol, True)
+            if new_balance >= origin_balance:
+                self.logger.warning(f"{currency_symbol} balance has not settled yet: {new_balance}")
+        return new_balance
 
     def retry(self, func, *args, **kwargs):
-        for attempt in range(20):
+        for attempt in range(ORDER_ATTEMPTS):
             try:
                 return func(*args, **kwargs)
             except Exception:  # pylint: disable=broad-except
-                self.logger.warning(f"Failed to Buy/Sell. Trying Again (attempt {attempt}/20)")
-                if attempt == 0:
-                    self.logger.warning(traceback.format_exc())
+                log_failed_attempt(self.logger, attempt, traceback.format_exc())
                 time.sleep(1)
         return None
 
@@ -138,15 +210,57 @@ class BinanceAPIManager:
 
     @cached(cache=TTLCache(maxsize=2000, ttl=43200))
     def get_alt_tick(self, origin_symbol: str, target_symbol: str):
-        step_size = self.get_symbol_filter(origin_symbol, target_symbol, "LOT_SIZE")["stepSize"]
-        if step_size.find("1") == 0:
-            return 1 - step_size.find(".")
-        return step_size.find("1") - 1
+        return alt_tick(self.get_symbol_filter(origin_symbol, target_symbol, "LOT_SIZE")["stepSize"])
 
     @cached(cache=TTLCache(maxsize=2000, ttl=43200))
     def get_min_notional(self, origin_symbol: str, target_symbol: str):
         return float(self.get_symbol_filter(origin_symbol, target_symbol, "NOTIONAL")["minNotional"])
 
+    @cached(cache=TTLCache(maxsize=2000, ttl=43200))
+    def get_price_tick_size(self, origin_symbol: str, target_symbol: str) -> Decimal:
+        return Decimal(self.get_symbol_filter(origin_symbol, target_symbol, "PRICE_FILTER")["tickSize"]).normalize()
+
+    def get_bars(self, ticker_symbol: str, interval: str = "1m", limit: int = None) -> List[Bar]:
+        """
+        Get the closed bars of a symbol built from the ticker stream, oldest first. `interval` is one of
+        1m, 5m, 15m or 1h
+        """
+        return self.cache.bars.bars(ticker_symbol, interval, limit)
+
+    def get_order_book(self, ticker_symbol: str) -> Optional[OrderBook]:
+        """
+        Get the local order book mirror of a symbol, None if it isn't mirrored or currently out of sync
+        """
+        book = self.cache.order_books.get(ticker_symbol, None)
+        if book is None or not book.synced:
+            return None
+        return book
+
+    def get_best_bid_ask(self, ticker_symbol: str) -> Tuple[float, float]:
+        """
+        Get the best bid and ask price of a symbol
+        """
+        book = self.get_order_book(ticker_symbol)
+        if book is not None:
+            bid, ask = book.best_bid(), book.best_ask()
+            if bid is not None and ask is not None:
+                return bid, ask
+        book_ticker = self.cache.book_tickers.get(ticker_symbol, None)
+        if book_ticker is not None:
+            return book_ticker
+        ticker = self.binance_client.get_orderbook_ticker(symbol=ticker_symbol)
+        return float(ticker["bidPrice"]), float(ticker["askPrice"])
+
+    def _limit_order_price(self, ticker_symbol: str, side: str, quantity: float, fallback: float) -> float:
+        """
+        Price at which a limit order of `quantity` fills against the mirrored book, `fallback` without one
+        """
+        book = self.get_order_book(ticker_symbol)
+        if book is None:
+            return fallback
+        price = book.limit_price(quantity, side)
+        return price if price is not None else fallback
+
     def _wait_for_order(
         self, order_id, origin_symbol: str, target_symbol: str
     ) -> Optional[BinanceOrder]:  # pylint: disable=unsubscriptable-object
@@ -192,6 +306,11 @@ class BinanceAPIManager:
                     self.logger.info("Order is canceled, going back to scouting mode...")
                     return None
 
+                if order_status.status in ("EXPIRED", "REJECTED"):
+                    # IOC orders expire with whatever they could fill, the caller decides what to do with a partial
+                    self.logger.info(f"Order {order_status.status.lower()} after filling {order_status.filled_qty}")
+                    return order_status if order_status.filled_qty > 0 else None
+
                 time.sleep(1)
             except BinanceAPIException as e:
                 self.logger.info(e)
@@ -210,27 +329,14 @@ class BinanceAPIManager:
             return self._wait_for_order(order_id, origin_symbol, target_symbol)
 
     def _should_cancel_order(self, order_status):
-        minutes = (time.time() - order_status.time / 1000) / 60
-        timeout = 0
-
-        if order_status.side == "SELL":
-            timeout = float(self.config.SELL_TIMEOUT)
-        else:
-            timeout = float(self.config.BUY_TIMEOUT)
+        return should_cancel_order(order_status, self.config, lambda: self._current_ask(order_status.symbol))
 
-        if timeout and minutes > timeout and order_status.status == "NEW":
-            return True
-
-        if timeout and minutes > timeout and order_status.status == "PARTIALLY_FILLED":
-            if order_status.side == "SELL":
-                return True
-
-            if order_status.side == "BUY":
-                current_price = self.get_ticker_price(order_status.symbol)
-                if float(current_price) * (1 - 0.001) > float(order_status.price):
-                    return True
-
-        return False
+    def _current_ask(self, ticker_symbol: str) -> Optional[float]:
+        book = self.get_order_book(ticker_symbol)
+        current_price = book.best_ask() if book is not None else None
+        if current_price is None:
+            current_price = self.get_ticker_price(ticker_symbol)
+        return current_price
 
     def buy_alt(self, origin_coin: Coin, target_coin: Coin) -> BinanceOrder:
         return self.retry(self._buy_alt, origin_coin, target_coin)
@@ -245,8 +351,7 @@ class BinanceAPIManager:
         target_balance = target_balance or self.get_currency_balance(target_symbol)
         from_coin_price = from_coin_price or self.get_ticker_price(origin_symbol + target_symbol)
 
-        origin_tick = self.get_alt_tick(origin_symbol, target_symbol)
-        return math.floor(target_balance * 10**origin_tick / from_coin_price) / float(10**origin_tick)
+        return buy_quantity(target_balance, from_coin_price, self.get_alt_tick(origin_symbol, target_symbol))
 
     def _buy_alt(self, origin_coin: Coin, target_coin: Coin):  # pylint: disable=too-many-locals
         """
@@ -262,15 +367,26 @@ class BinanceAPIManager:
         origin_balance = self.get_currency_balance(origin_symbol)
         target_balance = self.get_currency_balance(target_symbol)
         pair_info = self.binance_client.get_symbol_info(origin_symbol + target_symbol)
+        if self.config.EXECUTION_MODE != "limit":
+            return self._execute_jump_order(
+                trade_log, Client.SIDE_BUY, origin_symbol, target_symbol, pair_info, origin_balance, target_balance
+            )
+
         from_coin_price = self.get_ticker_price(origin_symbol + target_symbol)
-        from_coin_price_s = "{:0.0{}f}".format(from_coin_price, pair_info["quotePrecision"])
+        # price the order at the ask level deep enough to fill it, the ticker only knows the last trade
+        estimated_quantity = self._buy_quantity(origin_symbol, target_symbol, target_balance, from_coin_price)
+        from_coin_price = self._limit_order_price(
+            origin_symbol + target_symbol, Client.SIDE_BUY, estimated_quantity, from_coin_price
+        )
+        from_coin_price_s = format_amount(from_coin_price, pair_info["quotePrecision"])
 
         order_quantity = self._buy_quantity(origin_symbol, target_symbol, target_balance, from_coin_price)
-        order_quantity_s = "{:0.0{}f}".format(order_quantity, pair_info["baseAssetPrecision"])
+        order_quantity_s = format_amount(order_quantity, pair_info["baseAssetPrecision"])
 
         self.logger.info(f"BUY QTY {order_quantity}")
 
         # Try to buy until successful
+        started = time.time()
         order = None
         order_guard = self.stream_manager.acquire_order_guard()
         while order is None:
@@ -286,6 +402,7 @@ class BinanceAPIManager:
                 time.sleep(1)
             except Exception as e:  # pylint: disable=broad-except
                 self.logger.warning(f"Unexpected Error: {e}")
+                time.sleep(1)
 
         trade_log.set_ordered(origin_balance, target_balance, order_quantity)
 
@@ -297,7 +414,7 @@ class BinanceAPIManager:
 
         self.logger.info(f"Bought {origin_symbol}")
 
-        trade_log.set_complete(order.cumulative_quote_qty)
+        trade_log.set_complete(order.cumulative_quote_qty, "limit", time.time() - started)
 
         return order
 
@@ -307,8 +424,7 @@ class BinanceAPIManager:
     def _sell_quantity(self, origin_symbol: str, target_symbol: str, origin_balance: float = None):
         origin_balance = origin_balance or self.get_currency_balance(origin_symbol)
 
-        origin_tick = self.get_alt_tick(origin_symbol, target_symbol)
-        return math.floor(origin_balance * 10**origin_tick) / float(10**origin_tick)
+        return sell_quantity(origin_balance, self.get_alt_tick(origin_symbol, target_symbol))
 
     def _sell_alt(self, origin_coin: Coin, target_coin: Coin):  # pylint: disable=too-many-locals
         """
@@ -325,14 +441,24 @@ class BinanceAPIManager:
         target_balance = self.get_currency_balance(target_symbol)
 
         pair_info = self.binance_client.get_symbol_info(origin_symbol + target_symbol)
-        from_coin_price = self.get_ticker_price(origin_symbol + target_symbol)
-        from_coin_price_s = "{:0.0{}f}".format(from_coin_price, pair_info["quotePrecision"])
+        if self.config.EXECUTION_MODE != "limit":
+            return self._execute_jump_order(
+                trade_log, Client.SIDE_SELL, origin_symbol, target_symbol, pair_info, origin_balance, target_balance
+            )
 
         order_quantity = self._sell_quantity(origin_symbol, target_symbol, origin_balance)
-        order_quantity_s = "{:0.0{}f}".format(order_quantity, pair_info["baseAssetPrecision"])
+        from_coin_price = self._limit_order_price(
+            origin_symbol + target_symbol,
+            Client.SIDE_SELL,
+            order_quantity,
+            self.get_ticker_price(origin_symbol + target_symbol),
+        )
+        from_coin_price_s = format_amount(from_coin_price, pair_info["quotePrecision"])
+        order_quantity_s = format_amount(order_quantity, pair_info["baseAssetPrecision"])
         self.logger.info(f"Selling {order_quantity} of {origin_symbol}")
 
         self.logger.info(f"Balance is {origin_balance}")
+        started = time.time()
         order = None
         order_guard = self.stream_manager.acquire_order_guard()
         while order is None:
@@ -354,16 +480,149 @@ class BinanceAPIManager:
         if order is None:
             return None
 
-        new_balance = self.get_currency_balance(origin_symbol)
-        while new_balance >= origin_balance:
-            new_balance = self.get_currency_balance(origin_symbol, True)
+        self._wait_for_balance_settlement(origin_symbol, origin_balance)
 
         self.logger.info(f"Sold {origin_symbol}")
 
-        trade_log.set_complete(order.cumulative_quote_qty)
+        trade_log.set_complete(order.cumulative_quote_qty, "limit", time.time() - started)
+
+        return order
+
+    def _execution_price(  # pylint: disable=too-many-arguments
+        self, side: str, origin_symbol: str, target_symbol: str, reference_price: float, bid: float, ask: float
+    ) -> Decimal:
+        """
+        Price for the configured execution mode, rounded to the symbol's tick size. Market orders are bounded by
+        `max_slippage` from the scouted `reference_price`, rounded towards it
+        """
+        mode = self.config.EXECUTION_MODE
+        tick_size = self.get_price_tick_size(origin_symbol, target_symbol)
+        if mode == "market":
+            max_slippage = Decimal(str(self.config.MAX_SLIPPAGE)) / 100
+            if side == Client.SIDE_BUY:
+                price, rounding = Decimal(str(reference_price)) * (1 + max_slippage), ROUND_FLOOR
+            else:
+                price, rounding = Decimal(str(reference_price)) * (1 - max_slippage), ROUND_CEILING
+        elif mode == "limit_maker":
+            # rest on our own side of the book so the order can only ever be a maker
+            if side == Client.SIDE_BUY:
+                price, rounding = Decimal(str(bid)), ROUND_FLOOR
+            else:
+                price, rounding = Decimal(str(ask)), ROUND_CEILING
+        elif side == Client.SIDE_BUY:
+            price, rounding = Decimal(str(ask)) + tick_size * self.config.IOC_TICKS, ROUND_CEILING
+        else:
+            price, rounding = Decimal(str(bid)) - tick_size * self.config.IOC_TICKS, ROUND_FLOOR
+        return (price / tick_size).to_integral_value(rounding) * tick_size
+
+    def _within_slippage(self, side: str, reference_price: float, bid: float, ask: float) -> bool:
+        max_slippage = self.config.MAX_SLIPPAGE / 100
+        if side == Client.SIDE_BUY:
+            return ask <= reference_price * (1 + max_slippage)
+        return bid >= reference_price * (1 - max_slippage)
+
+    def _place_jump_order(self, side: str, symbol: str, quantity_s: str, price: Decimal):
+        params = {
+            "symbol": symbol,
+            "side": side,
+            "quantity": quantity_s,
+            "price": f"{price:f}",
+            "newOrderRespType": "FULL",
+        }
+        if self.config.EXECUTION_MODE == "limit_maker":
+            params["type"] = Client.ORDER_TYPE_LIMIT_MAKER
+        else:
+            # market orders are sent as IOC limit orders at the slippage bound, the exchange cancels what can't
+            # fill within it
+            params.update(type=Client.ORDER_TYPE_LIMIT, timeInForce=Client.TIME_IN_FORCE_IOC)
+        return self.binance_client.create_order(**params)
+
+    def _execute_jump_order(  # pylint: disable=too-many-arguments,too-many-locals
+        self,
+        trade_log,
+        side: str,
+        origin_symbol: str,
+        target_symbol: str,
+        pair_info: dict,
+        origin_balance: float,
+        target_balance: float,
+    ) -> Optional[BinanceOrder]:
+        """
+        Buy or sell `origin_symbol` with the configured aggressive execution mode, topping up partial fills
+        """
+        mode = self.config.EXECUTION_MODE
+        symbol = origin_symbol + target_symbol
+        reference_price = self.get_ticker_price(symbol)
+        min_notional = self.get_min_notional(origin_symbol, target_symbol)
+        started = time.time()
+        filled_qty = filled_quote = 0.0
+        last_order = None
+
+        for _ in range(EXECUTION_ATTEMPTS):
+            bid, ask = self.get_best_bid_ask(symbol)
+            if mode == "market" and not self._within_slippage(side, reference_price, bid, ask):
+                self.logger.info(f"{symbol} moved more than {self.config.MAX_SLIPPAGE}% from {reference_price}")
+                break
+
+            price = self._execution_price(side, origin_symbol, target_symbol, reference_price, bid, ask)
+            if mode == "market":
+                expected_price = ask if side == Client.SIDE_BUY else bid
+            else:
+                expected_price = float(price)
+            if side == Client.SIDE_BUY:
+                remaining = target_balance - filled_quote
+                quantity = self._buy_quantity(origin_symbol, target_symbol, remaining, expected_price)
+            else:
+                remaining = origin_balance - filled_qty
+                quantity = self._sell_quantity(origin_symbol, target_symbol, remaining)
+            if remaining <= 0 or quantity * expected_price < min_notional:
+                break
+            quantity_s = format_amount(quantity, pair_info["baseAssetPrecision"])
+            self.logger.info(f"{side} {quantity_s} {symbol} ({mode} @ {price})")
+
+            order_guard = self.stream_manager.acquire_order_guard()
+            try:
+                response = self._place_jump_order(side, symbol, quantity_s, price)
+            except BinanceAPIException as e:
+                order_guard.release()
+                if mode == "limit_maker" and e.code == -2010:
+                    # the book moved through our price and the order would have taken, price it again
+                    self.logger.info(f"Maker order rejected, repricing: {e}")
+                    continue
+                raise
+            self.logger.info(response)
+            if last_order is None:
+                trade_log.set_ordered(origin_balance, target_balance, quantity)
+
+            order_guard.set_order(origin_symbol, target_symbol, int(response["orderId"]))
+            if response["status"] in TERMINAL_ORDER_STATES:
+                # IOC and market orders are final in the response, no need to wait for the execution report
+                with order_guard:
+                    order = BinanceOrder.from_rest(response)
+            else:
+                order = self.wait_for_order(response["orderId"], origin_symbol, target_symbol, order_guard)
+            if order is None:
+                break
+
+            last_order = order
+            filled_qty += order.filled_qty
+            filled_quote += order.cumulative_quote_qty
+            if order.status == "FILLED" or mode == "limit_maker":
+                break
+
+        if filled_qty <= 0:
+            return None
+
+        fill_time = time.time() - started
+        order = last_order.with_fills(filled_qty, filled_quote)
+        if side == Client.SIDE_SELL:
+            self._wait_for_balance_settlement(origin_symbol, origin_balance)
+        self.logger.info(f"{side} {origin_symbol} filled in {fill_time:.2f}s ({mode})")
+
+        trade_log.set_complete(filled_quote, mode, fill_time)
 
         return order
-    
+
     def get_all_coins(self):
         """
         Retrieve all unique coins available on Binance.
@@ -371,14 +630,14 @@ class BinanceAPIManager:
         try:
             # Fetch exchange information for all symbols
             exchange_info = self.binance_client.get_exchange_info()
-            symbols = exchange_info['symbols']
-            
+            symbols = exchange_info["symbols"]
+
             # Use a set to collect unique coins
             coins = set()
             for symbol in symbols:
-                coins.add(symbol['baseAsset'])
-                coins.add(symbol['quoteAsset'])
-            
+                coins.add(symbol["baseAsset"])
+                coins.add(symbol["quoteAsset"])
+
             # Log the results
             self.logger.info(f"Retrieved {len(coins)} unique coins.")
             return sorted(coins)  # Return sorted list of coins
@@ -388,4 +647,3 @@ class BinanceAPIManager:
         except Exception as e:
             self.logger.error(f"Unexpected error: {e}")
             return []
-
@@ -1,15 +1,35 @@
+import queue
 import sys
 import threading
 import time
+from collections import OrderedDict, defaultdict
 from contextlib import contextmanager
-from typing import Dict, Set, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 import binance.client
 from binance.exceptions import BinanceAPIException, BinanceRequestException
 from unicorn_binance_websocket_api import BinanceWebSocketApiManager
 
+from .bar_store import BarStore
 from .config import Config
 from .logger import Logger
+from .order_book import OrderBook
+from .stream_decoder import StreamDecoder
+from .stream_recorder import StreamRecorder
+from .stream_watchdog import StreamWatchdog
+from .subscription_manager import SubscriptionManager
+from .ticker_store import TickerStore
+
+# Order states after which the exchange won't fill an order any further
+TERMINAL_ORDER_STATES = ("FILLED", "CANCELED", "EXPIRED", "REJECTED")
+# Most stream messages the processor handles per wake-up
+STREAM_BATCH_SIZE = 100
+# How long the processor blocks on an empty queue before checking whether the manager is stopping
+STREAM_QUEUE_TIMEOUT = 1
+# Seconds between two stream processor metric reports
+STREAM_METRICS_INTERVAL = 60
+# Seconds between two checks for bars whose minute is over
+BAR_CLOSE_INTERVAL = 1
 
 
 class BinanceOrder:  # pylint: disable=too-few-public-methods
@@ -19,27 +39,202 @@ class BinanceOrder:  # pylint: disable=too-few-public-methods
         self.side = report["side"]
         self.order_type = report["order_type"]
         self.id = report["order_id"]
+        # a cancel report carries the id of the cancel request in `client_order_id` and the order's own in
+        # `original_client_order_id`
+        self.client_order_id = report.get("original_client_order_id") or report.get("client_order_id")
         self.cumulative_quote_qty = float(report["cumulative_quote_asset_transacted_quantity"])
+        self.filled_qty = float(report.get("cumulative_filled_quantity") or 0)
         self.status = report["current_order_status"]
         self.price = float(report["order_price"])
         self.time = report["transaction_time"]
 
+    @classmethod
+    def from_rest(cls, order: dict) -> "BinanceOrder":
+        """
+        Build an order from a REST order response, using the same fields as an executionReport
+        """
+        return cls(
+            {
+                "symbol": order["symbol"],
+                "side": order["side"],
+                "order_type": order["type"],
+                "order_id": order["orderId"],
+                "client_order_id": order.get("clientOrderId"),
+                "cumulative_quote_asset_transacted_quantity": float(order["cummulativeQuoteQty"]),
+                "current_order_status": order["status"],
+                "order_price": float(order["price"]),
+                "cumulative_filled_quantity": float(order["executedQty"]),
+                # order queries carry `time`, order placement responses `transactTime`
+                "transaction_time": order.get("time", order.get("transactTime")),
+            }
+        )
+
+    def with_fills(self, filled_qty: float, cumulative_quote_qty: float) -> "BinanceOrder":
+        """
+        Copy of this order reporting the combined fills of several orders, priced at their average
+        """
+        report = dict(self.event)
+        report["cumulative_filled_quantity"] = filled_qty
+        report["cumulative_quote_asset_transacted_quantity"] = cumulative_quote_qty
+        report["order_price"] = cumulative_quote_qty / filled_qty
+        return BinanceOrder(report)
+
+    @property
+    def terminal(self) -> bool:
+        return self.status in TERMINAL_ORDER_STATES
+
     def __repr__(self):
         return f"<BinanceOrder {self.event}>"
 
 
+class OrderStore:
+    """
+    Orders by id, indexed by symbol and client order id. Open orders are kept until they reach a terminal
+    state, terminal ones are evicted least recently used first once there are more than `maxsize` of them,
+    or `ttl` seconds after they finished.
+    """
+
+    def __init__(self, maxsize: int = 1000, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._orders: Dict[int, BinanceOrder] = {}
+        # terminal order ids in least recently used order, with the time they finished
+        self._terminal: "OrderedDict[int, float]" = OrderedDict()
+        self._by_symbol: Dict[str, Set[int]] = defaultdict(set)
+        self._by_client_order_id: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def put(self, order: BinanceOrder):
+        with self._lock:
+            current = self._orders.get(order.id, None)
+            if current is not None and current.terminal and not order.terminal:
+                # a stale REST snapshot racing the stream, the order is already done
+                return
+            self._orders[order.id] = order
+            self._by_symbol[order.symbol].add(order.id)
+            if order.client_order_id:
+                self._by_client_order_id[order.client_order_id] = order.id
+            if order.terminal:
+                self._terminal[order.id] = self._terminal.get(order.id, time.monotonic())
+                self._terminal.move_to_end(order.id)
+            self._evict()
+
+    def get(self, order_id: int, default: Optional[BinanceOrder] = None) -> Optional[BinanceOrder]:
+        with self._lock:
+            order = self._orders.get(order_id, None)
+            if order is None:
+                return default
+            if order_id in self._terminal:
+                self._terminal.move_to_end(order_id)
+            return order
+
+    def by_client_order_id(self, client_order_id: str) -> Optional[BinanceOrder]:
+        with self._lock:
+            order_id = self._by_client_order_id.get(client_order_id, None)
+            return self._orders.get(order_id, None) if order_id is not None else None
+
+    def by_symbol(self, symbol: str) -> List[BinanceOrder]:
+        with self._lock:
+            return [self._orders[order_id] for order_id in self._by_symbol.get(symbol, ())]
+
+    def open_orders(self) -> List[BinanceOrder]:
+        with self._lock:
+            return [order for order in self._orders.values() if not order.terminal]
+
+    def _evict(self):
+        expired_before = time.monotonic() - self.ttl
+        while self._terminal:
+            order_id, finished = next(iter(self._terminal.items()))
+            if len(self._terminal) <= self.maxsize and finished >= expired_before:
+                break
+            self._terminal.popitem(last=False)
+            self._remove(order_id)
+
+    def _remove(self, order_id: int):
+        order = self._orders.pop(order_id)
+        symbol_orders = self._by_symbol[order.symbol]
+        symbol_orders.discard(order_id)
+        if not symbol_orders:
+            del self._by_symbol[order.symbol]
+        if self._by_client_order_id.get(order.client_order_id, None) == order_id:
+            del self._by_client_order_id[order.client_order_id]
+
+    def __setitem__(self, order_id: int, order: BinanceOrder):
+        self.put(order)
+
+    def __contains__(self, order_id: int) -> bool:
+        with self._lock:
+            return order_id in self._orders
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._orders)
+
+
+class BinanceBalance:  # pylint: disable=too-few-public-methods
+    def __init__(self, free: float, update_time: int):
+        self.free = free
+        # exchange-side account update time (ms), used to order stream events against REST snapshots
+        self.update_time = update_time
+        # local time the entry was written, used to judge its freshness
+        self.timestamp = time.time()
+
+    def age(self) -> float:
+        return time.time() - self.timestamp
+
+    def __repr__(self):
+        return f"<BinanceBalance {self.free} @ {self.update_time}>"
+
+
 class BinanceCache:  # pylint: disable=too-few-public-methods
-    ticker_values: Dict[str, float] = {}
-    _balances: Dict[str, float] = {}
+    ticker_values: TickerStore = TickerStore()
+    # best (bid, ask) of the subscribed symbols
+    book_tickers: Dict[str, Tuple[float, float]] = {}
+    _balances: Dict[str, BinanceBalance] = {}
     _balances_mutex: threading.Lock = threading.Lock()
+    _balances_changed: threading.Condition = threading.Condition(_balances_mutex)
     non_existent_tickers: Set[str] = set()
-    orders: Dict[str, BinanceOrder] = {}
+    orders: OrderStore = OrderStore()
+    order_books: Dict[str, OrderBook] = {}
+    bars: BarStore = BarStore()
 
     @contextmanager
     def open_balances(self):
         with self._balances_mutex:
             yield self._balances
 
+    def update_balances(self, balances: Dict[str, float], update_time: int):
+        """
+        Store free balances reported at `update_time`, keeping any entry that is already newer
+        """
+        with self._balances_changed:
+            for asset, free in balances.items():
+                entry = self._balances.get(asset, None)
+                if entry is None or entry.update_time <= update_time:
+                    self._balances[asset] = BinanceBalance(free, update_time)
+            self._balances_changed.notify_all()
+
+    def invalidate_balance(self, asset: str):
+        with self._balances_changed:
+            self._balances.pop(asset, None)
+            self._balances_changed.notify_all()
+
+    def wait_for_balance(self, asset: str, predicate: Callable[[float], bool], timeout: float) -> Optional[float]:
+        """
+        Block until the cached free balance of `asset` satisfies `predicate` or `timeout` seconds pass.
+        Returns the balance, or None on timeout
+        """
+        deadline = time.monotonic() + timeout
+        with self._balances_changed:
+            while True:
+                entry = self._balances.get(asset, None)
+                if entry is not None and predicate(entry.free):
+                    return entry.free
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._balances_changed.wait(remaining)
+
 
 class OrderGuard:
     def __init__(self, pending_orders: Set[Tuple[str, int]], mutex: threading.Lock):
@@ -53,6 +248,12 @@ class OrderGuard:
     def set_order(self, origin_symbol: str, target_symbol: str, order_id: int):
         self.tag = (origin_symbol + target_symbol, order_id)
 
+    def release(self):
+        """
+        Give the guard up without an order, e.g. when placing the order failed
+        """
+        self.mutex.release()
+
     def __enter__(self):
         try:
             if self.tag is None:
@@ -65,6 +266,49 @@ class OrderGuard:
         self.pending_orders.remove(self.tag)
 
 
+class StreamMetrics:
+    """
+    Queue depth and processing lag of the stream processor, accumulated between two reports
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.started = time.monotonic()
+        self.messages = 0
+        self.batches = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+
+    def record_batch(self, lags: List[float], queue_depth: int):
+        with self.lock:
+            self.messages += len(lags)
+            self.batches += 1
+            self.queue_depth = queue_depth
+            self.max_queue_depth = max(self.max_queue_depth, queue_depth)
+            self.total_lag += sum(lags)
+            self.max_lag = max(self.max_lag, max(lags))
+
+    def snapshot(self, reset: bool = False) -> dict:
+        with self.lock:
+            snapshot = {
+                "interval": time.monotonic() - self.started,
+                "messages": self.messages,
+                "batches": self.batches,
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "avg_lag": self.total_lag / self.messages if self.messages else 0.0,
+                "max_lag": self.max_lag,
+            }
+            if reset:
+                self._reset()
+            return snapshot
+
+
 class BinanceStreamManager:
     def __init__(
         self,
@@ -75,17 +319,20 @@ class BinanceStreamManager:
     ):
         self.cache = cache
         self.logger = logger
+        # raw stream data and signals in arrival order, with the time they were received
+        self._stream_queue: queue.Queue = queue.Queue()
+        self.metrics = StreamMetrics()
+        # payloads are decoded on the processor thread, so they can be recorded as they were received
+        self._decode = StreamDecoder(f"binance.{config.BINANCE_TLD}")
+        self.recorder: Optional[StreamRecorder] = None
+        if config.STREAM_RECORD_DIR:
+            self.recorder = StreamRecorder(config.STREAM_RECORD_DIR)
         self.bw_api_manager = BinanceWebSocketApiManager(
-            output_default="UnicornFy",
-            enable_stream_signal_buffer=True,
+            process_stream_data=self._on_stream_data,
+            process_stream_signals=self._on_stream_signal,
+            output_default="raw_data",
             exchange=f"binance.{config.BINANCE_TLD}",
         )
-        self.bw_api_manager.create_stream(
-            ["arr"],
-            ["!miniTicker"],
-            api_key=config.BINANCE_API_KEY,
-            api_secret=config.BINANCE_API_SECRET_KEY,
-        )
         self.bw_api_manager.create_stream(
             ["arr"],
             ["!userData"],
@@ -93,11 +340,49 @@ class BinanceStreamManager:
             api_secret=config.BINANCE_API_SECRET_KEY,
         )
         self.binance_client = binance_client
+        self.config = config
         self.pending_orders: Set[Tuple[str, int]] = set()
         self.pending_orders_mutex: threading.Lock = threading.Lock()
+
+        self._book_resync_queue: queue.Queue = queue.Queue()
+        self.subscriptions = SubscriptionManager(self.bw_api_manager, binance_client, config, logger)
+        self.update_subscriptions(config.SUPPORTED_COIN_LIST)
+        if config.ORDER_BOOK_DEPTH:
+            self._bookResyncThread = threading.Thread(target=self._order_book_resync_worker, daemon=True)
+            self._bookResyncThread.start()
+
+        self.watchdog: Optional[StreamWatchdog] = None
+        if config.STREAM_STALL_TIMEOUT:
+            self.watchdog = StreamWatchdog(
+                self.bw_api_manager,
+                self.subscriptions,
+                binance_client,
+                self.cache.ticker_values,
+                logger,
+                config.STREAM_STALL_TIMEOUT,
+                self._reset_order_books,
+            )
+
         self._processorThread = threading.Thread(target=self._stream_processor)
         self._processorThread.start()
 
+    def update_subscriptions(self, coins: List[str]):
+        """
+        Follow the tickers and order books `coins` need, dropping the prices of symbols no longer followed
+        """
+        books_added, books_removed = self.subscriptions.update(coins)
+        followed = self.subscriptions.tickers.markets
+        self.cache.ticker_values.invalidate(set(self.cache.ticker_values) - followed)
+        self.cache.bars.discard(set(self.cache.bars.symbols()) - followed)
+        for symbol in set(self.cache.book_tickers) - followed:
+            self.cache.book_tickers.pop(symbol, None)
+        for symbol in books_removed:
+            self.cache.order_books.pop(symbol, None)
+        for symbol in books_added:
+            # diffs get buffered until the snapshot is loaded
+            self.cache.order_books[symbol] = OrderBook(symbol, self.config.ORDER_BOOK_DEPTH)
+            self._book_resync_queue.put(symbol)
+
     def acquire_order_guard(self):
         return OrderGuard(self.pending_orders, self.pending_orders_mutex)
 
@@ -105,83 +390,216 @@ class BinanceStreamManager:
         pending_orders: Set[Tuple[str, int]]
         with self.pending_orders_mutex:
             pending_orders = self.pending_orders.copy()
+        by_symbol: Dict[str, Set[int]] = defaultdict(set)
         for symbol, order_id in pending_orders:
-            order = None
+            by_symbol[symbol].add(order_id)
+        for symbol, order_ids in by_symbol.items():
             while True:
                 try:
-                    order = self.binance_client.get_order(symbol=symbol, orderId=order_id)
-                except (BinanceRequestException, BinanceAPIException) as e:
-                    self.logger.error(f"Got exception during fetching pending order: {e}")
-                if order is not None:
+                    orders = self._fetch_orders(symbol, order_ids)
                     break
+                except (BinanceRequestException, BinanceAPIException) as e:
+                    self.logger.error(f"Got exception during fetching pending orders: {e}")
                 time.sleep(1)
-            fake_report = {
-                "symbol": order["symbol"],
-                "side": order["side"],
-                "order_type": order["type"],
-                "order_id": order["orderId"],
-                "cumulative_quote_asset_transacted_quantity": float(order["cummulativeQuoteQty"]),
-                "current_order_status": order["status"],
-                "order_price": float(order["price"]),
-                "transaction_time": order["time"],
-            }
-            self.logger.info(
-                f"Pending order {order_id} for symbol {symbol} fetched:\n{fake_report}",
-                False,
+            for order in orders:
+                self.logger.info(
+                    f"Pending order {order.id} for symbol {symbol} fetched:\n{order.event}",
+                    False,
+                )
+                self.cache.orders.put(order)
+
+    def _fetch_orders(self, symbol: str, order_ids: Iterable[int]) -> List[BinanceOrder]:
+        """
+        Current state of `order_ids` of one symbol: open ones come from a single open orders query, the
+        ones that finished meanwhile from a single all orders query starting at the oldest of them
+        """
+        order_ids = set(order_ids)
+        orders = [
+            BinanceOrder.from_rest(order)
+            for order in self.binance_client.get_open_orders(symbol=symbol)
+            if order["orderId"] in order_ids
+        ]
+        missing = order_ids - {order.id for order in orders}
+        if missing:
+            orders.extend(
+                BinanceOrder.from_rest(order)
+                for order in self.binance_client.get_all_orders(symbol=symbol, orderId=min(missing))
+                if order["orderId"] in missing
             )
-            self.cache.orders[fake_report["order_id"]] = BinanceOrder(fake_report)
+        return orders
+
+    def _reset_order_books(self, symbols: Iterable[str]):
+        # the books of a stalled depth stream are out of date until its reconnect resyncs them
+        for symbol in symbols:
+            book = self.cache.order_books.get(symbol, None)
+            if book is not None:
+                book.reset()
+
+    def _resync_order_books(self):
+        for symbol, book in list(self.cache.order_books.items()):
+            book.reset()
+            self._book_resync_queue.put(symbol)
+
+    def _order_book_resync_worker(self):
+        while True:
+            symbol = self._book_resync_queue.get()
+            book = self.cache.order_books.get(symbol, None)
+            if book is None or book.synced:
+                continue
+            try:
+                snapshot = self.binance_client.get_order_book(symbol=symbol, limit=book.snapshot_limit)
+            except BinanceAPIException as e:
+                if e.code == -1121:  # Invalid symbol
+                    self.logger.info(f"No {symbol} market, not mirroring its order book")
+                    self.cache.order_books.pop(symbol, None)
+                    continue
+                self.logger.error(f"Got exception during fetching {symbol} order book: {e}")
+                time.sleep(1)
+                self._book_resync_queue.put(symbol)
+                continue
+            except BinanceRequestException as e:
+                self.logger.error(f"Got exception during fetching {symbol} order book: {e}")
+                time.sleep(1)
+                self._book_resync_queue.put(symbol)
+                continue
+            if not book.apply_snapshot(snapshot):
+                self._book_resync_queue.put(symbol)
+                continue
+            self.logger.debug(f"Order book synced: {book}")
 
     def _invalidate_balances(self):
         with self.cache.open_balances() as balances:
             balances.clear()
 
+    def _on_stream_data(self, stream_data, stream_buffer_name=False):  # pylint: disable=unused-argument
+        self._stream_queue.put((time.time(), stream_data, None))
+
+    def _on_stream_signal(
+        self, signal_type=False, stream_id=False, data_record=False
+    ):  # pylint: disable=unused-argument
+        self._stream_queue.put((time.time(), None, (signal_type, stream_id)))
+
     def _stream_processor(self):
+        next_report = time.monotonic() + STREAM_METRICS_INTERVAL
+        next_bar_close = time.monotonic() + BAR_CLOSE_INTERVAL
         while True:
             if self.bw_api_manager.is_manager_stopping():
                 sys.exit()
 
-            stream_signal = self.bw_api_manager.pop_stream_signal_from_stream_signal_buffer()
-            stream_data = self.bw_api_manager.pop_stream_data_from_stream_buffer()
-
-            if stream_signal is not False:
-                signal_type = stream_signal["type"]
-                stream_id = stream_signal["stream_id"]
-                if signal_type == "CONNECT":
-                    stream_info = self.bw_api_manager.get_stream_info(stream_id)
-                    if "!userData" in stream_info["markets"]:
-                        self.logger.debug("Connect for userdata arrived", False)
-                        self._fetch_pending_orders()
-                        self._invalidate_balances()
-            if stream_data is not False:
-                self._process_stream_data(stream_data)
-            if stream_data is False and stream_signal is False:
-                time.sleep(0.01)
+            try:
+                batch = [self._stream_queue.get(timeout=STREAM_QUEUE_TIMEOUT)]
+            except queue.Empty:
+                batch = []
+            while batch and len(batch) < STREAM_BATCH_SIZE:
+                try:
+                    batch.append(self._stream_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lags = []
+            for received, payload, stream_signal in batch:
+                lags.append(time.time() - received)
+                if stream_signal is not None:
+                    self._process_stream_signal(*stream_signal)
+                else:
+                    self._process_payload(received, payload)
+            if lags:
+                self.metrics.record_batch(lags, self._stream_queue.qsize())
+                if self.recorder is not None:
+                    self.recorder.flush()
+
+            if time.monotonic() >= next_bar_close:
+                next_bar_close = time.monotonic() + BAR_CLOSE_INTERVAL
+                self.cache.bars.close_expired(time.time())
+
+            if time.monotonic() >= next_report:
+                next_report = time.monotonic() + STREAM_METRICS_INTERVAL
+                metrics = self.metrics.snapshot(reset=True)
+                self.logger.debug(
+                    f"Stream processor: {metrics['messages']} messages in {metrics['batches']} batches, "
+                    f"queue depth {metrics['queue_depth']} (max {metrics['max_queue_depth']}), "
+                    f"lag {metrics['avg_lag'] * 1000:.1f}ms avg {metrics['max_lag'] * 1000:.1f}ms max",
+                    False,
+                )
+                if self.watchdog is not None:
+                    watchdog = self.watchdog.snapshot()
+                    if watchdog["failovers"]:
+                        self.logger.debug(
+                            f"Stream watchdog: {watchdog['failovers']} failovers ({watchdog['failover_seconds']:.0f}s), "
+                            f"{watchdog['reconnects']} reconnects, {watchdog['polls']} REST polls, "
+                            f"used weight {watchdog['used_weight']}",
+                            False,
+                        )
+
+    def _process_stream_signal(self, signal_type: str, stream_id):
+        if signal_type == "CONNECT":
+            stream_info = self.bw_api_manager.get_stream_info(stream_id)
+            if "!userData" in stream_info["markets"]:
+                self.logger.debug("Connect for userdata arrived", False)
+                self._fetch_pending_orders()
+                self._invalidate_balances()
+            elif self.subscriptions.depth is not None and self.subscriptions.depth.owns(stream_id):
+                self.logger.debug("Connect for depth arrived", False)
+                self._resync_order_books()
+
+    def _process_payload(self, received: float, payload: str):
+        if self.recorder is not None:
+            self.recorder.record(received, payload)
+        stream_data = self._decode(payload)
+        if not isinstance(stream_data, dict):
+            self.logger.debug(f"Undecodable stream message: {payload}", False)
+            return
+        self._process_stream_data(stream_data)
 
     def _process_stream_data(self, stream_data):
-        event_type = stream_data["event_type"]
-        if event_type == "executionReport":  # !userData
+        event_type = stream_data.get("event_type", None)
+        if event_type is None:
+            # subscription results and errors carry no event
+            self.logger.debug(f"Stream message without event: {stream_data}", False)
+        elif event_type == "executionReport":  # !userData
             self.logger.debug(f"execution report: {stream_data}")
-            order = BinanceOrder(stream_data)
-            self.cache.orders[order.id] = order
+            self.cache.orders.put(BinanceOrder(stream_data))
         elif event_type == "balanceUpdate":  # !userData
             self.logger.debug(f"Balance update: {stream_data}")
-            with self.cache.open_balances() as balances:
-                asset = stream_data["asset"]
-                if asset in balances:
-                    del balances[stream_data["asset"]]
+            self.cache.invalidate_balance(stream_data["asset"])
         elif event_type in (
             "outboundAccountPosition",
             "outboundAccountInfo",
         ):  # !userData
             self.logger.debug(f"{event_type}: {stream_data}")
-            with self.cache.open_balances() as balances:
-                for bal in stream_data["balances"]:
-                    balances[bal["asset"]] = float(bal["free"])
+            self.cache.update_balances(
+                {bal["asset"]: float(bal["free"]) for bal in stream_data["balances"]},
+                stream_data.get("last_update_time", stream_data["event_time"]),
+            )
+        elif event_type == "depthUpdate":
+            book = self.cache.order_books.get(stream_data["symbol"], None)
+            if book is not None and not book.apply_diff(stream_data):
+                self.logger.info(f"{stream_data['symbol']} order book out of sync, resyncing")
+                self._book_resync_queue.put(stream_data["symbol"])
+        elif event_type == "bookTicker":
+            self.cache.book_tickers[stream_data["symbol"]] = (
+                float(stream_data["best_bid_price"]),
+                float(stream_data["best_ask_price"]),
+            )
         elif event_type == "24hrMiniTicker":
-            for event in stream_data["data"]:
-                self.cache.ticker_values[event["symbol"]] = float(event["close_price"])
+            self.cache.ticker_values.update_many(
+                (event["symbol"], float(event["close_price"])) for event in stream_data["data"]
+            )
+            if self.watchdog is not None:
+                self.watchdog.seen((event["symbol"] for event in stream_data["data"]), time.time())
+            self.cache.bars.update_many(
+                (
+                    event["symbol"],
+                    float(event["close_price"]),
+                    float(event["taker_by_base_asset_volume"]),
+                    event["event_time"] / 1000,
+                )
+                for event in stream_data["data"]
+            )
         else:
             self.logger.error(f"Unknown event type found: {event_type}\n{stream_data}")
 
     def close(self):
         self.bw_api_manager.stop_manager_with_all_streams()
+        if self.recorder is not None:
+            self.recorder.close()
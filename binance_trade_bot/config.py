@@ -1,12 +1,15 @@
 # Config consts
 import configparser
 import os
+from typing import List
 
 # from .binance_api_manager import BinanceAPIManager
 from .models import Coin
 
 CFG_FL_NAME = "user.cfg"
 USER_CFG_SECTION = "binance_user_config"
+# How the orders of a bridge jump can be placed
+EXECUTION_MODES = ("limit", "limit_maker", "ioc", "market")
 
 
 class Config:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
@@ -24,6 +27,14 @@ class Config:  # pylint: disable=too-few-public-methods,too-many-instance-attrib
             "strategy": "default",
             "sell_timeout": "0",
             "buy_timeout": "0",
+            "async_api": "no",
+            "execution_mode": "limit",
+            "ioc_ticks": "2",
+            "max_slippage": "0.5",
+            "order_book_depth": "20",
+            "stream_record_dir": "",
+            "ingester_process": "no",
+            "stream_stall_timeout": "30",
         }
         # self.manager = binance_manager
 
@@ -54,6 +65,56 @@ class Config:  # pylint: disable=too-few-public-methods,too-many-instance-attrib
         self.BINANCE_API_SECRET_KEY = os.environ.get("API_SECRET_KEY") or config.get(USER_CFG_SECTION, "api_secret_key")
         self.BINANCE_TLD = os.environ.get("TLD") or config.get(USER_CFG_SECTION, "tld")
 
+        self.SUPPORTED_COIN_LIST: List[str] = []
+        self.load_supported_coin_list()
+        # self.SUPPORTED_COIN_LIST = binance_manager.get_all_coins()
+
+        self.CURRENT_COIN_SYMBOL = os.environ.get("CURRENT_COIN_SYMBOL") or config.get(USER_CFG_SECTION, "current_coin")
+
+        self.STRATEGY = os.environ.get("STRATEGY") or config.get(USER_CFG_SECTION, "strategy")
+
+        self.SELL_TIMEOUT = os.environ.get("SELL_TIMEOUT") or config.get(USER_CFG_SECTION, "sell_timeout")
+        self.BUY_TIMEOUT = os.environ.get("BUY_TIMEOUT") or config.get(USER_CFG_SECTION, "buy_timeout")
+
+        self.ASYNC_API = os.environ.get("ASYNC_API") or config.get(USER_CFG_SECTION, "async_api")
+
+        # How orders of a bridge jump are placed: limit, limit_maker, ioc or market
+        self.EXECUTION_MODE = (
+            os.environ.get("EXECUTION_MODE") or config.get(USER_CFG_SECTION, "execution_mode")
+        ).lower()
+        if self.EXECUTION_MODE not in EXECUTION_MODES:
+            raise ValueError(
+                f"Unknown execution_mode {self.EXECUTION_MODE}, expected one of {', '.join(EXECUTION_MODES)}"
+            )
+        self.IOC_TICKS = int(os.environ.get("IOC_TICKS") or config.get(USER_CFG_SECTION, "ioc_ticks"))
+        self.MAX_SLIPPAGE = float(os.environ.get("MAX_SLIPPAGE") or config.get(USER_CFG_SECTION, "max_slippage"))
+
+        # Number of levels mirrored per side of the <coin><bridge> order books, 0 disables the mirror
+        self.ORDER_BOOK_DEPTH = int(
+            os.environ.get("ORDER_BOOK_DEPTH") or config.get(USER_CFG_SECTION, "order_book_depth")
+        )
+
+        # Directory the raw websocket payloads get recorded to, empty disables recording
+        self.STREAM_RECORD_DIR = os.environ.get("STREAM_RECORD_DIR") or config.get(
+            USER_CFG_SECTION, "stream_record_dir"
+        )
+
+        # Seconds without stream messages after which prices are polled over REST, 0 disables the watchdog
+        self.STREAM_STALL_TIMEOUT = float(
+            os.environ.get("STREAM_STALL_TIMEOUT") or config.get(USER_CFG_SECTION, "stream_stall_timeout")
+        )
+
+        # Whether the websocket streams are ingested by a separate process
+        self.INGESTER_PROCESS = os.environ.get("INGESTER_PROCESS") or config.get(USER_CFG_SECTION, "ingester_process")
+
+        self.USE_MARGIN = os.environ.get("USE_MARGIN") or config.get(USER_CFG_SECTION, "use_margin")
+        self.SCOUT_MARGIN = float(os.environ.get("SCOUT_MARGIN") or config.get(USER_CFG_SECTION, "scout_margin"))
+
+    def load_supported_coin_list(self) -> bool:
+        """
+        (Re)read the supported coin list from the environment or the supported_coin_list file.
+        Returns whether it changed
+        """
         # Get supported coin list from the environment
         supported_coin_list = [
             coin.strip() for coin in os.environ.get("SUPPORTED_COIN_LIST", "").split() if coin.strip()
@@ -66,15 +127,6 @@ class Config:  # pylint: disable=too-few-public-methods,too-many-instance-attrib
                     if not line or line.startswith("#") or line in supported_coin_list:
                         continue
                     supported_coin_list.append(line)
+        changed = supported_coin_list != self.SUPPORTED_COIN_LIST
         self.SUPPORTED_COIN_LIST = supported_coin_list
-        # self.SUPPORTED_COIN_LIST = binance_manager.get_all_coins()
-
-        self.CURRENT_COIN_SYMBOL = os.environ.get("CURRENT_COIN_SYMBOL") or config.get(USER_CFG_SECTION, "current_coin")
-
-        self.STRATEGY = os.environ.get("STRATEGY") or config.get(USER_CFG_SECTION, "strategy")
-
-        self.SELL_TIMEOUT = os.environ.get("SELL_TIMEOUT") or config.get(USER_CFG_SECTION, "sell_timeout")
-        self.BUY_TIMEOUT = os.environ.get("BUY_TIMEOUT") or config.get(USER_CFG_SECTION, "buy_timeout")
-
-        self.USE_MARGIN = os.environ.get("USE_MARGIN") or config.get(USER_CFG_SECTION, "use_margin")
-        self.SCOUT_MARGIN = float(os.environ.get("SCOUT_MARGIN") or config.get(USER_CFG_SECTION, "scout_margin"))
+        return changed
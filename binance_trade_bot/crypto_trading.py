@@ -1,6 +1,7 @@
 #!python3
 import time
 
+from .async_binance_api_manager import ThreadedBinanceAPIManager
 from .binance_api_manager import BinanceAPIManager
 from .config import Config
 from .database import Database
@@ -15,7 +16,10 @@ def main():
 
     config = Config()
     db = Database(logger, config)
-    manager = BinanceAPIManager(config, db, logger)
+    if config.ASYNC_API == "yes":
+        manager = ThreadedBinanceAPIManager(config, db, logger)
+    else:
+        manager = BinanceAPIManager(config, db, logger)
     # check if we can access API feature that require valid config
     try:
         _ = manager.get_account()
@@ -28,7 +32,7 @@ def main():
     #     balance = manager.get_currency_balance(coin.symbol)
     #     usd_price = manager.get_ticker_price(f"{coin.symbol}{config.BRIDGE_SYMBOL}")
     #     btc_price = manager.get_ticker_price(f"{coin.symbol}BTC")
-        
+
     #     coin_data = {
     #         "symbol": coin.symbol,
     #         "enabled": coin.enabled,
@@ -39,7 +43,7 @@ def main():
     #         "btc_value": balance * btc_price if btc_price else None
     #     }
     #     coins_data.append(coin_data)
-            
+
     strategy = get_strategy(config.STRATEGY)
     if strategy is None:
         logger.error("Invalid strategy name")
@@ -59,11 +63,15 @@ def main():
     schedule = SafeScheduler(logger)
     schedule.every(config.SCOUT_SLEEP_TIME).seconds.do(trader.scout).tag("scouting")
     schedule.every(1).minutes.do(trader.update_values).tag("updating value history")
+    schedule.every(1).minutes.do(trader.reload_coin_list).tag("reloading supported coin list")
     schedule.every(1).minutes.do(db.prune_scout_history).tag("pruning scout history")
     schedule.every(1).hours.do(db.prune_value_history).tag("pruning value history")
+    schedule.every(1).minutes.do(db.save_bars).tag("saving bars")
+    schedule.every(1).hours.do(db.prune_bars).tag("pruning bars")
     try:
         while True:
             schedule.run_pending()
             time.sleep(1)
     finally:
-        manager.stream_manager.close()
+        manager.close()
+        db.save_bars()
@@ -1,15 +1,17 @@
 import json
 import os
 import time
+from collections import deque
 from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import List, Optional, Union
+from typing import Deque, Dict, Iterable, List, Optional, Tuple, Union
 
 from socketio import Client
 from socketio.exceptions import ConnectionError as SocketIOConnectionError
-from sqlalchemy import create_engine, func
+from sqlalchemy import create_engine, func, inspect, text
 from sqlalchemy.orm import Session, scoped_session, sessionmaker
 
+from .bar_store import Bar
 from .config import Config
 from .logger import Logger
 from .models import *  # pylint: disable=wildcard-import
@@ -22,6 +24,8 @@ class Database:
         self.engine = create_engine(uri)
         self.SessionMaker = sessionmaker(bind=self.engine)
         self.socketio_client = Client()
+        # closed price bars waiting for `save_bars`
+        self._closed_bars: Deque[Tuple[str, Bar]] = deque()
 
     def socketio_connect(self):
         if self.socketio_client.connected and self.socketio_client.namespaces:
@@ -115,6 +119,14 @@ class Database:
             session.expunge(coin)
             return coin
 
+    def clear_current_coin(self):
+        """
+        Forget the current coin, e.g. after selling it for the bridge
+        """
+        session: Session
+        with self.db_session() as session:
+            session.query(CurrentCoin).delete()
+
     def get_pair(self, from_coin: Union[Coin, str], to_coin: Union[Coin, str]):
         from_coin = self.get_coin(from_coin)
         to_coin = self.get_coin(to_coin)
@@ -135,6 +147,27 @@ class Database:
             session.expunge_all()
             return pairs
 
+    def get_pairs_to(self, to_coin: Union[Coin, str], only_enabled=True) -> List[Pair]:
+        to_coin = self.get_coin(to_coin)
+        session: Session
+        with self.db_session() as session:
+            pairs = session.query(Pair).filter(Pair.to_coin == to_coin)
+            if only_enabled:
+                pairs = pairs.filter(Pair.enabled.is_(True))
+            pairs = pairs.all()
+            session.expunge_all()
+            return pairs
+
+    def update_pair_ratios(self, ratios: Dict[Pair, Optional[float]]):
+        """
+        Store the ratios of the given pairs in one session
+        """
+        by_id = {pair.id: ratio for pair, ratio in ratios.items()}
+        session: Session
+        with self.db_session() as session:
+            for pair in session.query(Pair).filter(Pair.id.in_(by_id)):
+                pair.ratio = by_id[pair.id]
+
     def get_pairs(self, only_enabled=True) -> List[Pair]:
         session: Session
         with self.db_session() as session:
@@ -159,12 +192,63 @@ class Database:
             session.add(sh)
             self.send_update(sh)
 
+    def log_coin_values(
+        self, values: List[Tuple[Coin, float, Optional[float], Optional[float]]], value_datetime: datetime
+    ):
+        """
+        Store the (coin, balance, USD value, BTC value) of held coins at `value_datetime`
+        """
+        session: Session
+        with self.db_session() as session:
+            for coin, balance, usd_value, btc_value in values:
+                cv = CoinValue(session.merge(coin), balance, usd_value, btc_value, datetime=value_datetime)
+                session.add(cv)
+                self.send_update(cv)
+
     def prune_scout_history(self):
         time_diff = datetime.now() - timedelta(hours=self.config.SCOUT_HISTORY_PRUNE_TIME)
         session: Session
         with self.db_session() as session:
             session.query(ScoutHistory).filter(ScoutHistory.datetime < time_diff).delete()
 
+    def queue_bars(self, bars: Iterable[Tuple[str, Bar]]):
+        """
+        Queue closed bars for the next `save_bars`, without touching the database, so the stream threads
+        handing them over never wait for it
+        """
+        self._closed_bars.extend(bars)
+
+    def save_bars(self):
+        """
+        Store the queued bars
+        """
+        bars = []
+        while self._closed_bars:
+            bars.append(self._closed_bars.popleft())
+        if not bars:
+            return
+        session: Session
+        with self.db_session() as session:
+            session.add_all(
+                PriceBar(
+                    symbol,
+                    bar.open,
+                    bar.high,
+                    bar.low,
+                    bar.close,
+                    bar.volume,
+                    datetime.fromtimestamp(bar.open_time),
+                )
+                for symbol, bar in bars
+            )
+
+    def prune_bars(self):
+        # The last 7 days worth of 1m bars will be kept
+        time_diff = datetime.now() - timedelta(days=7)
+        session: Session
+        with self.db_session() as session:
+            session.query(PriceBar).filter(PriceBar.datetime < time_diff).delete()
+
     def prune_value_history(self):
         session: Session
         with self.db_session() as session:
@@ -213,6 +297,22 @@ class Database:
 
     def create_database(self):
         Base.metadata.create_all(self.engine)
+        self._add_missing_columns()
+
+    def _add_missing_columns(self):
+        """
+        create_all() doesn't alter tables that already exist, so add columns introduced since they were created
+        """
+        inspector = inspect(self.engine)
+        with self.engine.begin() as connection:
+            for table in Base.metadata.sorted_tables:
+                existing = {column["name"] for column in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name in existing:
+                        continue
+                    column_type = column.type.compile(dialect=self.engine.dialect)
+                    self.logger.info(f"Adding column {column.name} to {table.name}")
+                    connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
 
     def start_trade_log(self, from_coin: Coin, to_coin: Coin, selling: bool):
         return TradeLog(self, from_coin, to_coin, selling)
@@ -281,11 +381,13 @@ class TradeLog:
             trade.state = TradeState.ORDERED
             self.db.send_update(trade)
 
-    def set_complete(self, crypto_trade_amount):
+    def set_complete(self, crypto_trade_amount, execution_mode: str = None, fill_time: float = None):
         session: Session
         with self.db.db_session() as session:
             trade: Trade = session.merge(self.trade)
             trade.crypto_trade_amount = crypto_trade_amount
+            trade.execution_mode = execution_mode
+            trade.fill_time = fill_time
             trade.state = TradeState.COMPLETE
             self.db.send_update(trade)
 
@@ -0,0 +1,107 @@
+import argparse
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from binance.client import Client
+from binance.exceptions import BinanceAPIException
+
+from .config import Config
+
+# File the exchange info and trade fees of offline backtests are read from
+EXCHANGE_SNAPSHOT_FILE = "data/exchange_info.json"
+
+
+class MissingDataError(Exception):
+    """
+    An offline backtest needs data that isn't available locally
+    """
+
+
+class OfflineClient:
+    """
+    Stand-in for `binance.client.Client` that answers from an exchange info and trade fee snapshot and never
+    touches the network. Anything the snapshot can't answer raises MissingDataError.
+    """
+
+    def __init__(self, snapshot: Dict[str, Any]):
+        self.snapshot = snapshot
+        self.response = None
+        self._symbols = {symbol["symbol"]: symbol for symbol in snapshot["exchange_info"]["symbols"]}
+
+    def get_exchange_info(self) -> Dict[str, Any]:
+        return self.snapshot["exchange_info"]
+
+    def get_symbol_info(self, symbol: str) -> Dict[str, Any]:
+        info = self._symbols.get(symbol, None)
+        if info is None:
+            raise MissingDataError(f"{symbol} isn't in the exchange info snapshot")
+        return info
+
+    def get_trade_fee(self, **params) -> List[Dict[str, Any]]:  # pylint: disable=unused-argument
+        fees = self.snapshot.get("trade_fees", None)
+        if fees is None:
+            raise MissingDataError("The exchange info snapshot has no trade fees")
+        return fees
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def offline(*args, **kwargs):  # pylint: disable=unused-argument
+            raise MissingDataError(f"{name} needs the Binance API, which isn't available offline")
+
+        return offline
+
+
+def load_snapshot(path: str = EXCHANGE_SNAPSHOT_FILE) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        raise MissingDataError(
+            f"No exchange info snapshot at {path}, create one with `python -m binance_trade_bot.exchange_snapshot`"
+        )
+    with open(path) as rfh:
+        return json.load(rfh)
+
+
+def save_snapshot(client: Client, path: str = EXCHANGE_SNAPSHOT_FILE) -> Dict[str, Any]:
+    """
+    Store the exchange info, and the trade fees if the API keys allow reading them, of `client` at `path`
+    """
+    snapshot: Dict[str, Any] = {
+        "created": datetime.utcnow().isoformat(),
+        "exchange_info": client.get_exchange_info(),
+    }
+    trade_fees: Optional[List[Dict[str, Any]]] = None
+    try:
+        trade_fees = client.get_trade_fee()
+    except BinanceAPIException as e:
+        print(f"Not storing trade fees, backtests will assume 0.075%: {e}")
+    if trade_fees is not None:
+        snapshot["trade_fees"] = trade_fees
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path + ".tmp", "w") as wfh:
+        json.dump(snapshot, wfh)
+    os.replace(path + ".tmp", path)
+    return snapshot
+
+
+def main(args: List[str] = None):
+    parser = argparse.ArgumentParser(description="Store the exchange info and trade fees offline backtests use")
+    parser.add_argument("path", nargs="?", default=EXCHANGE_SNAPSHOT_FILE, help="snapshot file")
+    options = parser.parse_args(args)
+
+    config = Config()
+    client = Client(config.BINANCE_API_KEY, config.BINANCE_API_SECRET_KEY, tld=config.BINANCE_TLD)
+    snapshot = save_snapshot(client, options.path)
+    print(
+        f"Stored {len(snapshot['exchange_info']['symbols'])} symbols"
+        f"{' and their trade fees' if 'trade_fees' in snapshot else ''} in {options.path}"
+    )
+
+
+if __name__ == "__main__":
+    main()
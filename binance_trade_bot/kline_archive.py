@@ -0,0 +1,161 @@
+import calendar
+import hashlib
+import io
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+import numpy as np
+from tqdm import tqdm
+
+from .kline_store import KLINE_COLUMNS, KlineStore, kline_minute, timestamp_minutes
+
+# CSV lines parsed at once while streaming an archive
+ARCHIVE_CHUNK_LINES = 65536
+# Open times at or above this are in microseconds, as in the spot archives since 2025, below in milliseconds
+MICROSECOND_THRESHOLD = 10**15
+
+# <SYMBOL>-1m-<YYYY>-<MM>.zip of the monthly archives, <SYMBOL>-1m-<YYYY>-<MM>-<DD>.zip of the daily ones
+_ARCHIVE_NAME = re.compile(r"^(?P<symbol>[A-Z0-9]+)-1m-(?P<year>\d{4})-(?P<month>\d{2})(?:-(?P<day>\d{2}))?\.zip$")
+
+
+class Archive(NamedTuple):
+    path: str
+    symbol: str
+    start: int  # first minute of the period the archive covers
+    end: int  # minute after its last one
+
+
+def parse_archive_name(path: str) -> Archive:
+    """
+    Symbol and period of a 1m kline archive named as in the public Binance data dump (data.binance.vision)
+    """
+    match = _ARCHIVE_NAME.match(os.path.basename(path))
+    if match is None:
+        raise ValueError(f"{path} isn't named like a 1m kline archive (<SYMBOL>-1m-<YYYY>-<MM>[-<DD>].zip)")
+    year, month = int(match["year"]), int(match["month"])
+    if match["day"]:
+        start = kline_minute(datetime(year, month, int(match["day"])))
+        end = start + 24 * 60
+    else:
+        start = kline_minute(datetime(year, month, 1))
+        end = start + calendar.monthrange(year, month)[1] * 24 * 60
+    return Archive(path, match["symbol"], start, end)
+
+
+def find_archives(paths: Iterable[str]) -> List[Archive]:
+    """
+    The 1m kline archives among `paths` and, recursively, inside the directories among them
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in os.walk(path):
+                files.extend(os.path.join(directory, name) for name in names if _ARCHIVE_NAME.match(name))
+        else:
+            files.append(path)
+    return [parse_archive_name(path) for path in sorted(files)]
+
+
+def verify_checksum(path: str) -> bool:
+    """
+    Compare an archive with the sha256 of the .CHECKSUM file next to it, if there is one
+    """
+    checksum_path = path + ".CHECKSUM"
+    if not os.path.exists(checksum_path):
+        return True
+    with open(checksum_path) as rfh:
+        expected = rfh.read().split()[0].lower()
+    digest = hashlib.sha256()
+    with open(path, "rb") as rfh:
+        for block in iter(lambda: rfh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest() == expected
+
+
+def read_archive(archive: Archive) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Minutes and open, high, low, close, volume rows of an archive, within its period, decompressed and parsed in
+    chunks of ARCHIVE_CHUNK_LINES lines
+    """
+    if not verify_checksum(archive.path):
+        raise ValueError(f"{archive.path} doesn't match its checksum")
+    with zipfile.ZipFile(archive.path) as zipped:
+        with zipped.open(zipped.namelist()[0]) as raw, io.TextIOWrapper(raw, encoding="ascii") as lines:
+            while True:
+                chunk = [line for line in islice(lines, ARCHIVE_CHUNK_LINES) if line[:1].isdigit()]  # skip headers
+                if not chunk:
+                    break
+                rows = np.loadtxt(chunk, delimiter=",", usecols=range(6), dtype=np.float64, ndmin=2)
+                open_times = rows[:, 0].astype(np.int64)
+                open_times = np.where(open_times >= MICROSECOND_THRESHOLD, open_times // 1000, open_times)
+                minutes = timestamp_minutes(open_times)
+                inside = (minutes >= archive.start) & (minutes < archive.end)
+                yield minutes[inside], rows[inside, 1:]
+
+
+def import_archive(archive: Archive, directory: str) -> Tuple[Archive, int]:
+    """
+    Write the klines of an archive into the store at `directory`, chunk by chunk as they are parsed, so neither
+    the CSV nor its parsed rows are held in memory as a whole. The archive's period has to be reserved already;
+    the importing process commits it. Returns the archive and the number of klines written
+    """
+    store = KlineStore(directory)
+    count = 0
+    try:
+        for minutes, values in read_archive(archive):
+            store.write_values(
+                archive.symbol, minutes, {column: values[:, index] for index, column in enumerate(KLINE_COLUMNS)}
+            )
+            count += len(minutes)
+    finally:
+        store.close()
+    return archive, count
+
+
+def import_archives(
+    paths: Iterable[str], store: KlineStore = None, workers: int = None, skip_imported: bool = True
+) -> Dict[str, int]:
+    """
+    Import 1m kline archives into `store`, parsed and written on a pool of `workers` processes, each into the
+    period of its archive that this one reserved up front. This one updates the aggregates and covered ranges of
+    every archive that was written completely. Archives whose period the store already covers are skipped if
+    `skip_imported` is set. Returns the number of klines imported per symbol
+    """
+    store = store or KlineStore()
+    archives = find_archives(paths)
+    if skip_imported:
+        archives = [archive for archive in archives if store.missing(archive.symbol, archive.start, archive.end)]
+    if not archives:
+        return {}
+
+    periods: Dict[str, Tuple[int, int]] = {}
+    for archive in archives:
+        start, end = periods.get(archive.symbol, (archive.start, archive.end))
+        periods[archive.symbol] = (min(start, archive.start), max(end, archive.end))
+    for symbol, (start, end) in periods.items():
+        # sized once up front, so the writes don't grow the files archive by archive
+        store.reserve(symbol, start, end)
+
+    imported: Dict[str, int] = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor, tqdm(
+        total=len(archives), unit="archive", desc="Importing klines"
+    ) as progress:
+        store.flush()
+        futures = [executor.submit(import_archive, archive, store.directory) for archive in archives]
+        for future in as_completed(futures):
+            progress.update()
+            try:
+                archive, count = future.result()
+            except (ValueError, OSError, zipfile.BadZipFile) as e:
+                # whatever got written stays uncovered, so it is fetched or imported again later
+                progress.write(f"Skipping an archive: {e}")
+                continue
+            store.commit(archive.symbol, archive.start, archive.end, [(archive.start, archive.end)])
+            imported[archive.symbol] = imported.get(archive.symbol, 0) + count
+    store.flush()
+    return imported
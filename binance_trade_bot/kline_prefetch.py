@@ -0,0 +1,155 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Iterable, List, Optional, Set, Tuple
+
+import binance.client
+from binance.exceptions import BinanceAPIException, BinanceRequestException
+from tqdm import tqdm
+
+from .config import Config
+from .kline_store import KlineStore, kline_minute, minute_timestamp
+from .logger import Logger
+
+# Most klines one request returns
+KLINES_PER_REQUEST = 1000
+# Request weight of one klines request
+KLINES_REQUEST_WEIGHT = 2
+# Request weight per minute the prefetch may use, half of what Binance allows an IP
+PREFETCH_WEIGHT_PER_MINUTE = 600
+# Concurrent klines requests
+PREFETCH_WORKERS = 8
+# Attempts per chunk before it is left to be fetched lazily during the run
+PREFETCH_ATTEMPTS = 3
+
+Chunk = Tuple[str, int, int]
+
+
+class WeightLimiter:
+    """
+    Token bucket spreading request weight evenly over the minute, with bursts of at most 10 seconds worth
+    """
+
+    def __init__(self, weight_per_minute: float):
+        self.rate = weight_per_minute / 60
+        self.capacity = self.rate * 10
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._mutex = threading.Lock()
+
+    def acquire(self, weight: float):
+        while True:
+            with self._mutex:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= weight:
+                    self._tokens -= weight
+                    return
+                wait = (weight - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def required_symbols(config: Config, coins: Iterable[str] = None) -> Set[str]:
+    """
+    Symbols a backtest of `coins` reads prices of: the bridge markets, and the BTC markets the balances are
+    valued in
+    """
+    coins = list(coins or config.SUPPORTED_COIN_LIST)
+    bridge = config.BRIDGE.symbol
+    symbols = {coin + bridge for coin in coins}
+    symbols.update(coin + "BTC" for coin in coins if coin != "BTC")
+    symbols.add("BTC" + bridge)
+    symbols.discard(bridge + bridge)
+    return symbols
+
+
+def missing_chunks(store: KlineStore, symbols: Iterable[str], start: int, end: int) -> List[Chunk]:
+    """
+    (symbol, start, end) minute ranges of at most one request each that `store` lacks to cover [start, end)
+    """
+    chunks = []
+    for symbol in sorted(symbols):
+        for gap_start, gap_end in store.missing(symbol, start, end):
+            for chunk_start in range(gap_start, gap_end, KLINES_PER_REQUEST):
+                chunks.append((symbol, chunk_start, min(chunk_start + KLINES_PER_REQUEST, gap_end)))
+    return chunks
+
+
+def _fetch_chunk(client: binance.client.Client, limiter: WeightLimiter, chunk: Chunk) -> Optional[List[list]]:
+    """
+    Klines of one chunk, an empty list if the symbol doesn't exist
+    """
+    symbol, start, end = chunk
+    for attempt in range(PREFETCH_ATTEMPTS):
+        limiter.acquire(KLINES_REQUEST_WEIGHT)
+        try:
+            return client.get_klines(
+                symbol=symbol,
+                interval="1m",
+                startTime=minute_timestamp(start),
+                endTime=minute_timestamp(end) - 1,
+                limit=KLINES_PER_REQUEST,
+            )
+        except BinanceAPIException as e:
+            if e.code == -1121:  # Invalid symbol
+                return []
+            if e.status_code in (418, 429):
+                # over the request weight limit, wait as long as the exchange asks to
+                time.sleep(int(e.response.headers.get("Retry-After", 60)))
+            elif attempt == PREFETCH_ATTEMPTS - 1:
+                raise
+        except BinanceRequestException:
+            if attempt == PREFETCH_ATTEMPTS - 1:
+                raise
+        time.sleep(2**attempt)
+    return None
+
+
+def prefetch_klines(
+    client: binance.client.Client,
+    store: KlineStore,
+    symbols: Iterable[str],
+    start_date: datetime,
+    end_date: datetime,
+    logger: Logger,
+    workers: int = PREFETCH_WORKERS,
+    weight_per_minute: float = PREFETCH_WEIGHT_PER_MINUTE,
+) -> int:
+    """
+    Download every 1m kline of `symbols` between `start_date` and `end_date` that `store` doesn't have yet, with
+    `workers` concurrent requests kept under `weight_per_minute`. Returns the number of chunks fetched
+    """
+    start = kline_minute(start_date)
+    # the current minute's kline isn't final yet
+    end = min(kline_minute(end_date) + 1, kline_minute(datetime.utcnow()))
+    chunks = missing_chunks(store, symbols, start, end)
+    if not chunks:
+        return 0
+
+    logger.info(f"Prefetching {len(chunks)} chunks of klines between {start_date} and {end_date}")
+    for symbol in {chunk[0] for chunk in chunks}:
+        store.reserve(symbol, start, end)
+    limiter = WeightLimiter(weight_per_minute)
+    fetched = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor, tqdm(
+        total=len(chunks), unit="chunk", desc="Prefetching klines"
+    ) as progress:
+        futures = {executor.submit(_fetch_chunk, client, limiter, chunk): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            symbol, chunk_start, chunk_end = futures[future]
+            progress.update()
+            try:
+                klines = future.result()
+            except (BinanceAPIException, BinanceRequestException) as e:
+                logger.error(f"Failed to prefetch {symbol} klines: {e}")
+                continue
+            if klines is None:
+                logger.error(f"Failed to prefetch {symbol} klines: request weight limit exceeded")
+                continue
+            # the store is written from this thread only
+            store.write_klines(symbol, klines, covered=(chunk_start, chunk_end))
+            fetched += 1
+    store.flush()
+    return fetched
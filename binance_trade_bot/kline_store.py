@@ -0,0 +1,490 @@
+import argparse
+import bisect
+import calendar
+import json
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Directory the kline columns are stored in
+KLINE_DIR = "data/klines"
+# Minute 0 of every kline array
+KLINE_EPOCH = datetime(2017, 1, 1)
+# Columns stored per symbol, one file each
+KLINE_COLUMNS = ("open", "high", "low", "close", "volume")
+# Minutes a column file grows by when a write goes past its end
+KLINE_GROWTH_MINUTES = 30 * 24 * 60
+# Bar sizes in minutes of the OHLC aggregates kept next to the 1m klines, all of them divide KLINE_GROWTH_MINUTES
+KLINE_RESOLUTIONS = (5, 15, 60, 1440)
+# Minutes between the unix epoch and KLINE_EPOCH
+_KLINE_EPOCH_UNIX_MINUTE = int(calendar.timegm(KLINE_EPOCH.timetuple())) // 60
+# timedelta of a kline, a datetime is converted to its minute in every price lookup
+_MINUTE = timedelta(minutes=1)
+# Date format of the keys of the old SqliteDict cache
+SQLITEDICT_DATE_FORMAT = "%d %b %Y %H:%M:%S"
+
+
+def kline_minute(date: datetime) -> int:
+    """
+    Minutes between KLINE_EPOCH and the (UTC) `date`
+    """
+    return (date - KLINE_EPOCH) // _MINUTE
+
+
+def minute_datetime(minute: int) -> datetime:
+    return KLINE_EPOCH + timedelta(minutes=minute)
+
+
+def minute_timestamp(minute: int) -> int:
+    """
+    Unix time in ms of the start of `minute`, as the REST API expects it
+    """
+    return (minute + _KLINE_EPOCH_UNIX_MINUTE) * 60000
+
+
+def timestamp_minutes(timestamps: np.ndarray) -> np.ndarray:
+    """
+    Minutes since KLINE_EPOCH of unix times in ms
+    """
+    return timestamps // 60000 - _KLINE_EPOCH_UNIX_MINUTE
+
+
+def kline_resolution(interval: int, start_minute: int) -> int:
+    """
+    The coarsest resolution whose bars start at every step of a backtest that scouts every `interval` minutes from
+    `start_minute`, so the open of the bar is the open price of the minute the step is at
+    """
+    for resolution in sorted(KLINE_RESOLUTIONS, reverse=True):
+        if interval % resolution == 0 and start_minute % resolution == 0:
+            return resolution
+    return 1
+
+
+def aggregate_klines(columns: Dict[str, np.ndarray], resolution: int) -> Dict[str, np.ndarray]:
+    """
+    OHLC bars of `resolution` minutes of 1m klines whose length is a multiple of it: the first open, highest high,
+    lowest low, last close and summed volume of the klines in each bar, NaN for bars without any
+    """
+    opens = columns["open"].reshape(-1, resolution)
+    valid = ~np.isnan(opens)
+    has_klines = valid.any(axis=1)
+    rows = np.arange(len(opens))
+    first = opens[rows, valid.argmax(axis=1)]
+    closes = columns["close"].reshape(-1, resolution)
+    last = closes[rows, resolution - 1 - (~np.isnan(closes))[:, ::-1].argmax(axis=1)]
+    volume = np.where(has_klines, np.nansum(columns["volume"].reshape(-1, resolution), axis=1), np.nan)
+    return {
+        "open": np.where(has_klines, first, np.nan),
+        "high": np.fmax.reduce(columns["high"].reshape(-1, resolution), axis=1),
+        "low": np.fmin.reduce(columns["low"].reshape(-1, resolution), axis=1),
+        "close": last,
+        "volume": volume,
+    }
+
+
+def _runs(minutes: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    [start, end) ranges of consecutive minutes in sorted, unique `minutes`
+    """
+    if len(minutes) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(minutes) != 1) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [len(minutes)]))
+    return [(int(minutes[start]), int(minutes[end - 1]) + 1) for start, end in zip(starts, ends)]
+
+
+def _merge_ranges(ranges: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class _Columns(dict):
+    """
+    Columns of a series by name, each one memory mapped when it is first used: a backtest only reads the opens
+    """
+
+    def __init__(self, map_column: Callable[[str], np.ndarray]):
+        super().__init__()
+        self.map_column = map_column
+
+    def __missing__(self, column: str) -> np.ndarray:
+        values = self[column] = self.map_column(column)
+        return values
+
+
+class _Series:  # pylint: disable=too-few-public-methods
+    """
+    Memory mapped columns of one symbol, covering minutes [start, start + length), and their aggregates per
+    resolution, bar i of which covers minutes [start + i * resolution, start + (i + 1) * resolution). The aggregates
+    and columns are only mapped once they are used, and only written columns get flushed
+    """
+
+    def __init__(self, directory: str, readonly: bool):
+        self.directory = directory
+        self.readonly = readonly
+        with open(os.path.join(directory, "meta.json")) as rfh:
+            meta = json.load(rfh)
+        self.start: int = meta["start"]
+        # ranges of minutes that were fetched, a NaN inside them means the exchange has no kline
+        self.covered: List[Tuple[int, int]] = [tuple(covered) for covered in meta["covered"]]
+        self.columns: Dict[str, np.ndarray] = {}
+        self.aggregates: Dict[int, Dict[str, np.ndarray]] = {}
+        self.dirty = False
+        self._rebuild = False
+        self._map()
+
+    def _path(self, column: str, resolution: int = 1) -> str:
+        if resolution == 1:
+            return os.path.join(self.directory, f"{column}.f64")
+        return os.path.join(self.directory, f"{column}.{resolution}m.f64")
+
+    def _map_column(self, column: str, resolution: int = 1) -> np.ndarray:
+        mapped = np.memmap(self._path(column, resolution), dtype=np.float64, mode="r" if self.readonly else "r+")
+        # plain ndarray views index faster than memmaps
+        return mapped.view(np.ndarray)
+
+    def _map(self, rebuild: bool = False):
+        self.columns = _Columns(self._map_column)
+        self.aggregates = {}
+        self._rebuild = rebuild
+
+    def aggregate(self, resolution: int) -> Dict[str, np.ndarray]:
+        """
+        The aggregate columns of `resolution`, mapped on first use
+        """
+        aggregates = self.aggregates.get(resolution, None)
+        if aggregates is not None:
+            return aggregates
+        size = self.length // resolution * 8
+        paths = [self._path(column, resolution) for column in KLINE_COLUMNS]
+        if not self._rebuild and all(os.path.exists(path) and os.path.getsize(path) == size for path in paths):
+            aggregates = _Columns(lambda column: self._map_column(column, resolution))
+        elif self.readonly:
+            # stores written before the aggregates existed get them built once
+            aggregates = aggregate_klines(self.columns, resolution)
+        else:
+            for column, values in aggregate_klines(self.columns, resolution).items():
+                values.tofile(self._path(column, resolution) + ".tmp")
+                os.replace(self._path(column, resolution) + ".tmp", self._path(column, resolution))
+            aggregates = _Columns(lambda column: self._map_column(column, resolution))
+        self.aggregates[resolution] = aggregates
+        return aggregates
+
+    def update_aggregates(self, start: int, end: int):
+        """
+        Recompute the bars of every resolution that contain minutes of [start, end)
+        """
+        self.dirty = True
+        for resolution in KLINE_RESOLUTIONS:
+            aggregates = self.aggregate(resolution)
+            first = (start - self.start) // resolution
+            last = -(-(end - self.start) // resolution)
+            columns = {column: self.columns[column][first * resolution : last * resolution] for column in KLINE_COLUMNS}
+            for column, values in aggregate_klines(columns, resolution).items():
+                aggregates[column][first:last] = values
+
+    @property
+    def length(self) -> int:
+        return len(self.columns["open"])
+
+    def is_covered(self, minute: int) -> bool:
+        index = bisect.bisect_right(self.covered, (minute, float("inf"))) - 1
+        return index >= 0 and self.covered[index][0] <= minute < self.covered[index][1]
+
+    def missing(self, start: int, end: int) -> List[Tuple[int, int]]:
+        gaps = []
+        for covered_start, covered_end in self.covered:
+            if covered_end <= start:
+                continue
+            if covered_start >= end:
+                break
+            if covered_start > start:
+                gaps.append((start, covered_start))
+            start = max(start, covered_end)
+        if start < end:
+            gaps.append((start, end))
+        return gaps
+
+    def save_meta(self):
+        path = os.path.join(self.directory, "meta.json")
+        with open(path + ".tmp", "w") as wfh:
+            json.dump({"start": self.start, "covered": self.covered}, wfh)
+        os.replace(path + ".tmp", path)
+
+    def resize(self, start: int, end: int):
+        """
+        Grow the column files to cover at least [start, end), new minutes are NaN
+        """
+        self.flush()
+        prepend = max(self.start - start, 0)
+        if prepend:
+            # rare: the data was first fetched for a later period, the files get rewritten
+            prepend += KLINE_GROWTH_MINUTES - prepend % KLINE_GROWTH_MINUTES
+        append = max(end - (self.start + self.length), 0)
+        if append:
+            append += KLINE_GROWTH_MINUTES - append % KLINE_GROWTH_MINUTES
+        for column in KLINE_COLUMNS:
+            resized = np.concatenate((np.full(prepend, np.nan), self.columns[column], np.full(append, np.nan)))
+            resized.tofile(self._path(column) + ".tmp")
+            os.replace(self._path(column) + ".tmp", self._path(column))
+        self.start -= prepend
+        self.save_meta()
+        self._map(rebuild=True)
+
+    def flush(self):
+        if not self.dirty:
+            return
+        arrays = list(self.columns.values())
+        for aggregates in self.aggregates.values():
+            arrays.extend(aggregates.values())
+        for values in arrays:
+            if isinstance(values.base, np.memmap):
+                values.base.flush()
+        self.dirty = False
+
+
+class KlineStore:
+    """
+    1m klines with one contiguous float64 file per symbol and column, memory mapped and indexed by the minute
+    offset from KLINE_EPOCH, so a price lookup is a single array index. Minutes without data are NaN; the
+    ranges that were fetched are tracked to tell a kline that doesn't exist from one that wasn't fetched yet.
+    OHLC bars of every KLINE_RESOLUTIONS size are kept up to date next to them, for backtests that scout less
+    often than every minute.
+    """
+
+    def __init__(self, directory: str = KLINE_DIR, readonly: bool = False):
+        self.directory = directory
+        self.readonly = readonly
+        if not readonly:
+            os.makedirs(directory, exist_ok=True)
+        self._series: Dict[str, Optional[_Series]] = {}
+
+    def _symbol_dir(self, symbol: str) -> str:
+        return os.path.join(self.directory, symbol)
+
+    def _get(self, symbol: str) -> Optional[_Series]:
+        series = self._series.get(symbol, False)
+        if series is False:
+            series = None
+            if os.path.exists(os.path.join(self._symbol_dir(symbol), "meta.json")):
+                series = _Series(self._symbol_dir(symbol), self.readonly)
+            self._series[symbol] = series
+        return series
+
+    def _create(self, symbol: str, start: int, end: int) -> _Series:
+        directory = self._symbol_dir(symbol)
+        os.makedirs(directory, exist_ok=True)
+        start -= start % KLINE_GROWTH_MINUTES
+        length = end - start + KLINE_GROWTH_MINUTES - (end - start) % KLINE_GROWTH_MINUTES
+        for column in KLINE_COLUMNS:
+            np.full(length, np.nan).tofile(os.path.join(directory, f"{column}.f64"))
+        with open(os.path.join(directory, "meta.json"), "w") as wfh:
+            json.dump({"start": start, "covered": []}, wfh)
+        series = self._series[symbol] = _Series(directory, self.readonly)
+        return series
+
+    def symbols(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            name
+            for name in os.listdir(self.directory)
+            if os.path.exists(os.path.join(self._symbol_dir(name), "meta.json"))
+        )
+
+    def price(self, symbol: str, minute: int, column: str = "open", resolution: int = 1) -> Optional[float]:
+        """
+        Value of `column` of the kline of `symbol` at `minute`, or of the bar of `resolution` minutes containing
+        it, None if there is none
+        """
+        series = self._get(symbol)
+        if series is None or minute < series.start:
+            return None
+        if resolution == 1:
+            values = series.columns[column]
+            index = minute - series.start
+        else:
+            values = series.aggregate(resolution)[column]
+            index = (minute - series.start) // resolution
+        if index >= len(values):
+            return None
+        value = values[index]
+        return None if value != value else float(value)  # NaN check without a numpy call
+
+    def is_covered(self, symbol: str, minute: int) -> bool:
+        """
+        Whether `minute` of `symbol` was fetched, so a missing price means the exchange has none
+        """
+        series = self._get(symbol)
+        return series is not None and series.is_covered(minute)
+
+    def missing(self, symbol: str, start: int, end: int) -> List[Tuple[int, int]]:
+        """
+        The [start, end) ranges of minutes between `start` and `end` that weren't fetched yet
+        """
+        series = self._get(symbol)
+        if series is None:
+            return [(start, end)] if start < end else []
+        return series.missing(start, end)
+
+    def column(self, symbol: str, column: str = "open", resolution: int = 1) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        The minute index 0 of the column array corresponds to, and the array itself (None if the symbol is unknown).
+        Index i of the array of a coarser `resolution` is the bar starting `i * resolution` minutes later
+        """
+        series = self._get(symbol)
+        if series is None:
+            return 0, None
+        if resolution == 1:
+            return series.start, series.columns[column]
+        return series.start, series.aggregate(resolution)[column]
+
+    def reserve(self, symbol: str, start: int, end: int):
+        """
+        Make room for the minutes [start, end) of `symbol` up front, so writes in any order don't resize the files
+        """
+        series = self._get(symbol)
+        if series is None:
+            self._create(symbol, start, end)
+        elif start < series.start or end > series.start + series.length:
+            series.resize(start, end)
+
+    def write(
+        self,
+        symbol: str,
+        minutes: np.ndarray,
+        values: Dict[str, np.ndarray],
+        covered: Optional[Tuple[int, int]] = None,
+    ):
+        """
+        Store klines of `symbol` at `minutes`. `values` maps column names to arrays aligned with `minutes`, columns
+        left out stay as they are. `covered` is the [start, end) range that was fetched, default: the runs of
+        `minutes`
+        """
+        minutes = np.asarray(minutes, dtype=np.int64)
+        if covered is not None:
+            ranges = [covered]
+        else:
+            ranges = _runs(np.unique(minutes))
+        if not ranges:
+            return
+        first, last = ranges[0][0], ranges[-1][1]
+        if len(minutes):
+            first, last = min(first, int(minutes.min())), max(last, int(minutes.max()) + 1)
+
+        self.reserve(symbol, first, last)
+        self.write_values(symbol, minutes, values)
+        self.commit(symbol, first, last, ranges)
+
+    def write_values(self, symbol: str, minutes: np.ndarray, values: Dict[str, np.ndarray]):
+        """
+        Store klines of `symbol` at `minutes`, which have to be reserved already, without updating the aggregates
+        and covered ranges; `commit` does that. Several processes can write disjoint periods of a symbol this way
+        """
+        series = self._get(symbol)
+        if series is None:
+            raise ValueError(f"No klines of {symbol} are reserved")
+        indexes = np.asarray(minutes, dtype=np.int64) - series.start
+        if len(indexes) and (indexes.min() < 0 or indexes.max() >= series.length):
+            raise ValueError(f"Klines of {symbol} written outside of the reserved minutes")
+        for column, column_values in values.items():
+            series.columns[column][indexes] = column_values
+        series.dirty = True
+
+    def commit(self, symbol: str, start: int, end: int, covered: List[Tuple[int, int]]):
+        """
+        Update the aggregates of minutes [start, end) of `symbol`, after their values were written, and add the
+        `covered` ranges
+        """
+        series = self._get(symbol)
+        series.update_aggregates(start, end)
+        series.covered = _merge_ranges(series.covered + [tuple(covered_range) for covered_range in covered])
+        series.save_meta()
+
+    def write_klines(self, symbol: str, klines: List[list], covered: Optional[Tuple[int, int]] = None):
+        """
+        Store klines in the format the REST API returns them: open time in ms, open, high, low, close, volume, ...
+        """
+        rows = np.array([kline[:6] for kline in klines], dtype=np.float64).reshape(-1, 6)
+        minutes = timestamp_minutes(rows[:, 0].astype(np.int64))
+        self.write(symbol, minutes, {column: rows[:, index + 1] for index, column in enumerate(KLINE_COLUMNS)}, covered)
+
+    def flush(self):
+        for series in self._series.values():
+            if series is not None:
+                series.flush()
+
+    def close(self):
+        self.flush()
+        self._series = {}
+
+
+def import_sqlitedict(path: str = "data/backtest_cache.db", store: KlineStore = None) -> Dict[str, int]:
+    """
+    Move the open prices of the old `SqliteDict` backtest cache into `store`. Returns the number of
+    klines imported per symbol
+    """
+    from sqlitedict import SqliteDict  # pylint: disable=import-outside-toplevel
+
+    store = store or KlineStore()
+    prices: Dict[str, Dict[int, float]] = defaultdict(dict)
+    with SqliteDict(path, flag="r") as cache:
+        for key, price in cache.iteritems():
+            symbol, _, date = key.partition(" - ")
+            prices[symbol][kline_minute(datetime.strptime(date, SQLITEDICT_DATE_FORMAT))] = price
+
+    imported = {}
+    for symbol, symbol_prices in prices.items():
+        minutes = np.fromiter(symbol_prices.keys(), dtype=np.int64, count=len(symbol_prices))
+        values = np.fromiter(symbol_prices.values(), dtype=np.float64, count=len(symbol_prices))
+        order = np.argsort(minutes)
+        store.write(symbol, minutes[order], {"open": values[order]})
+        imported[symbol] = len(symbol_prices)
+    store.flush()
+    return imported
+
+
+def main(args: List[str] = None):
+    parser = argparse.ArgumentParser(description="Manage the backtest kline store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import", help="import the old SqliteDict backtest cache")
+    import_parser.add_argument("path", nargs="?", default="data/backtest_cache.db", help="SqliteDict cache file")
+    archives_parser = subparsers.add_parser(
+        "archives", help="import zipped 1m kline CSV archives of the public Binance data dump"
+    )
+    archives_parser.add_argument("paths", nargs="+", help="archive files or directories containing them")
+    archives_parser.add_argument("--workers", type=int, default=None, help="parsing processes, default: one per core")
+    archives_parser.add_argument("--force", action="store_true", help="also import periods the store already has")
+    options = parser.parse_args(args)
+
+    if options.command == "import":
+        imported = import_sqlitedict(options.path)
+        for symbol, count in sorted(imported.items()):
+            print(f"{symbol}: {count} klines")
+        print(f"Imported {sum(imported.values())} klines of {len(imported)} symbols")
+    elif options.command == "archives":
+        # the archive importer builds on this module
+        from .kline_archive import import_archives  # pylint: disable=import-outside-toplevel,cyclic-import
+
+        started = time.perf_counter()
+        imported = import_archives(options.paths, workers=options.workers, skip_imported=not options.force)
+        for symbol, count in sorted(imported.items()):
+            print(f"{symbol}: {count} klines")
+        print(
+            f"Imported {sum(imported.values())} klines of {len(imported)} symbols in "
+            f"{time.perf_counter() - started:.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
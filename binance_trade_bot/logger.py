@@ -12,6 +12,11 @@ class Logger:
         self.Logger = logging.getLogger(f"{logging_service}_logger")
         self.Logger.setLevel(logging.DEBUG)
         self.Logger.propagate = False
+        # the logging logger is shared by every Logger of the service, e.g. one per backtest, so it keeps a single
+        # set of handlers instead of writing each record once more for every Logger set up before
+        for handler in list(self.Logger.handlers):
+            self.Logger.removeHandler(handler)
+            handler.close()
         formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
         # default is "logs/crypto_trading.log"
         fh = logging.FileHandler(f"logs/{logging_service}.log")
@@ -0,0 +1,189 @@
+import multiprocessing
+import threading
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List
+
+import binance.client
+from binance.client import Client
+
+from .bar_store import BarStore
+from .binance_stream_manager import BinanceCache, BinanceOrder, BinanceStreamManager, StreamMetrics
+from .config import Config
+from .logger import Logger
+from .ticker_store import TickerStore
+
+# Slots the shared ticker table keeps on top of the symbols listed at startup, for listings while the bot runs.
+# The table can't grow once the ingester runs
+INGESTER_TICKER_HEADROOM = 1024
+# Seconds to wait for the ingester to stop before it is terminated
+INGESTER_STOP_TIMEOUT = 5
+
+
+class _ForwardingOrders:  # pylint: disable=too-few-public-methods
+    def __init__(self, send: Callable[[tuple], None]):
+        self._send = send
+
+    def put(self, order: BinanceOrder):
+        self._send(("order", order.event))
+
+
+class _ForwardingCache(BinanceCache):
+    """
+    Cache of the ingester process: prices go straight into the shared ticker table, order and balance
+    updates and closed bars are handed on to the trader process
+    """
+
+    def __init__(self, send: Callable[[tuple], None], ticker_values: TickerStore):
+        self._send = send
+        self.ticker_values = ticker_values
+        self.orders = _ForwardingOrders(send)
+        self.bars = BarStore()
+        self.bars.on_close = lambda bars: send(("bars", bars))
+
+    def update_balances(self, balances: Dict[str, float], update_time: int):
+        self._send(("balances", balances, update_time))
+
+    def invalidate_balance(self, asset: str):
+        self._send(("invalidate_balance", asset))
+
+
+class _IngesterStreamManager(BinanceStreamManager):
+    def __init__(
+        self,
+        cache: BinanceCache,
+        config: Config,
+        binance_client: binance.client.Client,
+        logger: Logger,
+        send: Callable[[tuple], None],
+    ):
+        self._send = send
+        super().__init__(cache, config, binance_client, logger)
+
+    def _process_stream_signal(self, signal_type: str, stream_id):
+        if signal_type == "CONNECT" and "!userData" in self.bw_api_manager.get_stream_info(stream_id)["markets"]:
+            # pending orders are tracked by the trader process, it reconciles them itself
+            self._send(("user_data_connected",))
+            return
+        super()._process_stream_signal(signal_type, stream_id)
+
+
+def run_ingester(shm_name: str, capacity: int, lock, conn):
+    """
+    Entry point of the ingester process: runs the websocket streams until the trader process asks it to
+    stop or goes away
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    config = Config()
+    # order books are read by the trader only, they aren't shared
+    config.ORDER_BOOK_DEPTH = 0
+    logger = Logger("ingester", enable_notifications=False)
+    client = Client(config.BINANCE_API_KEY, config.BINANCE_API_SECRET_KEY, tld=config.BINANCE_TLD)
+
+    send_lock = threading.Lock()
+
+    def send(event: tuple):
+        with send_lock:
+            conn.send(event)
+
+    cache = _ForwardingCache(send, TickerStore(capacity, shm.buf, lock, initialize=False))
+    manager = _IngesterStreamManager(cache, config, client, logger, send)
+    try:
+        while True:
+            command = conn.recv()
+            if command[0] == "subscribe":
+                manager.update_subscriptions(command[1])
+            elif command[0] == "close":
+                break
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        manager.close()
+        cache.ticker_values.close()
+        shm.close()
+
+
+class IngestedStreamManager(BinanceStreamManager):
+    """
+    Runs the websocket ingestion in a child process, so stream processing doesn't compete with scouting,
+    database writes and the API server for the GIL. Prices arrive in a TickerStore in shared memory that
+    is read in place; order, balance and reconnect events and closed bars arrive through a pipe. Order books,
+    book tickers and the bars still open aren't shared, best bid/ask come from REST in this mode.
+    """
+
+    def __init__(
+        self,
+        cache: BinanceCache,
+        config: Config,
+        binance_client: binance.client.Client,
+        logger: Logger,
+    ):  # pylint: disable=super-init-not-called
+        self.cache = cache
+        self.config = config
+        self.binance_client = binance_client
+        self.logger = logger
+        self.metrics = StreamMetrics()
+        self.pending_orders = set()
+        self.pending_orders_mutex: threading.Lock = threading.Lock()
+
+        # every price that can end up in the table, streamed or fetched over REST, is one of a listed symbol
+        capacity = len(binance_client.get_exchange_info()["symbols"]) + INGESTER_TICKER_HEADROOM
+        context = multiprocessing.get_context("spawn")
+        self._shm = shared_memory.SharedMemory(create=True, size=TickerStore.buffer_size(capacity))
+        lock = context.Lock()
+        self.cache.ticker_values = TickerStore(capacity, self._shm.buf, lock)
+
+        self._conn, child_conn = context.Pipe()
+        self._send_lock = threading.Lock()
+        self._process = context.Process(
+            target=run_ingester,
+            args=(self._shm.name, capacity, lock, child_conn),
+            name="market-data-ingester",
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+
+        self._eventThread = threading.Thread(target=self._event_receiver, daemon=True)
+        self._eventThread.start()
+
+    def _event_receiver(self):
+        while True:
+            try:
+                event = self._conn.recv()
+            except (EOFError, OSError):
+                if self._process.exitcode is None or self._process.exitcode != 0:
+                    self.logger.error("Market data ingester stopped, no more stream updates will arrive")
+                return
+            event_type = event[0]
+            if event_type == "order":
+                self.logger.debug(f"execution report: {event[1]}")
+                self.cache.orders.put(BinanceOrder(event[1]))
+            elif event_type == "balances":
+                self.cache.update_balances(event[1], event[2])
+            elif event_type == "bars":
+                self.cache.bars.add(event[1])
+            elif event_type == "invalidate_balance":
+                self.cache.invalidate_balance(event[1])
+            elif event_type == "user_data_connected":
+                self.logger.debug("Connect for userdata arrived", False)
+                self._fetch_pending_orders()
+                self._invalidate_balances()
+
+    def _command(self, *command):
+        with self._send_lock:
+            self._conn.send(command)
+
+    def update_subscriptions(self, coins: List[str]):
+        self._command("subscribe", list(coins))
+
+    def close(self):
+        try:
+            self._command("close")
+        except (BrokenPipeError, OSError):
+            pass
+        self._process.join(INGESTER_STOP_TIMEOUT)
+        if self._process.is_alive():
+            self._process.terminate()
+        self.cache.ticker_values.close()
+        self._shm.close()
+        self._shm.unlink()
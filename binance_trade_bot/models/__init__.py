@@ -3,5 +3,6 @@ from .coin import Coin
 from .coin_value import CoinValue, Interval
 from .current_coin import CurrentCoin
 from .pair import Pair
+from .price_bar import PriceBar
 from .scout_history import ScoutHistory
 from .trade import Trade, TradeState
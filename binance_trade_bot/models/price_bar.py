@@ -0,0 +1,51 @@
+from datetime import datetime as _datetime
+
+from sqlalchemy import Column, DateTime, Float, Integer, String
+
+from .base import Base
+
+
+class PriceBar(Base):
+    __tablename__ = "price_bars"
+
+    id = Column(Integer, primary_key=True)
+
+    symbol = Column(String, index=True)
+
+    open = Column(Float)
+    high = Column(Float)
+    low = Column(Float)
+    close = Column(Float)
+    volume = Column(Float)
+
+    # start of the bar's minute
+    datetime = Column(DateTime, index=True)
+
+    def __init__(
+        self,
+        symbol: str,
+        open_price: float,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+        datetime: _datetime,
+    ):
+        self.symbol = symbol
+        self.open = open_price
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.datetime = datetime
+
+    def info(self):
+        return {
+            "symbol": self.symbol,
+            "open": self.open,
+            "high": self.high,
+            "low": self.low,
+            "close": self.close,
+            "volume": self.volume,
+            "datetime": self.datetime.isoformat(),
+        }
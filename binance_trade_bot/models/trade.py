@@ -34,6 +34,10 @@ class Trade(Base):  # pylint: disable=too-few-public-methods
     crypto_starting_balance = Column(Float)
     crypto_trade_amount = Column(Float)
 
+    execution_mode = Column(String)
+    # seconds between placing the first order and the last fill
+    fill_time = Column(Float)
+
     datetime = Column(DateTime)
 
     def __init__(self, alt_coin: Coin, crypto_coin: Coin, selling: bool):
@@ -54,5 +58,7 @@ class Trade(Base):  # pylint: disable=too-few-public-methods
             "alt_trade_amount": self.alt_trade_amount,
             "crypto_starting_balance": self.crypto_starting_balance,
             "crypto_trade_amount": self.crypto_trade_amount,
+            "execution_mode": self.execution_mode,
+            "fill_time": self.fill_time,
             "datetime": self.datetime.isoformat(),
         }
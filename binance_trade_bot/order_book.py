@@ -0,0 +1,163 @@
+import heapq
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+# limits accepted by the REST depth endpoint
+SNAPSHOT_LIMITS = (5, 10, 20, 50, 100, 500, 1000, 5000)
+# diffs kept while waiting for a snapshot, older ones can't be needed by the time it arrives
+MAX_BUFFERED_DIFFS = 1000
+
+
+class OrderBook:
+    """
+    Local top-of-book mirror of one symbol, built from a REST snapshot and kept current with diff-depth events.
+
+    Diffs that arrive before the snapshot are buffered and replayed on top of it. A diff that doesn't follow
+    the previous one marks the book as out of sync, it then has to be resynced from a new snapshot.
+
+    Snapshots only hold the best `snapshot_limit` levels of each side, and the mirror is cut back to as many
+    when it grows far beyond them. Levels past the cut are unknown, so once removals leave a cut side with
+    fewer than `depth` levels the book is out of sync as well.
+    """
+
+    def __init__(self, symbol: str, depth: int):
+        self.symbol = symbol
+        self.depth = depth
+        self.bids: Dict[float, float] = {}
+        self.asks: Dict[float, float] = {}
+        # None while the book waits for a snapshot
+        self.last_update_id: Optional[int] = None
+        # whether levels past the worst mirrored one may exist, by side
+        self.bids_cut = False
+        self.asks_cut = False
+        self._buffer: Deque[dict] = deque(maxlen=MAX_BUFFERED_DIFFS)
+        self._lock = threading.Lock()
+
+    @property
+    def snapshot_limit(self) -> int:
+        # twice the depth, so levels past it can be removed without falling below it right away
+        return next((limit for limit in SNAPSHOT_LIMITS if limit >= 2 * self.depth), SNAPSHOT_LIMITS[-1])
+
+    @property
+    def synced(self) -> bool:
+        return self.last_update_id is not None
+
+    def reset(self):
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        self.bids.clear()
+        self.asks.clear()
+        self.bids_cut = False
+        self.asks_cut = False
+        self.last_update_id = None
+        self._buffer.clear()
+
+    def apply_snapshot(self, snapshot: dict) -> bool:
+        """
+        Load a REST depth snapshot and replay the diffs buffered since. Returns False if the buffered diffs
+        don't connect to the snapshot and a newer one is needed
+        """
+        with self._lock:
+            buffered = list(self._buffer)
+            self._buffer.clear()
+            self.bids = {float(price): float(qty) for price, qty in snapshot["bids"]}
+            self.asks = {float(price): float(qty) for price, qty in snapshot["asks"]}
+            self.bids_cut = len(self.bids) >= self.snapshot_limit
+            self.asks_cut = len(self.asks) >= self.snapshot_limit
+            self.last_update_id = snapshot["lastUpdateId"]
+            for event in buffered:
+                if not self._apply_diff(event):
+                    return False
+            return True
+
+    def apply_diff(self, event: dict) -> bool:
+        """
+        Apply a depthUpdate event. Returns False when a sequence gap was detected, or a cut side got shallower
+        than `depth`, and the book was reset
+        """
+        with self._lock:
+            if not self.synced:
+                self._buffer.append(event)
+                return True
+            return self._apply_diff(event)
+
+    def _apply_diff(self, event: dict) -> bool:
+        if event["final_update_id_in_event"] <= self.last_update_id:
+            # already contained in the snapshot
+            return True
+        if event["first_update_id_in_event"] > self.last_update_id + 1:
+            self._reset()
+            return False
+
+        for side, levels in ((self.bids, event["bids"]), (self.asks, event["asks"])):
+            for price, qty in levels:
+                price, qty = float(price), float(qty)
+                if qty == 0:
+                    side.pop(price, None)
+                else:
+                    side[price] = qty
+        self.last_update_id = event["final_update_id_in_event"]
+
+        # only the top of the book is of interest, drop levels far away from it
+        limit = self.snapshot_limit
+        if len(self.bids) > 2 * limit:
+            self.bids = dict(heapq.nlargest(limit, self.bids.items()))
+            self.bids_cut = True
+        if len(self.asks) > 2 * limit:
+            self.asks = dict(heapq.nsmallest(limit, self.asks.items()))
+            self.asks_cut = True
+
+        if (self.bids_cut and len(self.bids) < self.depth) or (self.asks_cut and len(self.asks) < self.depth):
+            self._reset()
+            return False
+        return True
+
+    def best_bid(self) -> Optional[float]:
+        with self._lock:
+            return max(self.bids) if self.synced and self.bids else None
+
+    def best_ask(self) -> Optional[float]:
+        with self._lock:
+            return min(self.asks) if self.synced and self.asks else None
+
+    def top(self, side: str) -> List[Tuple[float, float]]:
+        """
+        Best `depth` levels a BUY would take from (asks) or a SELL would hit (bids), best first
+        """
+        with self._lock:
+            if not self.synced:
+                return []
+            if side == "BUY":
+                return heapq.nsmallest(self.depth, self.asks.items())
+            return heapq.nlargest(self.depth, self.bids.items())
+
+    def expected_fill_price(self, quantity: float, side: str) -> Optional[float]:
+        """
+        Average price a market order of `quantity` would fill at. None if the mirrored depth can't fill it
+        """
+        remaining = quantity
+        cost = 0.0
+        for price, qty in self.top(side):
+            taken = min(remaining, qty)
+            cost += taken * price
+            remaining -= taken
+            if remaining <= 0:
+                return cost / quantity
+        return None
+
+    def limit_price(self, quantity: float, side: str) -> Optional[float]:
+        """
+        Worst price level a limit order of `quantity` has to reach to fill immediately
+        """
+        remaining = quantity
+        for price, qty in self.top(side):
+            remaining -= qty
+            if remaining <= 0:
+                return price
+        return None
+
+    def __repr__(self):
+        return f"<OrderBook {self.symbol} {self.best_bid()}/{self.best_ask()} @ {self.last_update_id}>"
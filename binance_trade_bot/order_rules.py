@@ -0,0 +1,70 @@
+import math
+import time
+from typing import Callable, Optional
+
+from .binance_stream_manager import BinanceOrder
+from .config import Config
+from .logger import Logger
+
+# How long to wait for the user data stream to report a settled balance before reconciling over REST
+BALANCE_SETTLE_TIMEOUT = 10
+# Minimum number of seconds between two REST balance reconciliations
+BALANCE_REFRESH_INTERVAL = 1
+# How long to wait for the execution report of a new order before asking for it over REST
+ORDER_REPORT_TIMEOUT = 10
+# How many times a buy or sell is attempted before giving up on the jump
+ORDER_ATTEMPTS = 20
+
+
+def alt_tick(step_size: str) -> int:
+    """
+    Number of decimals of a LOT_SIZE step size
+    """
+    if step_size.find("1") == 0:
+        return 1 - step_size.find(".")
+    return step_size.find("1") - 1
+
+
+def buy_quantity(target_balance: float, from_coin_price: float, origin_tick: int) -> float:
+    return math.floor(target_balance * 10**origin_tick / from_coin_price) / float(10**origin_tick)
+
+
+def sell_quantity(origin_balance: float, origin_tick: int) -> float:
+    return math.floor(origin_balance * 10**origin_tick) / float(10**origin_tick)
+
+
+def format_amount(amount: float, precision: int) -> str:
+    return "{:0.0{}f}".format(amount, precision)
+
+
+def should_cancel_order(
+    order_status: BinanceOrder, config: Config, current_price: Callable[[], Optional[float]]
+) -> bool:
+    """
+    Whether an order ran into the configured buy or sell timeout. A partially filled buy is only canceled once
+    the market, as returned by `current_price`, moved away from it
+    """
+    minutes = (time.time() - order_status.time / 1000) / 60
+    timeout = float(config.SELL_TIMEOUT) if order_status.side == "SELL" else float(config.BUY_TIMEOUT)
+    if not timeout or minutes <= timeout:
+        return False
+
+    if order_status.status == "NEW":
+        return True
+
+    if order_status.status == "PARTIALLY_FILLED":
+        if order_status.side == "SELL":
+            return True
+
+        if order_status.side == "BUY":
+            price = current_price()
+            if price is not None and float(price) * (1 - 0.001) > float(order_status.price):
+                return True
+
+    return False
+
+
+def log_failed_attempt(logger: Logger, attempt: int, trace: str):
+    logger.warning(f"Failed to Buy/Sell. Trying Again (attempt {attempt}/{ORDER_ATTEMPTS})")
+    if attempt == 0:
+        logger.warning(trace)
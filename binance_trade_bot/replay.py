@@ -0,0 +1,166 @@
+import argparse
+import queue
+import time
+from datetime import datetime
+from traceback import format_exc
+from typing import Dict, Iterable, List
+
+from .backtest import MockBinanceManager, MockDatabase
+from .binance_stream_manager import BinanceCache, BinanceStreamManager, StreamMetrics
+from .config import Config
+from .logger import Logger
+from .strategies import get_strategy
+from .stream_decoder import StreamDecoder
+from .stream_recorder import ReplaySource, read_recording
+
+
+class ReplayStreamManager(BinanceStreamManager):
+    """
+    Stream manager without a connection: recorded payloads go through the same decoding and event handling
+    as live ones, on the calling thread. Order books can't be snapshotted, so they stay unsynced.
+    """
+
+    def __init__(self, cache: BinanceCache, config: Config, logger: Logger):  # pylint: disable=super-init-not-called
+        self.cache = cache
+        self.config = config
+        self.logger = logger
+        self.binance_client = None
+        self.metrics = StreamMetrics()
+        self._decode = StreamDecoder(f"binance.{config.BINANCE_TLD}")
+        self.recorder = None
+        self.watchdog = None
+        self._book_resync_queue: queue.Queue = queue.Queue()
+
+    def feed(self, received: float, payload: str):
+        self._process_payload(received, payload)
+
+    def replay(self, source: ReplaySource) -> int:
+        """
+        Process every payload of `source`, returns how many there were
+        """
+        count = 0
+        for received, payload in source:
+            self.feed(received, payload)
+            count += 1
+        return count
+
+    def close(self):
+        pass
+
+
+class ReplayBinanceManager(MockBinanceManager):
+    """
+    Backtest manager whose prices are the ones the replayed stream put into the cache. It runs offline, symbol
+    filters and trade fees come from the exchange info snapshot
+    """
+
+    def __init__(self, config: Config, db: MockDatabase, logger: Logger, start_balances: Dict[str, float] = None):
+        super().__init__(config, db, logger, start_balances=start_balances, offline=True)
+
+    def get_ticker_price(self, ticker_symbol: str):
+        return self.cache.ticker_values.get(ticker_symbol, None)
+
+
+def benchmark(paths: Iterable[str], config: Config = None) -> Dict[str, float]:
+    """
+    Throughput of the stream processing on a recording, without network or disk access in the measurement
+    """
+    config = config or Config()
+    messages = list(read_recording(paths))
+    manager = ReplayStreamManager(BinanceCache(), config, Logger("replay", enable_notifications=False))
+    started = time.perf_counter()
+    count = manager.replay(ReplaySource(messages, None))
+    elapsed = time.perf_counter() - started
+    return {"messages": count, "seconds": elapsed, "messages_per_second": count / elapsed if elapsed else 0.0}
+
+
+def replay_session(
+    paths: Iterable[str],
+    speed: float = None,
+    start_balances: Dict[str, float] = None,
+    starting_coin: str = None,
+    config: Config = None,
+):
+    """
+    Re-run a recorded live session through the configured strategy, scouting every `scout_sleep_time`
+    seconds of recorded time against the replayed prices. Yields the manager after every scout. Nothing talks
+    to the API, symbol filters and trade fees come from the exchange info snapshot.
+
+    :param paths: Recording files or directories
+    :param speed: Replay speed relative to the recording, None for as fast as possible
+    :param start_balances: A dictionary of initial coin values. Default: {BRIDGE: 100}
+    :param starting_coin: The coin to start on. Default: first coin in coin list
+    :param config: Configuration object to use
+
+    :return: The final coin balances
+    """
+    config = config or Config()
+    logger = Logger("replay", enable_notifications=False)
+
+    db = MockDatabase(logger, config)
+    db.create_database()
+    db.set_coins(config.SUPPORTED_COIN_LIST)
+    manager = ReplayBinanceManager(config, db, logger, start_balances=start_balances)
+    stream_manager = ReplayStreamManager(manager.cache, config, logger)
+
+    trader = None
+    last_scout = None
+    try:
+        for received, payload in ReplaySource(read_recording(paths), speed):
+            stream_manager.feed(received, payload)
+            if last_scout is not None and received - last_scout < config.SCOUT_SLEEP_TIME:
+                continue
+            manager.datetime = datetime.utcfromtimestamp(received)
+
+            if trader is None:
+                # the strategy can only start once the replay delivered the starting coin's price
+                coin = db.get_coin(starting_coin or config.SUPPORTED_COIN_LIST[0])
+                if manager.get_ticker_price(coin + config.BRIDGE) is None:
+                    continue
+                if manager.get_currency_balance(coin.symbol) == 0:
+                    manager.buy_alt(coin, config.BRIDGE)
+                db.set_current_coin(coin)
+
+                strategy = get_strategy(config.STRATEGY)
+                if strategy is None:
+                    logger.error("Invalid strategy name")
+                    return manager
+                trader = strategy(manager, db, logger, config)
+                trader.initialize()
+
+            last_scout = received
+            try:
+                trader.scout()
+            except Exception:  # pylint: disable=broad-except
+                logger.warning(format_exc())
+            yield manager
+    except KeyboardInterrupt:
+        pass
+    return manager
+
+
+def main(args: List[str] = None):
+    parser = argparse.ArgumentParser(description="Replay recorded websocket streams")
+    parser.add_argument("paths", nargs="+", help="recording files or directories")
+    parser.add_argument("--benchmark", action="store_true", help="measure the stream processing throughput")
+    parser.add_argument("--speed", type=float, default=None, help="replay speed, as fast as possible if omitted")
+    options = parser.parse_args(args)
+
+    if options.benchmark:
+        result = benchmark(options.paths)
+        print(
+            f"{result['messages']} messages in {result['seconds']:.3f}s "
+            f"({result['messages_per_second']:.0f} messages/s)"
+        )
+        return
+
+    manager = None
+    for manager in replay_session(options.paths, options.speed):
+        pass
+    if manager is not None:
+        print("TIME:", manager.datetime)
+        print("BALANCES:", manager.balances)
+
+
+if __name__ == "__main__":
+    main()
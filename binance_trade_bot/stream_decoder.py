@@ -0,0 +1,116 @@
+from typing import Callable, Dict
+
+from unicorn_fy import UnicornFy
+
+try:
+    from orjson import loads
+except ImportError:
+    from json import loads
+
+
+def order_report_from_event(event: dict) -> dict:
+    """
+    Translate a raw executionReport event into the fields BinanceOrder reads
+    """
+    return {
+        "symbol": event["s"],
+        "side": event["S"],
+        "order_type": event["o"],
+        "order_id": event["i"],
+        "client_order_id": event["c"],
+        "original_client_order_id": event["C"],
+        "cumulative_quote_asset_transacted_quantity": event["Z"],
+        "current_order_status": event["X"],
+        "order_price": event["p"],
+        "cumulative_filled_quantity": event["z"],
+        "transaction_time": event["T"],
+    }
+
+
+def _decode_mini_tickers(data) -> dict:
+    tickers = data if isinstance(data, list) else [data]
+    return {
+        "event_type": "24hrMiniTicker",
+        "data": [
+            {
+                "event_time": ticker["E"],
+                "symbol": ticker["s"],
+                "close_price": ticker["c"],
+                "taker_by_base_asset_volume": ticker["v"],
+            }
+            for ticker in tickers
+        ],
+    }
+
+
+def _decode_book_ticker(data: dict) -> dict:
+    return {
+        "event_type": "bookTicker",
+        "symbol": data["s"],
+        "best_bid_price": data["b"],
+        "best_ask_price": data["a"],
+    }
+
+
+def _decode_depth_update(data: dict) -> dict:
+    return {
+        "event_type": "depthUpdate",
+        "symbol": data["s"],
+        "first_update_id_in_event": data["U"],
+        "final_update_id_in_event": data["u"],
+        "bids": data["b"],
+        "asks": data["a"],
+    }
+
+
+def _decode_execution_report(data: dict) -> dict:
+    report = order_report_from_event(data)
+    report["event_type"] = "executionReport"
+    return report
+
+
+_FAST_DECODERS: Dict[str, Callable[[dict], dict]] = {
+    "24hrMiniTicker": _decode_mini_tickers,
+    "bookTicker": _decode_book_ticker,
+    "depthUpdate": _decode_depth_update,
+    "executionReport": _decode_execution_report,
+}
+
+
+class StreamDecoder:
+    """
+    Turns raw websocket payloads into the UnicornFy representation the stream manager handles. The frequent
+    events are parsed with orjson and only the fields the bot reads are extracted; anything else goes through
+    the complete UnicornFy conversion.
+    """
+
+    def __init__(self, exchange: str):
+        if exchange == "binance.us":
+            self._fallback = UnicornFy.binance_us_websocket
+        else:
+            self._fallback = UnicornFy.binance_com_websocket
+
+    def __call__(self, payload: str) -> dict:
+        try:
+            message = loads(payload)
+        except ValueError:
+            return self._fallback(payload)
+
+        data = message
+        if isinstance(message, dict) and "stream" in message and "data" in message:
+            data = message["data"]
+        if isinstance(data, list):
+            event_type = data[0].get("e", None) if data and isinstance(data[0], dict) else None
+        elif isinstance(data, dict):
+            # book ticker events carry no event type
+            event_type = data.get("e", None) or ("bookTicker" if "u" in data and "b" in data else None)
+        else:
+            event_type = None
+
+        decoder = _FAST_DECODERS.get(event_type, None)
+        if decoder is None:
+            return self._fallback(payload)
+        try:
+            return decoder(data)
+        except KeyError:
+            return self._fallback(payload)
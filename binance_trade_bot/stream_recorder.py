@@ -0,0 +1,106 @@
+import glob
+import gzip
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# Uncompressed bytes written to one recording file before a new one is started
+RECORDING_MAX_BYTES = 256 * 1024 * 1024
+
+
+class StreamRecorder:
+    """
+    Appends raw websocket payloads with their receive time to gzip compressed files, one JSON array
+    `[received, payload]` per line. A new file is started once `max_bytes` were written to the current one.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = RECORDING_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._file: Optional[gzip.GzipFile] = None
+        self._written = 0
+        self._lock = threading.Lock()
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+        name = datetime.utcnow().strftime("stream-%Y%m%d-%H%M%S-%f.jsonl.gz")
+        self._file = gzip.open(os.path.join(self.directory, name), "ab")
+        self._written = 0
+
+    def record(self, received: float, payload: str):
+        line = (json.dumps([received, payload]) + "\n").encode()
+        with self._lock:
+            if self._file is None or self._written >= self.max_bytes:
+                self._rotate()
+            self._file.write(line)
+            self._written += len(line)
+
+    def flush(self):
+        """
+        Make everything recorded so far readable, even if the process dies before the file is closed
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def recording_files(path: str) -> List[str]:
+    """
+    Recording files of a directory in the order they were written, or `path` itself if it is a file
+    """
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, "stream-*.jsonl.gz")))
+    return [path]
+
+
+def read_recording(paths: Iterable[str]) -> Iterator[Tuple[float, str]]:
+    """
+    Recorded (receive time, payload) pairs of `paths` (files or directories), in order. A file cut short by a
+    crash is read up to its last complete line
+    """
+    for path in paths:
+        for filename in recording_files(path):
+            with gzip.open(filename, "rt") as rfh:
+                try:
+                    for line in rfh:
+                        if not line.endswith("\n"):
+                            break
+                        received, payload = json.loads(line)
+                        yield received, payload
+                except (EOFError, zlib.error):
+                    pass
+
+
+class ReplaySource:
+    """
+    Yields recorded payloads at their original pace, `speed` times faster, or as fast as possible when
+    `speed` is None
+    """
+
+    def __init__(self, messages: Iterable[Tuple[float, str]], speed: Optional[float] = 1.0):
+        self.messages = messages
+        self.speed = speed
+
+    def __iter__(self) -> Iterator[Tuple[float, str]]:
+        started = None
+        first_received = None
+        for received, payload in self.messages:
+            if self.speed is not None:
+                if started is None:
+                    started, first_received = time.monotonic(), received
+                delay = (received - first_received) / self.speed - (time.monotonic() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            yield received, payload
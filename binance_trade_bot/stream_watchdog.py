@@ -0,0 +1,195 @@
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+import binance.client
+from binance.exceptions import BinanceAPIException, BinanceRequestException
+from unicorn_binance_websocket_api import BinanceWebSocketApiManager
+
+from .logger import Logger
+from .subscription_manager import StreamSubscription, SubscriptionManager
+from .ticker_store import TickerStore
+
+# Seconds between two health checks of the streams
+WATCHDOG_INTERVAL = 1
+# Request weight per minute Binance allows an IP to use
+REQUEST_WEIGHT_LIMIT = 1200
+# Share of the request weight limit failover polling may push the used weight to
+POLL_WEIGHT_BUDGET = 0.5
+# Bounds of the seconds between two REST price polls during a failover
+POLL_MIN_INTERVAL = 1
+POLL_MAX_INTERVAL = 30
+
+
+class StreamWatchdog:
+    """
+    Watches the time of the last message of every ticker and depth stream and of the last streamed price of every
+    followed symbol. A stream that stays silent for `stall_timeout` seconds is replaced by a new connection; while
+    any stream stalls or any symbol goes without a streamed price, prices are polled over REST instead, as often
+    as the request weight budget allows, until the streams are healthy again.
+    """
+
+    def __init__(
+        self,
+        bw_api_manager: BinanceWebSocketApiManager,
+        subscriptions: SubscriptionManager,
+        binance_client: binance.client.Client,
+        ticker_values: TickerStore,
+        logger: Logger,
+        stall_timeout: float,
+        on_depth_stall: Optional[Callable[[Set[str]], None]] = None,
+    ):
+        self.bw_api_manager = bw_api_manager
+        self.subscriptions = subscriptions
+        self.binance_client = binance_client
+        self.ticker_values = ticker_values
+        self.logger = logger
+        self.stall_timeout = stall_timeout
+        self.on_depth_stall = on_depth_stall
+
+        # symbol -> time its price last arrived over a stream
+        self._last_seen: Dict[str, float] = {}
+        # stream id -> time the watchdog first saw the stream, for streams that never received anything
+        self._first_seen: Dict[str, float] = {}
+
+        self.failover_started: Optional[float] = None
+        self.poll_interval = POLL_MIN_INTERVAL
+        self._next_poll = 0.0
+        self._metrics_mutex = threading.Lock()
+        self.failovers = 0
+        self.failover_seconds = 0.0
+        self.reconnects = 0
+        self.polls = 0
+        self.used_weight = 0
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def failover(self) -> bool:
+        return self.failover_started is not None
+
+    def seen(self, symbols: Iterable[str], when: float):
+        """
+        Record that prices of `symbols` arrived over a stream at `when`
+        """
+        for symbol in symbols:
+            self._last_seen[symbol] = when
+
+    def _stream_age(self, stream_id, now: float) -> float:
+        heartbeat = self.bw_api_manager.stream_list.get(stream_id, {}).get("last_heartbeat", None)
+        if heartbeat is None:
+            heartbeat = self._first_seen.setdefault(stream_id, now)
+        return now - heartbeat
+
+    def _stalled_streams(self, subscription: StreamSubscription, now: float) -> List[str]:
+        return [
+            stream_id
+            for stream_id in list(subscription.streams)
+            if self._stream_age(stream_id, now) > self.stall_timeout
+        ]
+
+    def _stale_symbols(self, now: float) -> Set[str]:
+        followed = self.subscriptions.tickers.markets
+        for symbol in set(self._last_seen) - followed:
+            self._last_seen.pop(symbol, None)
+        return {symbol for symbol in followed if now - self._last_seen.setdefault(symbol, now) > self.stall_timeout}
+
+    def _reconnect(self, subscription: StreamSubscription, stream_id, now: float):
+        markets = subscription.streams.get(stream_id, set())
+        self.logger.warning(
+            f"{subscription.label} stream stalled, no message for {self._stream_age(stream_id, now):.0f}s, "
+            f"reconnecting {len(markets)} symbols"
+        )
+        if subscription is self.subscriptions.depth and self.on_depth_stall is not None:
+            self.on_depth_stall(markets)
+        subscription.reconnect(stream_id)
+        self._first_seen.pop(stream_id, None)
+        with self._metrics_mutex:
+            self.reconnects += 1
+
+    def check(self, now: float):
+        """
+        Reconnect stalled streams and start or end the REST failover
+        """
+        stalled = False
+        for subscription in (self.subscriptions.tickers, self.subscriptions.depth):
+            if subscription is None:
+                continue
+            for stream_id in self._stalled_streams(subscription, now):
+                stalled = stalled or subscription is self.subscriptions.tickers
+                self._reconnect(subscription, stream_id, now)
+        stale = self._stale_symbols(now)
+
+        if (stalled or stale) and not self.failover:
+            self.failover_started = now
+            self.poll_interval = POLL_MIN_INTERVAL
+            self._next_poll = now
+            with self._metrics_mutex:
+                self.failovers += 1
+            self.logger.warning(
+                f"Ticker streams unhealthy ({len(stale)} symbols without streamed prices), polling prices over REST"
+            )
+        elif not (stalled or stale) and self.failover:
+            duration = now - self.failover_started
+            self.failover_started = None
+            with self._metrics_mutex:
+                self.failover_seconds += duration
+            self.logger.info(f"Ticker streams healthy again after {duration:.0f}s, stopped polling prices over REST")
+
+        if self.failover and now >= self._next_poll:
+            self._poll(stale)
+            self._next_poll = now + self.poll_interval
+
+    def _poll(self, stale: Set[str]):
+        try:
+            if len(stale) == 1:
+                symbol = next(iter(stale))
+                tickers = [self.binance_client.get_symbol_ticker(symbol=symbol)]
+            else:
+                tickers = self.binance_client.get_symbol_ticker()
+        except (BinanceAPIException, BinanceRequestException) as e:
+            self.logger.error(f"Got exception during polling prices: {e}")
+            self.poll_interval = min(self.poll_interval * 2, POLL_MAX_INTERVAL)
+            return
+
+        followed = self.subscriptions.tickers.markets
+        self.ticker_values.update_many(
+            (ticker["symbol"], float(ticker["price"])) for ticker in tickers if ticker["symbol"] in followed
+        )
+
+        response = self.binance_client.response
+        used_weight = int(response.headers.get("x-mbx-used-weight-1m", 0)) if response is not None else 0
+        budget = REQUEST_WEIGHT_LIMIT * POLL_WEIGHT_BUDGET
+        if used_weight > budget:
+            self.poll_interval = min(self.poll_interval * 2, POLL_MAX_INTERVAL)
+        elif used_weight < budget / 2:
+            self.poll_interval = max(self.poll_interval / 2, POLL_MIN_INTERVAL)
+        with self._metrics_mutex:
+            self.polls += 1
+            self.used_weight = used_weight
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._metrics_mutex:
+            failover_seconds = self.failover_seconds
+            if self.failover_started is not None:
+                failover_seconds += time.time() - self.failover_started
+            return {
+                "failover": self.failover,
+                "failovers": self.failovers,
+                "failover_seconds": failover_seconds,
+                "reconnects": self.reconnects,
+                "polls": self.polls,
+                "poll_interval": self.poll_interval,
+                "used_weight": self.used_weight,
+            }
+
+    def _run(self):
+        while True:
+            time.sleep(WATCHDOG_INTERVAL)
+            if self.bw_api_manager.is_manager_stopping():
+                return
+            try:
+                self.check(time.time())
+            except Exception as e:  # pylint: disable=broad-except
+                self.logger.error(f"Stream watchdog failed: {e}")
@@ -0,0 +1,148 @@
+import threading
+from itertools import permutations
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import binance.client
+from unicorn_binance_websocket_api import BinanceWebSocketApiManager
+
+from .config import Config
+from .logger import Logger
+
+# Assets every coin is valued in, besides the bridge
+VALUATION_ASSETS = ("BTC", "BNB", "USDT")
+
+
+def trading_symbols(exchange_info: dict) -> Set[str]:
+    return {symbol["symbol"] for symbol in exchange_info["symbols"] if symbol["status"] == "TRADING"}
+
+
+def ticker_symbols(coins: Iterable[str], bridge: str, trading: Set[str]) -> Set[str]:
+    """
+    Bridge markets, valuation pairs and direct cross pairs of `coins` that are listed on the exchange
+    """
+    coins = set(coins)
+    wanted = {coin + bridge for coin in coins}
+    wanted.update(coin + asset for coin in coins for asset in VALUATION_ASSETS)
+    wanted.update(asset + bridge for asset in VALUATION_ASSETS)
+    wanted.update(origin + target for origin, target in permutations(coins, 2))
+    return wanted & trading
+
+
+class StreamSubscription:
+    """
+    The markets subscribed to a fixed set of channels, spread over as many multiplexed streams as the per
+    stream subscription limit requires
+    """
+
+    def __init__(self, bw_api_manager: BinanceWebSocketApiManager, channels: List[str], label: str):
+        self.bw_api_manager = bw_api_manager
+        self.channels = channels
+        self.label = label
+        self.capacity = bw_api_manager.max_subscriptions_per_stream // len(channels)
+        # stream id -> upper case symbols subscribed on it
+        self.streams: Dict[str, Set[str]] = {}
+        self._mutex = threading.Lock()
+
+    @property
+    def markets(self) -> Set[str]:
+        with self._mutex:
+            return set().union(*self.streams.values())
+
+    def owns(self, stream_id) -> bool:
+        return stream_id in self.streams
+
+    def update(self, markets: Set[str]) -> Tuple[Set[str], Set[str]]:
+        """
+        Subscribe to `markets` and unsubscribe from everything else. Returns the added and removed markets
+        """
+        current = self.markets
+        added = markets - current
+        removed = current - markets
+
+        with self._mutex:
+            self._update(added, removed)
+        return added, removed
+
+    def _update(self, added: Set[str], removed: Set[str]):
+        for stream_id, stream_markets in self.streams.items():
+            gone = stream_markets & removed
+            if gone:
+                self.bw_api_manager.unsubscribe_from_stream(stream_id, markets=[market.lower() for market in gone])
+                stream_markets -= gone
+
+        pending = sorted(added)
+        for stream_id, stream_markets in self.streams.items():
+            room = self.capacity - len(stream_markets)
+            if pending and room > 0:
+                batch, pending = pending[:room], pending[room:]
+                self.bw_api_manager.subscribe_to_stream(stream_id, markets=[market.lower() for market in batch])
+                stream_markets.update(batch)
+        while pending:
+            batch, pending = pending[: self.capacity], pending[self.capacity :]
+            stream_id = self.bw_api_manager.create_stream(
+                self.channels, [market.lower() for market in batch], stream_label=self.label
+            )
+            self.streams[stream_id] = set(batch)
+
+    def reconnect(self, stream_id) -> Optional[str]:
+        """
+        Replace `stream_id` by a new connection subscribed to the same markets. Returns the new stream's id, None
+        if the stream isn't part of this subscription (anymore)
+        """
+        with self._mutex:
+            markets = self.streams.pop(stream_id, None)
+            if markets is None:
+                return None
+            self.bw_api_manager.stop_stream(stream_id)
+            new_stream_id = self.bw_api_manager.create_stream(
+                self.channels, [market.lower() for market in sorted(markets)], stream_label=self.label
+            )
+            self.streams[new_stream_id] = markets
+        return new_stream_id
+
+
+class SubscriptionManager:
+    """
+    Derives the symbols the bot needs from the supported coin list and keeps the ticker (and order book)
+    subscriptions in line with it, instead of following the whole market
+    """
+
+    def __init__(
+        self,
+        bw_api_manager: BinanceWebSocketApiManager,
+        binance_client: binance.client.Client,
+        config: Config,
+        logger: Logger,
+    ):
+        self.binance_client = binance_client
+        self.config = config
+        self.logger = logger
+        self.tickers = StreamSubscription(bw_api_manager, ["miniTicker", "bookTicker"], "tickers")
+        self.depth: Optional[StreamSubscription] = None
+        if config.ORDER_BOOK_DEPTH:
+            self.depth = StreamSubscription(bw_api_manager, ["depth@100ms"], "depth")
+
+    def ticker_symbols(self, coins: Iterable[str], trading: Set[str]) -> Set[str]:
+        return ticker_symbols(coins, self.config.BRIDGE.symbol, trading)
+
+    def book_symbols(self, coins: Iterable[str], trading: Set[str]) -> Set[str]:
+        bridge = self.config.BRIDGE.symbol
+        return {coin + bridge for coin in coins} & trading
+
+    def update(self, coins: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+        """
+        Bring the subscriptions in line with `coins`. Returns the order book symbols added and removed
+        """
+        coins = list(coins)
+        trading = trading_symbols(self.binance_client.get_exchange_info())
+
+        added, removed = self.tickers.update(self.ticker_symbols(coins, trading))
+        if added or removed:
+            self.logger.info(
+                f"Ticker subscriptions: {len(self.tickers.markets)} symbols, "
+                f"added {sorted(added)}, removed {sorted(removed)}"
+            )
+
+        if self.depth is None:
+            return set(), set()
+        return self.depth.update(self.book_symbols(coins, trading))
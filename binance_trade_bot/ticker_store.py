@@ -0,0 +1,221 @@
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Longest symbol the store can intern
+SYMBOL_LENGTH = 24
+# int64 header fields: sequence number, number of interned symbols
+_HEADER_FIELDS = 2
+
+
+class TickerStore:
+    """
+    Last prices by symbol. Every symbol is interned to an integer slot of preallocated float64 arrays, so
+    writers never rebind anything readers hold and vectorized code can index the arrays directly.
+
+    Writers are serialized by a lock and bump a sequence number before and after every write (seqlock);
+    readers never block, they retry a snapshot until no write overlapped it.
+
+    The sequence number, the symbol table and both arrays live in one flat buffer. Passing an external
+    buffer (e.g. shared memory) together with a lock shared by all writers lets several processes use
+    the same store; such a store has a fixed capacity.
+    """
+
+    def __init__(self, capacity: int = 4096, buffer=None, lock=None, initialize: bool = True):
+        self._growable = buffer is None
+        if buffer is None:
+            buffer = bytearray(self.buffer_size(capacity))
+        self._map(buffer, capacity)
+        if initialize:
+            self._header[:] = 0
+            self.prices[:] = np.nan
+            self.timestamps[:] = 0
+        self._slots: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        self._write_lock = lock if lock is not None else threading.Lock()
+        self._sync_symbols()
+
+    @staticmethod
+    def buffer_size(capacity: int) -> int:
+        return 8 * _HEADER_FIELDS + capacity * (8 + 8 + SYMBOL_LENGTH)
+
+    @staticmethod
+    def _views(buffer, capacity: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        offset = 8 * _HEADER_FIELDS
+        return (
+            np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=buffer),
+            np.ndarray((capacity,), dtype=np.float64, buffer=buffer, offset=offset),
+            np.ndarray((capacity,), dtype=np.float64, buffer=buffer, offset=offset + 8 * capacity),
+            np.ndarray((capacity,), dtype=f"S{SYMBOL_LENGTH}", buffer=buffer, offset=offset + 16 * capacity),
+        )
+
+    def _map(self, buffer, capacity: int):
+        self._header, self.prices, self.timestamps, self._names = self._views(buffer, capacity)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.prices)
+
+    @property
+    def _sequence(self) -> int:
+        return int(self._header[0])
+
+    def _sync_symbols(self):
+        """
+        Pick up symbols interned by other processes sharing the buffer
+        """
+        count = int(self._header[1])
+        for slot in range(len(self._symbols), count):
+            symbol = self._names[slot].decode()
+            self._symbols.append(symbol)
+            self._slots[symbol] = slot
+
+    def _lookup(self, symbol: str) -> Optional[int]:
+        slot = self._slots.get(symbol, None)
+        if slot is None and len(self._symbols) < self._header[1]:
+            self._sync_symbols()
+            slot = self._slots.get(symbol, None)
+        return slot
+
+    def slot(self, symbol: str) -> int:
+        """
+        Slot of `symbol`, interning it on first use
+        """
+        slot = self._lookup(symbol)
+        if slot is not None:
+            return slot
+        with self._write_lock:
+            return self._intern(symbol)
+
+    def slots(self, symbols: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self.slot(symbol) for symbol in symbols), dtype=np.intp)
+
+    def _intern(self, symbol: str) -> int:
+        self._sync_symbols()
+        slot = self._slots.get(symbol, None)
+        if slot is None:
+            name = symbol.encode()
+            if len(name) > SYMBOL_LENGTH:
+                raise ValueError(f"Symbol {symbol} is longer than {SYMBOL_LENGTH} characters")
+            slot = len(self._symbols)
+            if slot >= self.capacity:
+                if not self._growable:
+                    raise ValueError(f"TickerStore is full, can't add {symbol}")
+                self._grow()
+            self._names[slot] = name
+            self._header[1] = slot + 1
+            self._symbols.append(symbol)
+            self._slots[symbol] = slot
+        return slot
+
+    def _grow(self):
+        # the new arrays are filled before they are published, so readers that don't take the write lock see
+        # either the old or the new arrays with the same contents, never a zeroed buffer
+        capacity = self.capacity
+        header, prices, timestamps, names = self._views(bytearray(self.buffer_size(capacity * 2)), capacity * 2)
+        header[:] = self._header
+        prices[:] = np.nan
+        prices[:capacity] = self.prices
+        timestamps[:capacity] = self.timestamps
+        names[:capacity] = self._names
+        self.prices, self.timestamps, self._names = prices, timestamps, names
+        self._header = header
+
+    def update(self, symbol: str, price: float, timestamp: Optional[float] = None):
+        self.update_many(((symbol, price),), timestamp)
+
+    def update_many(self, prices: Iterable[Tuple[str, float]], timestamp: Optional[float] = None):
+        """
+        Write several prices as one update, readers see either none or all of them
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._write_lock:
+            updates = [(self._intern(symbol), price) for symbol, price in prices]
+            self._header[0] += 1
+            for slot, price in updates:
+                self.prices[slot] = price
+                self.timestamps[slot] = timestamp
+            self._header[0] += 1
+
+    def invalidate(self, symbols: Iterable[str]):
+        """
+        Forget the prices of `symbols`, their slots stay reserved
+        """
+        with self._write_lock:
+            self._sync_symbols()
+            slots = [self._slots[symbol] for symbol in symbols if symbol in self._slots]
+            self._header[0] += 1
+            for slot in slots:
+                self.prices[slot] = np.nan
+                self.timestamps[slot] = 0
+            self._header[0] += 1
+
+    def _read(self, reader):
+        while True:
+            sequence = self._sequence
+            if sequence % 2:
+                time.sleep(0)
+                continue
+            value = reader()
+            if self._sequence == sequence:
+                return value
+
+    def get(self, symbol: str, default: Optional[float] = None) -> Optional[float]:
+        slot = self._lookup(symbol)
+        if slot is None:
+            return default
+        price = float(self.prices[slot])
+        return default if np.isnan(price) else price
+
+    def get_with_time(self, symbol: str) -> Tuple[Optional[float], float]:
+        """
+        Price of `symbol` together with the time it was written
+        """
+        slot = self._lookup(symbol)
+        if slot is None:
+            return None, 0.0
+        price, timestamp = self._read(lambda: (float(self.prices[slot]), float(self.timestamps[slot])))
+        return (None if np.isnan(price) else price), timestamp
+
+    def snapshot(self, slots: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Consistent copy of the prices and timestamps, of all slots or only of `slots`. Missing prices are NaN
+        """
+        if slots is None:
+            self._sync_symbols()
+            slots = slice(0, len(self._symbols))
+        return self._read(lambda: (self.prices[slots].copy(), self.timestamps[slots].copy()))
+
+    def __getitem__(self, symbol: str) -> float:
+        price = self.get(symbol)
+        if price is None:
+            raise KeyError(symbol)
+        return price
+
+    def __setitem__(self, symbol: str, price: float):
+        self.update(symbol, price)
+
+    def __contains__(self, symbol: str) -> bool:
+        return self.get(symbol) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        self._sync_symbols()
+        return iter([symbol for symbol in list(self._symbols) if symbol in self])
+
+    def __len__(self) -> int:
+        return len(list(iter(self)))
+
+    def items(self) -> List[Tuple[str, float]]:
+        prices, _ = self.snapshot()
+        return [(symbol, float(price)) for symbol, price in zip(self._symbols, prices) if not np.isnan(price)]
+
+    def close(self):
+        """
+        Drop the views into the buffer, so shared memory backing it can be closed
+        """
+        self._map(bytearray(self.buffer_size(0)), 0)
+
+    def __repr__(self):
+        return f"<TickerStore {len(self)}/{len(self._symbols)} symbols>"
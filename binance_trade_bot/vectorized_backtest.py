@@ -0,0 +1,397 @@
+import argparse
+import time
+from datetime import datetime, timedelta
+from traceback import format_exc
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .auto_trader import AutoTrader
+from .binance_api_manager import BinanceAPIManager
+from .config import Config
+from .exchange_snapshot import MissingDataError
+from .kline_store import KlineStore, kline_minute
+from .logger import Logger
+from .models import Coin, Pair
+
+# Steps evaluated at once right after a jump, jumps tend to come in clusters
+SCAN_MIN_STEPS = 256
+# Upper bound the scan window doubles up to while no jump happens
+SCAN_MAX_STEPS = 65536
+
+
+def step_count(start_date: datetime, end_date: datetime, interval: int) -> int:
+    """
+    Number of scouts the step by step engine runs between `start_date` and `end_date`
+    """
+    if end_date <= start_date:
+        return 0
+    return -((start_date - end_date) // timedelta(minutes=interval))
+
+
+def price_matrix(
+    store: KlineStore, symbols: List[str], start_date: datetime, steps: int, interval: int, resolution: int = 1
+) -> np.ndarray:
+    """
+    Open prices of `symbols` at every step, one column per symbol, NaN where there is no kline. With a `resolution`
+    above 1 the opens of the bars of that many minutes the steps are in
+    """
+    first_minute = kline_minute(start_date)
+    prices = np.full((steps, len(symbols)), np.nan)
+    for column, symbol in enumerate(symbols):
+        start, values = store.column(symbol, resolution=resolution)
+        if values is None:
+            continue
+        if interval % resolution:
+            minutes = first_minute + np.arange(steps, dtype=np.int64) * interval
+            indexes = (minutes - start) // resolution
+            inside = (minutes >= start) & (indexes < len(values))
+            prices[inside, column] = values[indexes[inside]]
+            continue
+        # every step is the same number of bars further, a strided slice copies them without an index array
+        stride = interval // resolution
+        index = (first_minute - start) // resolution
+        first = max(-(index // stride), 0)
+        last = min(-((index - len(values)) // stride), steps)
+        if first < last:
+            prices[first:last, column] = values[index + first * stride : index + (last - 1) * stride + 1 : stride]
+    return prices
+
+
+class _Candidates:
+    """
+    The pairs scouted from one coin, as arrays in the order `get_pairs_from` returns them, which is the order the
+    step by step engine breaks ties in. Columns and fees stay the same for the whole run, ratios are updated when
+    a trade changes them
+    """
+
+    def __init__(self, trader: AutoTrader, coin: Coin, coin_columns: Dict[str, int]):
+        config = trader.config
+        self.coin = coin
+        self.column = coin_columns[coin.symbol]
+        self.pairs: List[Pair] = [pair for pair in trader.db.get_pairs_from(coin) if pair.to_coin_id in coin_columns]
+        self.indexes = {pair.to_coin_id: index for index, pair in enumerate(self.pairs)}
+        self.columns = np.array([coin_columns[pair.to_coin_id] for pair in self.pairs], dtype=np.int64)
+        self.use_margin = config.USE_MARGIN == "yes"
+        self.ratios = np.array([np.nan if pair.ratio is None else pair.ratio for pair in self.pairs])
+        self.failing = np.zeros(len(self.pairs), dtype=bool)
+        for index in range(len(self.pairs)):
+            self._check_ratio(index)
+        from_fee = trader.manager.get_fee(coin, config.BRIDGE, True)
+        to_fees = np.array([trader.manager.get_fee(pair.to_coin, config.BRIDGE, False) for pair in self.pairs])
+        transaction_fees = from_fee + to_fees - from_fee * to_fees
+        # the factors and terms of AutoTrader._get_ratios that are the same at every step
+        self.kept_fees = 1 - transaction_fees
+        self.multiplied_fees = transaction_fees * config.SCOUT_MULTIPLIER
+        self.margin = config.SCOUT_MARGIN / 100
+
+    def _check_ratio(self, index: int):
+        # the step by step engine raises on a listed coin without a ratio, or a zero one it divides by
+        ratio = self.pairs[index].ratio
+        self.failing[index] = ratio is None or (self.use_margin and ratio == 0)
+
+    def update_ratio(self, to_coin: str):
+        """
+        Read the ratio of the pair to `to_coin` again, after a trade changed it
+        """
+        index = self.indexes.get(to_coin, None)
+        if index is None:
+            return
+        ratio = self.pairs[index].ratio
+        self.ratios[index] = np.nan if ratio is None else ratio
+        self._check_ratio(index)
+
+    def values(self, coin_prices: np.ndarray, optional_prices: np.ndarray) -> np.ndarray:
+        """
+        The ratios `AutoTrader._get_ratios` scouts with, one column per pair for every row of the prices of the coin
+        and of the coins of the pairs, NaN for the pairs it skips
+        """
+        # same operations in the same order as AutoTrader._get_ratios, so the floats come out bit for bit identical
+        coin_opt_coin_ratio = coin_prices[:, None] / optional_prices
+        if self.use_margin:
+            return self.kept_fees * coin_opt_coin_ratio / self.ratios - 1 - self.margin
+        return (coin_opt_coin_ratio - self.multiplied_fees * coin_opt_coin_ratio) - self.ratios
+
+    def jumps(self, prices: np.ndarray) -> np.ndarray:
+        """
+        Whether scouting from the coin jumps to another coin, for every row of `prices`
+        """
+        if not self.pairs:
+            return np.zeros(len(prices), dtype=bool)
+        optional_prices = prices[:, self.columns]
+        # no ratio comes out positive without a price of the coin
+        jumps = (self.values(prices[:, self.column], optional_prices) > 0).any(axis=1)
+        # the step by step engine raises, and so doesn't jump, on a zero division or a failing listed pair
+        jumps &= ~(optional_prices == 0).any(axis=1)
+        if self.failing.any():
+            jumps &= ~(self.failing & ~np.isnan(optional_prices)).any(axis=1)
+        return jumps
+
+    def best_pair(self, prices: np.ndarray) -> Pair:
+        """
+        The pair `AutoTrader._jump_to_best_coin` jumps along at the `prices` of a step `jumps` flagged: the first
+        one with the highest positive ratio
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = self.values(prices[None, self.column], prices[None, self.columns])[0]
+        return self.pairs[int(np.argmax(np.where(values > 0, values, -np.inf)))]
+
+
+class _Events:
+    """
+    Finds the steps at which scouting may trade. The candidates of every coin are set up once per run, after a
+    trade only the ratios to the coins it bought are read again
+    """
+
+    def __init__(self, trader: AutoTrader, coins: List[Coin], coin_columns: Dict[str, int]):
+        self.trader = trader
+        self.sources = [_Candidates(trader, coin, coin_columns) for coin in coins]
+        self.update([])
+
+    def update(self, bought: List[str]):
+        """
+        Pick up the state a step that traded left, `bought` are the symbols of the coins it bought
+        """
+        for source in self.sources:
+            for symbol in bought:
+                source.update_ratio(symbol)
+
+    def events(self, prices: np.ndarray) -> np.ndarray:
+        """
+        Whether scouting may trade, for every row of `prices`. A flagged row may still turn out not to trade, as
+        long as no row that does trade goes unflagged
+        """
+        raise NotImplementedError()
+
+    def scout(self, prices: np.ndarray):
+        """
+        Scout at the first flagged step, whose row of the price matrix `prices` is
+        """
+        self.trader.scout()
+
+
+class _CurrentCoin(_Events):
+    """
+    Events of the default strategy: jumps from the current coin. A flagged step always jumps, so only the jump
+    itself runs there
+    """
+
+    def __init__(self, trader: AutoTrader, coins: List[Coin], coin_columns: Dict[str, int]):
+        self.candidates: Optional[_Candidates] = None
+        super().__init__(trader, coins, coin_columns)
+
+    def update(self, bought: List[str]):
+        super().update(bought)
+        current_coin = self.trader.db.get_current_coin()
+        self.candidates = None
+        if current_coin is not None:
+            self.candidates = next((source for source in self.sources if source.coin == current_coin), None)
+
+    def events(self, prices: np.ndarray) -> np.ndarray:
+        if self.candidates is None:
+            return np.zeros(len(prices), dtype=bool)
+        return self.candidates.jumps(prices)
+
+    def scout(self, prices: np.ndarray):
+        self.trader.jump(self.candidates.coin, self.candidates.best_pair(prices))
+
+
+def _min_notional(manager: BinanceAPIManager, origin_symbol: str, target_symbol: str) -> float:
+    try:
+        return manager.get_min_notional(origin_symbol, target_symbol)
+    except Exception:  # pylint: disable=broad-except
+        return np.nan
+
+
+class _HeldCoins(_Events):
+    """
+    Events of the multiple_coins strategy: jumps from the current coin and from every coin held for at least the
+    minimum notional, and buying a coin with the bridge while none is held
+    """
+
+    def __init__(self, trader: AutoTrader, coins: List[Coin], coin_columns: Dict[str, int]):
+        self.coins = coins
+        self.coin_columns = coin_columns
+        bridge = trader.config.BRIDGE.symbol
+        self.min_notionals = np.array([_min_notional(trader.manager, coin.symbol, bridge) for coin in coins])
+        self.lowest_min_notional = np.nanmin(self.min_notionals, initial=np.inf)
+        self.unknown_min_notionals = np.isnan(self.min_notionals)
+        self.current_column: Optional[int] = None
+        self.balances = np.zeros(len(coins))
+        self.bridge_balance = 0.0
+        super().__init__(trader, coins, coin_columns)
+
+    def update(self, bought: List[str]):
+        super().update(bought)
+        manager = self.trader.manager
+        current_coin = self.trader.db.get_current_coin()
+        self.current_column = self.coin_columns.get(current_coin.symbol, None) if current_coin is not None else None
+        self.balances = np.array([manager.get_currency_balance(coin.symbol) for coin in self.coins])
+        self.bridge_balance = manager.get_currency_balance(self.trader.config.BRIDGE.symbol)
+
+    def events(self, prices: np.ndarray) -> np.ndarray:
+        priced = ~np.isnan(prices)
+        # the strategy skips a coin that isn't the current one when `price * balance < min_notional`
+        held = priced & ~(prices * self.balances < self.min_notionals)
+        if self.current_column is not None:
+            held[:, self.current_column] = priced[:, self.current_column]
+        # scouting fails on a priced coin without a known minimum notional, the step it first does is left to it
+        if self.unknown_min_notionals.any():
+            events = (priced & self.unknown_min_notionals).any(axis=1)
+        else:
+            events = np.zeros(len(prices), dtype=bool)
+        for column in np.flatnonzero(held.any(axis=0)):
+            events |= held[:, column] & self.sources[column].jumps(prices)
+        if self.bridge_balance > self.lowest_min_notional:
+            events |= ~held.any(axis=1)
+        return events
+
+
+# Strategies the vectorized engine can run, and how it finds the steps their scouting may trade at
+VECTORIZED_STRATEGIES = {"default": _CurrentCoin, "multiple_coins": _HeldCoins}
+
+
+def run_vectorized(
+    manager: BinanceAPIManager,
+    trader: AutoTrader,
+    logger: Logger,
+    end_date: datetime,
+    interval: int = 1,
+    yield_interval: int = 100,
+    done: int = 0,
+    on_step: Callable[[int], None] = None,
+) -> Iterator[BinanceAPIManager]:
+    """
+    Run the strategy of `trader` (one of VECTORIZED_STRATEGIES) on the mock `manager` up to `end_date`, making
+    the same trades and yielding the manager at the same steps as the step by step loop of `backtest`.
+
+    The clock skips the steps at which scouting can't trade: the jump conditions are evaluated for all candidate
+    coins over a window of steps at once, and the strategy only scouts at the first step that may trade, so the
+    trades themselves go through the regular code path. Between two such steps balances, ratios and the current
+    coin don't change. Prices come from the kline store only, minutes it doesn't cover count as without a price.
+
+    `done` is the number of steps the run already made before the manager's current time. `on_step` gets called with
+    the number of steps made so far whenever the run is between two steps, e.g. to checkpoint it.
+    """
+    config = trader.config
+    start_date = manager.datetime
+    steps = step_count(start_date, end_date, interval)
+    coins = trader.db.get_coins()
+    coin_columns = {coin.symbol: column for column, coin in enumerate(coins)}
+    symbols = [coin + config.BRIDGE for coin in coins]
+    coin_symbols = {symbol: coin.symbol for symbol, coin in zip(symbols, coins)}
+    prices = price_matrix(manager.klines, symbols, start_date, steps, interval, manager.prices.resolution)
+
+    step_length = timedelta(minutes=interval)
+
+    def step_datetime(step: int) -> datetime:
+        return start_date + step_length * step
+
+    def sample(step: int):
+        # the metrics value the balances at the step the run yields at, its prices are in the matrix already
+        manager.datetime = step_datetime(step)
+        if step < steps:
+            row = prices[step].tolist()
+            manager.prices.preset(
+                kline_minute(manager.datetime),
+                {symbol: None if price != price else price for symbol, price in zip(symbols, row)},
+            )
+
+    events = VECTORIZED_STRATEGIES[config.STRATEGY](trader, coins, coin_columns)
+    window = SCAN_MIN_STEPS
+    step = 0
+    try:
+        while step < steps:
+            window_end = min(step + window, steps)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rows = np.flatnonzero(events.events(prices[step:window_end]))
+            jump = int(rows[0]) if len(rows) else None
+            last = window_end if jump is None else step + jump
+
+            # the steps before the jump scout without trading, only the yields they'd make remain
+            first_yield = -(-(done + step + 1) // yield_interval) * yield_interval - done
+            for n in range(first_yield, last + 1, yield_interval):
+                sample(n)
+                yield manager
+
+            if jump is None:
+                step = window_end
+                window = min(window * 2, SCAN_MAX_STEPS)
+                if on_step is not None:
+                    manager.datetime = step_datetime(step)
+                    on_step(done + step)
+                continue
+
+            manager.datetime = step_datetime(last)
+            traded = len(manager.trades)
+            try:
+                events.scout(prices[last])
+            except MissingDataError:
+                raise
+            except Exception:  # pylint: disable=broad-except
+                logger.warning(format_exc())
+            if len(manager.trades) > traded:
+                events.update(
+                    [
+                        coin_symbols[symbol]
+                        for _, side, symbol, _, _ in manager.trades[traded:]
+                        if side == "BUY" and symbol in coin_symbols
+                    ]
+                )
+            step = last + 1
+            manager.datetime = step_datetime(step)
+            if (done + step) % yield_interval == 0:
+                sample(step)
+                yield manager
+            if on_step is not None:
+                on_step(done + step)
+            window = SCAN_MIN_STEPS
+    except KeyboardInterrupt:
+        return
+    manager.datetime = step_datetime(steps)
+
+
+def compare_engines(
+    start_date: datetime, end_date: datetime, config: Config = None, **kwargs
+) -> Tuple[bool, float, float]:
+    """
+    Run the step by step and the vectorized engine over the same period. Returns whether they made identical
+    trades, and the seconds each of them took
+    """
+    # backtest runs this engine, so it can only be imported here
+    from .backtest import backtest  # pylint: disable=import-outside-toplevel,cyclic-import
+
+    kwargs.setdefault("report_path", None)
+    results = []
+    for vectorized in (False, True):
+        started = time.perf_counter()
+        manager = None
+        for manager in backtest(start_date, end_date, config=config, vectorized=vectorized, **kwargs):
+            pass
+        results.append((manager.trades, manager.balances, time.perf_counter() - started))
+    (step_trades, step_balances, step_seconds), (vector_trades, vector_balances, vector_seconds) = results
+    return step_trades == vector_trades and step_balances == vector_balances, step_seconds, vector_seconds
+
+
+def main(args: List[str] = None):
+    parser = argparse.ArgumentParser(description="Backtest a period with both engines, compare and time them")
+    parser.add_argument("start", help="start of the period, e.g. 2024-01-01")
+    parser.add_argument("end", help="end of the period, e.g. 2024-01-15T00:00")
+    parser.add_argument("--interval", type=int, default=1, help="virtual minutes between two scouts")
+    parser.add_argument("--offline", action="store_true", help="run from the local klines and exchange info only")
+    options = parser.parse_args(args)
+
+    same, step_seconds, vector_seconds = compare_engines(
+        datetime.fromisoformat(options.start),
+        datetime.fromisoformat(options.end),
+        interval=options.interval,
+        offline=options.offline,
+    )
+    print(
+        f"{'Identical' if same else 'Different'} trades and balances, step by step {step_seconds:.2f}s, "
+        f"vectorized {vector_seconds:.2f}s ({step_seconds / vector_seconds:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
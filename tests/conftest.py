@@ -0,0 +1,101 @@
+import csv
+import os
+import shutil
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from binance_trade_bot.kline_store import KlineStore, kline_minute
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+# The fixture klines are two days of synthetic 1m open prices of four coins and BTC, with a few minutes missing
+FIXTURE_START = datetime(2024, 1, 1)
+FIXTURE_END = FIXTURE_START + timedelta(days=2)
+FIXTURE_COINS = ("AAA", "BBB", "CCC", "DDD")
+# The reference dataset the engines are benchmarked on is 30 days of the same coins, generated with a fixed seed
+REFERENCE_END = FIXTURE_START + timedelta(days=30)
+
+USER_CFG = """[binance_user_config]
+api_key=
+api_secret_key=
+current_coin=
+bridge=USDT
+"""
+
+
+def _read_klines():
+    with open(os.path.join(FIXTURES, "klines.csv"), newline="") as rfh:
+        rows = list(csv.reader(rfh))
+    header, rows = rows[0], rows[1:]
+    minutes = kline_minute(FIXTURE_START) + np.array([int(row[0]) for row in rows], dtype=np.int64)
+    columns = {
+        symbol: np.array([float(row[index]) if row[index] else np.nan for row in rows])
+        for index, symbol in enumerate(header)
+        if index
+    }
+    # balances are valued in BTC as well
+    for coin in FIXTURE_COINS:
+        columns[coin + "BTC"] = columns[coin + "USDT"] / columns["BTCUSDT"]
+    return minutes, columns
+
+
+def _reference_klines():
+    """
+    1m opens of BTC as a random walk and of the fixture coins as a common random walk plus a mean reverting
+    deviation of each coin, which the strategies jump on about once a day
+    """
+    rng = np.random.default_rng(7)
+    steps = (REFERENCE_END - FIXTURE_START) // timedelta(minutes=1)
+    minutes = kline_minute(FIXTURE_START) + np.arange(steps + 1, dtype=np.int64)
+    common = np.concatenate(([0.0], np.cumsum(rng.normal(0, 0.0005, steps))))
+    columns = {"BTCUSDT": 30000 * np.exp(np.concatenate(([0.0], np.cumsum(rng.normal(0, 0.0004, steps)))))}
+    for index, coin in enumerate(FIXTURE_COINS):
+        shocks = rng.normal(0, 0.0005, steps + 1)
+        deviation = np.zeros(steps + 1)
+        for step in range(1, steps + 1):
+            deviation[step] = deviation[step - 1] * 0.999 + shocks[step]
+        columns[coin + "USDT"] = (index + 1) * np.exp(common + deviation)
+    for coin in FIXTURE_COINS:
+        columns[coin + "BTC"] = columns[coin + "USDT"] / columns["BTCUSDT"]
+    return minutes, columns
+
+
+def _backtest_dir(tmp_path, monkeypatch, minutes, columns):
+    """
+    An offline backtest setup in a temporary working directory: a user.cfg trading the fixture coins, the
+    exchange info snapshot and a kline store with the `columns` of klines at `minutes`
+    """
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("logs")
+    os.makedirs("data")
+    with open("user.cfg", "w") as wfh:
+        wfh.write(USER_CFG)
+    shutil.copy(os.path.join(FIXTURES, "exchange_info.json"), os.path.join("data", "exchange_info.json"))
+    monkeypatch.setenv("SUPPORTED_COIN_LIST", " ".join(FIXTURE_COINS))
+
+    store = KlineStore(os.path.join("data", "klines"))
+    for symbol, values in columns.items():
+        store.write(symbol, minutes, {"open": values}, covered=(int(minutes[0]), int(minutes[-1]) + 1))
+    store.flush()
+    return store
+
+
+@pytest.fixture
+def klines(tmp_path, monkeypatch):
+    """
+    The offline backtest setup with the fixture klines
+    """
+    store = _backtest_dir(tmp_path, monkeypatch, *_read_klines())
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def reference_klines(tmp_path, monkeypatch):
+    """
+    The offline backtest setup with the klines of the reference dataset
+    """
+    store = _backtest_dir(tmp_path, monkeypatch, *_reference_klines())
+    yield store
+    store.close()
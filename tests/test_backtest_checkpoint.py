@@ -0,0 +1,56 @@
+import pytest
+from conftest import FIXTURE_END, FIXTURE_START
+
+from binance_trade_bot import backtest, resume
+from binance_trade_bot.config import Config
+
+
+def _result(manager):
+    return list(manager.trades), dict(manager.balances), manager.datetime
+
+
+@pytest.mark.parametrize(
+    "strategy,vectorized",
+    [("default", False), ("default", True), ("multiple_coins", True), ("momentum", False)],
+    ids=["default-step", "default-vectorized", "multiple_coins-vectorized", "momentum-step"],
+)
+def test_resumed_backtest_matches_straight_run(klines, monkeypatch, tmp_path, strategy, vectorized):
+    monkeypatch.setenv("STRATEGY", strategy)
+    manager = None
+    for manager in backtest(
+        FIXTURE_START,
+        FIXTURE_END,
+        config=Config(),
+        vectorized=vectorized,
+        klines=klines,
+        offline=True,
+        report_path=None,
+    ):
+        pass
+    straight = _result(manager)
+
+    checkpoint_path = str(tmp_path / "checkpoint.pkl")
+    for yields, manager in enumerate(
+        backtest(
+            FIXTURE_START,
+            FIXTURE_END,
+            config=Config(),
+            vectorized=vectorized,
+            klines=klines,
+            offline=True,
+            report_path=None,
+            checkpoint_path=checkpoint_path,
+            checkpoint_interval=300,
+        )
+    ):
+        if yields == 15:
+            break  # interrupted half way through the period
+    interrupted_trades = len(manager.trades)
+
+    # the checkpoint restores the trade deciding configuration the run was started with
+    monkeypatch.setenv("SCOUT_MARGIN", "5")
+    for manager in resume(checkpoint_path, config=Config(), klines=klines, offline=True, report_path=None):
+        pass
+
+    assert len(straight[0]) > interrupted_trades
+    assert _result(manager) == straight
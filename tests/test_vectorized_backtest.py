@@ -0,0 +1,39 @@
+import pytest
+from conftest import FIXTURE_END, FIXTURE_START
+
+from binance_trade_bot import backtest
+from binance_trade_bot.config import Config
+
+
+def _run(config, klines, vectorized, start_balances):
+    yielded = []
+    manager = None
+    for manager in backtest(
+        FIXTURE_START,
+        FIXTURE_END,
+        config=config,
+        start_balances=start_balances,
+        vectorized=vectorized,
+        klines=klines,
+        offline=True,
+        report_path=None,
+    ):
+        yielded.append(manager.datetime)
+    return manager.trades, manager.balances, yielded
+
+
+@pytest.mark.parametrize("strategy", ["default", "multiple_coins"])
+@pytest.mark.parametrize("use_margin", ["yes", "no"])
+@pytest.mark.parametrize("start_balances", [None, {"USDT": 100, "AAA": 3, "BBB": 2}], ids=["bridge", "held"])
+def test_engines_make_identical_trades(klines, monkeypatch, strategy, use_margin, start_balances):
+    monkeypatch.setenv("STRATEGY", strategy)
+    monkeypatch.setenv("USE_MARGIN", use_margin)
+    config = Config()
+
+    step_trades, step_balances, step_yields = _run(config, klines, False, start_balances)
+    vector_trades, vector_balances, vector_yields = _run(config, klines, True, start_balances)
+
+    assert len(step_trades) > 10
+    assert vector_trades == step_trades
+    assert vector_balances == step_balances
+    assert vector_yields == step_yields
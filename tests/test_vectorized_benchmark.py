@@ -0,0 +1,57 @@
+import gc
+import time
+
+import pytest
+from conftest import FIXTURE_START, REFERENCE_END
+
+from binance_trade_bot import backtest
+from binance_trade_bot.config import Config
+
+# How many times faster than the step by step engine the vectorized one has to run the reference dataset
+MIN_SPEEDUP = 100
+# The vectorized engine runs in milliseconds, the best of a few runs keeps a hiccup of the machine out of the ratio
+VECTORIZED_RUNS = 5
+
+
+def _timed_run(config, klines, vectorized):
+    # timed like timeit does, without a garbage collection landing in one of the runs
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        manager = None
+        for manager in backtest(
+            FIXTURE_START,
+            REFERENCE_END,
+            config=config,
+            vectorized=vectorized,
+            klines=klines,
+            offline=True,
+            report_path=None,
+        ):
+            pass
+        seconds = time.perf_counter() - started
+    finally:
+        gc.enable()
+    return manager.trades, manager.balances, seconds
+
+
+@pytest.mark.parametrize("strategy", ["default", "multiple_coins"])
+@pytest.mark.parametrize("use_margin", ["yes", "no"])
+def test_vectorized_engine_speedup(reference_klines, monkeypatch, strategy, use_margin):
+    monkeypatch.setenv("STRATEGY", strategy)
+    monkeypatch.setenv("USE_MARGIN", use_margin)
+    config = Config()
+
+    step_trades, step_balances, step_seconds = _timed_run(config, reference_klines, False)
+    vector_runs = [_timed_run(config, reference_klines, True) for _ in range(VECTORIZED_RUNS)]
+    vector_seconds = min(seconds for _, _, seconds in vector_runs)
+
+    assert len(step_trades) > 20
+    for vector_trades, vector_balances, _ in vector_runs:
+        assert vector_trades == step_trades
+        assert vector_balances == step_balances
+    assert step_seconds / vector_seconds >= MIN_SPEEDUP, (
+        f"step by step {step_seconds:.3f}s, vectorized {vector_seconds:.4f}s: "
+        f"{step_seconds / vector_seconds:.1f}x instead of at least {MIN_SPEEDUP}x"
+    )